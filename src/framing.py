@@ -0,0 +1,63 @@
+class StreamFramer:
+    """
+    Буфер входящего потока одного соединения.
+
+    Данные читаются в заранее выделенный bytearray (recv_into), поэтому
+    очередной опрос клиента не создаёт новых буферов. Базовый класс считает
+    всё прочитанное одной командой, как это было до появления разбора потока;
+    протоколы с известной длиной или разделителем команд переопределяют _next_frame.
+    """
+
+    def __init__(self, size=1024):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.length = 0
+
+    def free(self) -> int:
+        """Размер свободной части буфера"""
+        if self.length == len(self.buffer):
+            self._overflow()
+        return len(self.buffer) - self.length
+
+    def recv_into(self, conn) -> int:
+        """Читает из сокета в свободную часть буфера, возвращает число байт (0 - соединение закрыто)"""
+        free = self.free()  # может сбросить переполненный буфер, поэтому до среза
+        received = conn.recv_into(self.view[self.length:], free)
+        self.length += received
+        return received
+
+    def feed(self, data: bytes):
+        """Добавляет уже прочитанные данные (для asyncio, где чтение делает транспорт)"""
+        if len(data) > self.free():
+            self._overflow()
+            data = data[-len(self.buffer):]
+        self.buffer[self.length:self.length + len(data)] = data
+        self.length += len(data)
+
+    def frames(self) -> list:
+        """Извлекает все полные команды из буфера, неполный остаток ждет следующего чтения"""
+        result = []
+        pos = 0
+        while pos < self.length:
+            size = self._next_frame(pos)
+            if not size:
+                break
+            result.append(self._frame(pos, size))
+            pos += size
+
+        rest = self.length - pos
+        if rest and pos:
+            self.buffer[:rest] = self.buffer[pos:self.length]  # редкий случай: команда разрезана TCP
+        self.length = rest
+        return result
+
+    def _next_frame(self, pos) -> int:
+        """Длина команды, начинающейся с pos, или 0, если она пришла не полностью"""
+        return self.length - pos
+
+    def _frame(self, pos, size) -> bytes:
+        return bytes(self.view[pos:pos + size])
+
+    def _overflow(self):
+        # полной команды в заполненном буфере нет - это мусор, отбрасываем
+        self.length = 0
@@ -0,0 +1,76 @@
+"""
+KOPIS без Компаса-3D: модуль с тем же интерфейсом, что kopis (simulation/src/main.cpp), на чистом Python.
+
+Пины платы Orange Pi 3 LTS и валы моторов виртуальные, поворот вала занимает модельное время,
+которое можно ускорить (kopis_motorsim.set_time_scale или переменная окружения KOPIS_TIME_SCALE).
+Нужен для запуска сервера с симулятором на Linux: тестов, нагрузочных прогонов и бенчмарков.
+"""
+from src.kopis_headless.board import GpioMode, GpioState, OrangePi3LTS, PinNumberingMode, PinType
+
+__version__ = "headless"
+
+BOARD = BCM = PinNumberingMode.BOARD  # BCM - аналог BOARD
+SUNXI = PinNumberingMode.SUNXI
+LOW = GpioState.LOW
+HIGH = GpioState.HIGH
+GPIO = PinType.GPIO
+SPECIAL = PinType.SPECIAL
+POWER = PinType.POWER
+GROUND = PinType.GROUND
+IN = GpioMode.IN
+OUT = GpioMode.OUT
+
+board = OrangePi3LTS()
+_numbering_mode = PinNumberingMode.NONE
+
+from src.kopis_headless import kopis_extra, kopis_motorsim  # noqa: E402 (нужен board)
+
+
+def setmode(mode):
+    global _numbering_mode
+    _numbering_mode = PinNumberingMode(mode)
+
+
+def getmode():
+    return _numbering_mode
+
+
+def _check_mode(required):
+    if _numbering_mode == required:
+        return
+    if _numbering_mode == PinNumberingMode.NONE:
+        raise RuntimeError("GPIO numbering mode is not set. Use GPIO.setmode() first")
+    raise RuntimeError(f"GPIO numbering mode by {required.name} is not set. Use GPIO.setmode(GPIO.{required.name}) first")
+
+
+def _pin(pin):
+    """Пин по номеру на разъеме (режим BOARD) или по имени SoC (режим SUNXI)"""
+    if isinstance(pin, str):
+        _check_mode(PinNumberingMode.SUNXI)
+        return board.pin_by_soc_name(pin)
+    _check_mode(PinNumberingMode.BOARD)
+    return board.pin_by_board_number(pin)
+
+
+def setup(pin, mode):
+    _pin(pin).set_mode(mode)
+
+
+def output(pin, value):
+    _pin(pin).set_state(GpioState.LOW if value == 0 else GpioState.HIGH)
+
+
+def input(pin):
+    return _pin(pin).state
+
+
+def setwarnings(enabled):
+    if enabled:
+        raise RuntimeError("This feature is not supported now")
+
+
+def cleanup(pin=None):
+    """Вернуть пины (все или один) в режим входа"""
+    pins = board.gpio_pins() if pin is None else [_pin(pin)]
+    for gpio_pin in pins:
+        gpio_pin.set_mode(GpioMode.IN)
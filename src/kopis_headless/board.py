@@ -0,0 +1,139 @@
+import enum
+
+
+class PinNumberingMode(enum.IntEnum):
+    NONE = 0
+    BOARD = 1
+    SUNXI = 2
+
+
+class GpioState(enum.IntEnum):
+    LOW = 0
+    HIGH = 1
+
+
+class GpioMode(enum.IntEnum):
+    OFF = 0
+    IN = 1
+    OUT = 2
+    ALT = 3
+
+
+class PinType(enum.IntEnum):
+    GPIO = 0
+    SPECIAL = 1
+    POWER = 2
+    GROUND = 3
+
+
+class Pin:
+    def __init__(self, board_number, name, pin_type):
+        self.board_number = board_number
+        self.name = name
+        self.type = pin_type
+
+
+class GpioPin(Pin):
+    """Пин общего назначения: по умолчанию выключен (OFF) и в LOW"""
+
+    def __init__(self, board_number, name, soc_name, gpio_number, pin_type=PinType.GPIO):
+        super().__init__(board_number, name, pin_type)
+        self.soc_name = soc_name
+        self.gpio_number = gpio_number
+        self.mode = GpioMode.OFF
+        self.state = GpioState.LOW
+
+    def set_mode(self, mode):
+        if mode == GpioMode.ALT:
+            raise RuntimeError("ALT mode is not supported on plain GPIO pins")
+        self.mode = GpioMode(mode)
+
+    def set_state(self, state):
+        if self.mode != GpioMode.OUT:
+            raise RuntimeError("Cannot write the state when pin is not in OUTPUT mode")
+        self.state = GpioState(state)
+
+
+class SpecialPin(GpioPin):
+    """Пин с альтернативной функцией (I2C, UART, SPI, PWM), может работать и как GPIO"""
+
+    def __init__(self, board_number, name, soc_name, gpio_number, alt_function):
+        super().__init__(board_number, name, soc_name, gpio_number, PinType.SPECIAL)
+        self.alt_function = alt_function
+
+    def set_mode(self, mode):
+        self.mode = GpioMode(mode)
+
+
+class OrangePi3LTS:
+    """26-пиновый разъем Orange Pi 3 LTS, как в board_orangepi3lts.cpp симулятора"""
+
+    def __init__(self):
+        self.pins = [
+            Pin(1, "3.3V", PinType.POWER),
+            Pin(2, "5V", PinType.POWER),
+            SpecialPin(3, "SDA.0", "PD26", 122, "TWI0-SDA"),
+            Pin(4, "5V", PinType.POWER),
+            SpecialPin(5, "SCL.0", "PD25", 121, "TWI0-SCK"),
+            Pin(6, "GND", PinType.GROUND),
+            SpecialPin(7, "PWM.0", "PD22", 118, "PWM0"),
+            GpioPin(8, "PL02", "PL2", 354),
+            Pin(9, "GND", PinType.GROUND),
+            GpioPin(10, "PL03", "PL3", 355),
+            SpecialPin(11, "RXD.3", "PD24", 120, "UART3_RX"),
+            GpioPin(12, "PD18", "PD18", 114),
+            SpecialPin(13, "TXD.3", "PD23", 119, "UART3_TX"),
+            Pin(14, "GND", PinType.GROUND),
+            GpioPin(15, "PL10", "PL10", 362),
+            GpioPin(16, "PD15", "PD15", 111),
+            Pin(17, "3.3V", PinType.POWER),
+            GpioPin(18, "PD16", "PD16", 112),
+            SpecialPin(19, "MOSI.1", "PH5", 229, "SPI1_MOSI"),
+            Pin(20, "GND", PinType.GROUND),
+            SpecialPin(21, "MISO.1", "PH6", 230, "SPI1_MISO"),
+            GpioPin(22, "PD21", "PD21", 117),
+            SpecialPin(23, "SCLK.1", "PH4", 228, "SPI1_SCLK"),
+            SpecialPin(24, "CE.1", "PH3", 227, "SPI1_CS"),
+            Pin(25, "GND", PinType.GROUND),
+            GpioPin(26, "PL08", "PL8", 360),
+        ]
+        self._by_number = {pin.board_number: pin for pin in self.pins}
+        self._by_soc = {pin.soc_name: pin for pin in self.gpio_pins()}
+
+    def gpio_pins(self):
+        return [pin for pin in self.pins if pin.type in (PinType.GPIO, PinType.SPECIAL)]
+
+    def pin_by_board_number(self, number) -> GpioPin:
+        pin = self._by_number.get(number)
+        if pin is None:
+            raise IndexError("No pin with this board number")
+        if pin.type not in (PinType.GPIO, PinType.SPECIAL):
+            raise RuntimeError(f"Pin {number} ({pin.name}) is not a GPIO pin")
+        return pin
+
+    def pin_by_soc_name(self, soc_name) -> GpioPin:
+        pin = self._by_soc.get(soc_name)
+        if pin is None:
+            raise IndexError("No pin with this SoC name")
+        return pin
+
+    def format_pins(self):
+        """Таблица пинов в том же виде, что печатает kopis_extra.print_board_pins симулятора"""
+        border = "+------+-------+----------+------+---+----++----+---+------+----------+-------+------+"
+        lines = ["+------+-------+----------+------+---+  #KOPIS  +---+------+----------+-------+------+",
+                 "| GPIO |  SoC  |   Name   | Mode | V | ~Virtual | V | Mode |   Name   |  SoC  | GPIO |",
+                 border]
+
+        def cells(pin):
+            if pin.type in (PinType.GPIO, PinType.SPECIAL):
+                value = "-" if pin.mode == GpioMode.ALT else str(int(pin.state))
+                return str(pin.gpio_number), pin.soc_name, pin.name, pin.mode.name, value
+            return "", "", pin.name, "", ""
+
+        for left, right in zip(self.pins[::2], self.pins[1::2]):
+            gpio_l, soc_l, name_l, mode_l, v_l = cells(left)
+            gpio_r, soc_r, name_r, mode_r, v_r = cells(right)
+            lines.append(f"| {gpio_l:>4} | {soc_l:>5} | {name_l:>8} | {mode_l:>4} | {v_l:>1} | {left.board_number:>2} || "
+                         f"{right.board_number:<2} | {v_r:<1} | {mode_r:<4} | {name_r:<8} | {soc_r:<5} | {gpio_r:<4} |")
+        lines.append(border)
+        return "\n".join(lines)
@@ -0,0 +1,26 @@
+import time
+
+import src.kopis_headless as kopis
+from src.kopis_headless import kopis_motorsim
+from src.kopis_headless.board import GpioMode, GpioState
+
+
+def print_board_pins():
+    print(kopis.board.format_pins())
+
+
+def test_gpio_pins():
+    """Поочередно переключает все GPIO-пины платы в OUT/HIGH и обратно"""
+    for pin in kopis.board.gpio_pins():
+        pin.set_mode(GpioMode.OUT)
+        pin.set_state(GpioState.HIGH)
+        time.sleep(0.01)
+        pin.set_state(GpioState.LOW)
+        pin.set_mode(GpioMode.IN)
+
+
+def test_motors():
+    """Полный оборот обоих валов туда и обратно"""
+    for name in (kopis_motorsim.MOTOR_H, kopis_motorsim.MOTOR_V):
+        kopis_motorsim.move_degrees(name, 180, 10)
+        kopis_motorsim.move_degrees(name, -180, 10)
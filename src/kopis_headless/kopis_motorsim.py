@@ -0,0 +1,125 @@
+import enum
+import os
+import threading
+import time
+
+MOTOR_H = "#Nema17HS8401_Horizontal"
+MOTOR_V = "#Nema17HS8401_Vertical"
+
+# скорость виртуального вала: град/с на единицу скорости move_degrees (скорость 10 - 30°/с, как NEMA17 на 1/16)
+DEGREES_PER_SPEED = 3.0
+
+# во сколько раз виртуальное время идет быстрее реального, задается и переменной окружения
+TIME_SCALE_ENV = "KOPIS_TIME_SCALE"
+
+
+class MountType(enum.IntEnum):
+    EQ = 0
+    AZ = 1
+
+
+EQ = MountType.EQ
+AZ = MountType.AZ
+
+
+class VirtualMotor:
+    """Виртуальный вал мотора: угол и время, которое заняли повороты"""
+
+    def __init__(self, name):
+        self.name = name
+        self.shaft_angle = 0.0
+        self.moves = 0
+        self.busy_time = 0.0  # виртуальных секунд в движении
+        self.last_move = (0.0, 0.0)  # начало и конец последнего поворота по time.perf_counter
+        self.lock = threading.Lock()
+
+    def set_shaft_angle(self, angle):
+        self.shaft_angle = angle % 360.0
+
+
+_motors = {name: VirtualMotor(name) for name in (MOTOR_H, MOTOR_V)}
+_time_scale = float(os.environ.get(TIME_SCALE_ENV, 1.0))
+_mount_type = EQ
+
+
+def set_time_scale(scale):
+    """Ускорение виртуального времени: 100 - поворот идет в 100 раз быстрее реального, 0 - мгновенно"""
+    global _time_scale
+    if scale < 0:
+        raise ValueError(f"Неверный масштаб времени: {scale}")
+    _time_scale = float(scale)
+
+
+def get_time_scale() -> float:
+    return _time_scale
+
+
+def _motor(name) -> VirtualMotor:
+    motor = _motors.get(name)
+    if motor is None:
+        raise IndexError(f"No motor with name {name}")
+    return motor
+
+
+def setup_motors_by_mount_type(mount_type):
+    """Исходное положение валов: у экваториальной вертикальный вал на 90°"""
+    global _mount_type
+    _mount_type = MountType(mount_type)
+    _motors[MOTOR_H].set_shaft_angle(0.0)
+    _motors[MOTOR_V].set_shaft_angle(90.0 if _mount_type == EQ else 0.0)
+
+
+def move_degrees(motor_name, angle, speed):
+    """
+    Поворот вала, как Motor::rotateShaftAngle симулятора: угол берется по модулю 360°,
+    вал поворачивается частями по speed градусов со скоростью speed * DEGREES_PER_SPEED град/с
+    виртуального времени. Вызов блокируется на это время, деленное на масштаб времени.
+    """
+    if speed <= 0:
+        return
+    motor = _motor(motor_name)
+    direction = 1.0 if angle >= 0 else -1.0
+    angle = abs(angle) % 360.0
+    if angle == 0.0:
+        return
+
+    rate = speed * DEGREES_PER_SPEED
+    with motor.lock:
+        motor.moves += 1
+        started = time.perf_counter()
+        elapsed = 0.0
+        remaining = angle
+        while remaining > 0.0:
+            part = min(float(speed), remaining)
+            remaining -= part
+            elapsed += part / rate
+            if _time_scale > 0:
+                # дедлайн от начала поворота: задержки sleep не накапливаются
+                delay = started + elapsed / _time_scale - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            motor.set_shaft_angle(motor.shaft_angle + direction * part)
+        motor.busy_time += elapsed
+        motor.last_move = (started, time.perf_counter())
+
+
+def reset_angle(motor_name):
+    _motor(motor_name).set_shaft_angle(0.0)
+
+
+def get_shaft_angle(motor_name) -> float:
+    """Угол вала (только в headless-версии, для тестов и нагрузочных прогонов)"""
+    return _motor(motor_name).shaft_angle
+
+
+def get_busy_time(motor_name) -> float:
+    """Виртуальное время, которое вал провел в движении"""
+    return _motor(motor_name).busy_time
+
+
+def get_last_move(motor_name) -> tuple:
+    """Начало и конец последнего поворота вала (time.perf_counter), чтобы проверять одновременность осей"""
+    return _motor(motor_name).last_move
+
+
+setup_motors_by_mount_type(EQ)
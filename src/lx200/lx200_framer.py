@@ -0,0 +1,35 @@
+from src.framing import StreamFramer
+
+ACK = 0x06
+TERMINATOR = ord('#')
+
+_SINGLE_BYTE_FRAMES = [bytes([b]) for b in range(256)]
+
+FRAMER_BUFFER = 256
+
+
+class LX200Framer(StreamFramer):
+    """
+    Разбор потока команд LX200 по разделителю '#'.
+
+    Команда ':Sr HH:MM:SS#' может прийти по частям, а ':GR#:GD#' - одним пакетом:
+    каждая команда извлекается целиком вместе с '#'. ACK (0x06) и одиночный '#',
+    которым клиенты очищают буфер телескопа, разделителя не имеют и идут отдельными командами.
+    """
+
+    def __init__(self, size=FRAMER_BUFFER):
+        super().__init__(size)
+
+    def _next_frame(self, pos) -> int:
+        first = self.buffer[pos]
+        if first == ACK or first == TERMINATOR:
+            return 1
+        end = self.buffer.find(b'#', pos, self.length)
+        if end < 0:
+            return 0
+        return end - pos + 1
+
+    def _frame(self, pos, size) -> bytes:
+        if size == 1:
+            return _SINGLE_BYTE_FRAMES[self.buffer[pos]]
+        return bytes(self.view[pos:pos + size])
@@ -1,41 +1,284 @@
+import datetime
+import time
+
+from src.lx200.lx200_framer import LX200Framer, ACK
+from src.mount.manual_slew import AXIS_H, AXIS_V
+from src.mount.tracking_engine import SIDEREAL_RATE
+from src.mount.tracking_mode import TrackingMode
 from src.server import Server
+from src.utils import astropi_utils, coordinate_utils
+from src.utils.app_logger import lazy
+from src.utils.location import Coordinate, Location, SkyCoordinate
+from src.utils.metrics import METRICS
+
+# manual by commands https://www.meade.com/support/LX200CommandSet.pdf
+
+FIRMWARE_VERSION = '1.0'
+FIRMWARE_DATE = 'Jan 01 2025'
+FIRMWARE_TIME = '00:00:00'
+
+# скорости ручного движения :RG# :RC# :RM# :RS#, град/с
+SLEW_RATES = {'RG': 2 * SIDEREAL_RATE, 'RC': 16 * SIDEREAL_RATE, 'RM': 1.0, 'RS': 4.0}
+
+# направления ручного движения: ось и знак (восток - RA растет, угол мотора lst - ra уменьшается)
+DIRECTIONS = {'n': (AXIS_V, 1), 's': (AXIS_V, -1), 'e': (AXIS_H, -1), 'w': (AXIS_H, 1)}
+
+SYNC_REPLY = b'Coordinates matched#'
+DATE_REPLY = b'1Updating Planetary Data#' + b' ' * 30 + b'#'
+
+COMMAND_SECONDS = METRICS.histogram('astropi_lx200_command_seconds', "Время обработки команды LX200",
+                                    ('command',))
 
 
 class ServerLX200(Server):
-    buffer = 8
+    """
+    Сервер протокола Meade LX200.
+
+    Команда - ':' + код + параметры + '#', поток разбирает LX200Framer. Обработчик выбирается
+    по самому длинному совпавшему префиксу кода (3, 2 или 1 символ) и получает команду
+    без ':' и '#'. Положение считается тем же путем, что и в NexStar (get_ra_dec_degrees
+    с общим кэшем), цель :Sr/:Sd хранится до :MS (GOTO) или :CM (синхронизация).
+    """
+    buffer = 256
+
+    def __init__(self, host='0.0.0.0', port=4030, mount_type='real', sync=False, **kwargs):
+        super().__init__(host, port, Server.name, mount_type, "LX200", sync, **kwargs)
 
-    def __init__(self, host='0.0.0.0', port=4030, mount_type='real', sync=False):
-        super().__init__(host, port, Server.name, mount_type, "LX200", sync)
+        self.precise = True  # длинный формат координат, :U# переключает
+        self.target_ra = None
+        self.target_dec = None
+        self.slew_rate = SLEW_RATES['RS']
+
+        self._build_dispatch_table()
 
     def get_buffer(self):
         return self.buffer
 
-    def handshake(self, data):
-        self.logger.info(f"Клиент запрашивает состояние. ОК")
-        return data[1] + "#"
+    def create_framer(self):
+        return LX200Framer(self.get_buffer())
+
+    def _build_dispatch_table(self):
+        """Обработчики по коду команды, строятся один раз"""
+        self._dispatch = {}
+        self._command_seconds = {}
+
+        handlers = {
+            'GR': lambda body: self.get_ra(),
+            'GD': lambda body: self.get_dec(),
+            'Sr': self.set_target_ra,
+            'Sd': self.set_target_dec,
+            'MS': lambda body: self.goto_target(),
+            'CM': lambda body: self.sync_target(),
+            'Q': lambda body: self.stop_motion(),
+            'Qn': self.stop_direction,
+            'Qs': self.stop_direction,
+            'Qe': self.stop_direction,
+            'Qw': self.stop_direction,
+            'Mn': self.move_direction,
+            'Ms': self.move_direction,
+            'Me': self.move_direction,
+            'Mw': self.move_direction,
+            'RG': self.set_slew_rate,
+            'RC': self.set_slew_rate,
+            'RM': self.set_slew_rate,
+            'RS': self.set_slew_rate,
+            'U': lambda body: self.toggle_precision(),
+            'D': lambda body: b'\x7f#' if self.mount.goto_in_progress else b'#',
+            'Gt': lambda body: self.get_latitude(),
+            'Gg': lambda body: self.get_longitude(),
+            'St': self.set_latitude,
+            'Sg': self.set_longitude,
+            'GL': lambda body: datetime.datetime.now().strftime('%H:%M:%S#').encode('ascii'),
+            'GC': lambda body: datetime.datetime.now().strftime('%m/%d/%y#').encode('ascii'),
+            'GG': lambda body: self.get_utc_offset(),
+            'Gc': lambda body: b'24#',
+            'SL': lambda body: b'1',  # время не меняем, как и в NexStar (см. set_time)
+            'SG': lambda body: b'1',
+            'SC': lambda body: DATE_REPLY,
+            'GVP': lambda body: f"{self.name}#".encode('ascii'),
+            'GVN': lambda body: f"{FIRMWARE_VERSION}#".encode('ascii'),
+            'GVD': lambda body: f"{FIRMWARE_DATE}#".encode('ascii'),
+            'GVT': lambda body: f"{FIRMWARE_TIME}#".encode('ascii'),
+        }
+        for code, handler in handlers.items():
+            self.register_command(code, handler)
+
+    def register_command(self, code, handler):
+        """
+        Регистрирует обработчик команды.
+
+        Параметры:
+            code (str): код команды без ':' (1-3 символа)
+            handler: функция handler(body: str) -> bytes | None, получает команду без ':' и '#'
+        """
+        self._dispatch[code] = handler
 
     def handle_command(self, data):
+        if not data:
+            return None
+
+        if data[0] == ACK:
+            return self.get_alignment_mode()
+
+        if data[0] != ord(':'):
+            return None  # одиночный '#' (очистка буфера) или мусор
+
+        body = data[1:-1].decode('latin-1') if data[-1] == ord('#') else data[1:].decode('latin-1')
+        self.logger.debug("Получена команда: %s", body)
+
+        dispatch = self._dispatch
+        code = body[:3]
+        handler = dispatch.get(code)
+        if handler is None:
+            code = body[:2]
+            handler = dispatch.get(code)
+            if handler is None:
+                code = body[:1]
+                handler = dispatch.get(code)
+                if handler is None:
+                    self.logger.debug("Неизвестная команда LX200: %s", body)
+                    return None
+
+        started = time.perf_counter()
+        response = handler(body)
+        histogram = self._command_seconds.get(code)
+        if histogram is None:
+            histogram = self._command_seconds[code] = COMMAND_SECONDS.labels(code)
+        histogram.observe(time.perf_counter() - started)
+        return response
+
+    def get_alignment_mode(self):
+        """Ответ на ACK: A - азимутальная монтировка, P - экваториальная (полярная)"""
+        return b'A' if self.mount.params.tracking_mode == TrackingMode.ALT_AZ else b'P'
+
+    def get_ra(self):
+        return self.position_cache.get(self.mount.position_version, ('GR', self.precise),
+                                       lambda: self._ra_reply(self.precise))
+
+    def get_dec(self):
+        return self.position_cache.get(self.mount.position_version, ('GD', self.precise),
+                                       lambda: self._dec_reply(self.precise))
+
+    def _ra_reply(self, precise):
+        ra, _ = self.get_ra_dec_degrees()
+        return (coordinate_utils.deg_2_lx200RaStr(ra, precise) + '#').encode('ascii')
+
+    def _dec_reply(self, precise):
+        _, dec = self.get_ra_dec_degrees()
+        return (coordinate_utils.deg_2_lx200DecStr(dec, precise) + '#').encode('ascii')
+
+    def toggle_precision(self):
+        self.precise = not self.precise
+        self.logger.info(f"Формат координат: {'длинный' if self.precise else 'короткий'}")
+        return None
+
+    def set_target_ra(self, body):
+        ra = coordinate_utils.lx200RaStr_2_deg(body[2:])
+        if ra is None:
+            self.logger.error(f"Неверное прямое восхождение: {body}")
+            return b'0'
+        self.target_ra = ra
+        return b'1'
+
+    def set_target_dec(self, body):
+        dec = coordinate_utils.lx200DecStr_2_deg(body[2:])
+        if dec is None or abs(dec) > 90:
+            self.logger.error(f"Неверное склонение: {body}")
+            return b'0'
+        self.target_dec = dec
+        return b'1'
+
+    def _target_motor_angles(self):
+        """Углы моторов для цели :Sr/:Sd, как в NexStar goto_ra_dec"""
+        lst = astropi_utils.calculate_local_sidereal_time(self.mount.location.long.decimal())
+        return SkyCoordinate(astropi_utils.normalize_degrees_unsigned(lst - self.target_ra), self.target_dec)
+
+    def goto_target(self):
+        if self.target_ra is None or self.target_dec is None:
+            return b'2Target not set#'
+
         try:
-            cmd = data.decode('ascii').strip()
-            self.logger.debug(f"Получена команда: {cmd}")
-
-            if not cmd:
-                return None
-
-            if cmd == ":GR#":
-                return b"12:34:56#"
-            elif cmd == ":GD#":
-                return b"+45*30#"
-            elif cmd == ":Q#":
-                return b"1"
-            elif cmd == ":CM#":
-                return b"M31#"
-            elif cmd.startswith("#"):
-                return self.handshake(cmd).encode('ascii')
-
-        except UnicodeDecodeError:
-            hex_cmd = data.hex()
-            self.logger.debug(f"Бинарная команда: {hex_cmd}")
-            return b"#"
-
-        return None
\ No newline at end of file
+            self.logger.info("Старт команды GOTO Ra/Dec")
+            self.logger.info("Цель (RA/Dec): %.4f° / %.4f°", self.target_ra, self.target_dec)
+            self.logger.info("Цель (J2000 RA/Dec): %s", lazy(coordinate_utils.toJ2000, self.target_ra, self.target_dec))
+
+            # наведение идет в фоне, клиент получает ответ сразу и дальше опрашивает :GR#/:GD# или :D#
+            self.mount.goto_position(self._target_motor_angles())
+            self.start_tracking()
+            return b'0'
+        except Exception as e:
+            self.logger.error(e)
+            return b'1Error#'
+
+    def sync_target(self):
+        if self.target_ra is None or self.target_dec is None:
+            return b'#'
+
+        self.mount.set_sync(self._target_motor_angles())
+        self.mount.position_changed()
+        self.start_tracking()
+        self.logger.info(f"Синхронизация по координатам: П.В (Ra): {self.target_ra:.4f}, Скл (Dec): {self.target_dec:.4f}")
+        return SYNC_REPLY
+
+    def stop_motion(self):
+        """:Q# - остановка наведения и ручного движения"""
+        self.cancel_goto()
+        return None
+
+    def stop_direction(self, body):
+        axis, _ = DIRECTIONS[body[1]]
+        self.mount.slew.set_rate(axis, 0.0)
+        return None
+
+    def move_direction(self, body):
+        axis, sign = DIRECTIONS[body[1]]
+        self.logger.info(f"Ручное движение по {'горизонтали' if axis == AXIS_H else 'вертикали'}: {sign * self.slew_rate:+.4f}°/с")
+        self.mount.slew.set_rate(axis, sign * self.slew_rate)
+        return None
+
+    def set_slew_rate(self, body):
+        self.slew_rate = SLEW_RATES[body[:2]]
+        return None
+
+    def get_latitude(self):
+        location = self.mount.location
+        lat = -location.lat.decimal() if location.north_south else location.lat.decimal()
+        total = round(abs(lat) * 60)
+        return f"{'-' if lat < 0 else '+'}{total // 60:02d}*{total % 60:02d}#".encode('ascii')
+
+    def get_longitude(self):
+        """Долгота в LX200 отсчитывается к западу, 0-360"""
+        location = self.mount.location
+        east = -location.long.decimal() if location.east_west else location.long.decimal()
+        total = round((-east % 360) * 60) % (360 * 60)
+        return f"{total // 60:03d}*{total % 60:02d}#".encode('ascii')
+
+    def set_latitude(self, body):
+        lat = coordinate_utils.lx200DecStr_2_deg(body[2:])
+        if lat is None or abs(lat) > 90:
+            return b'0'
+        location = self.mount.location
+        self.mount.set_location(Location(_coordinate(abs(lat)), location.long, int(lat < 0), location.east_west))
+        self.logger.info(f"Широта задана: {self.mount.location}")
+        return b'1'
+
+    def set_longitude(self, body):
+        west = coordinate_utils.lx200DecStr_2_deg(body[2:])
+        if west is None or abs(west) > 360:
+            return b'0'
+        east = astropi_utils.normalize_degrees_signed(-west)
+        location = self.mount.location
+        self.mount.set_location(Location(location.lat, _coordinate(abs(east)), location.north_south, int(east < 0)))
+        self.logger.info(f"Долгота задана: {self.mount.location}")
+        return b'1'
+
+    def get_utc_offset(self):
+        """Сколько часов прибавить к местному времени, чтобы получить UTC"""
+        offset = -datetime.datetime.now().astimezone().utcoffset().total_seconds() / 3600 + 0.0  # без "-0"
+        return f"{offset:+05.1f}#".encode('ascii')
+
+
+def _coordinate(degrees) -> Coordinate:
+    """Градусы (>= 0) в градусы, минуты и секунды"""
+    total = round(degrees * 3600)
+    return Coordinate(total // 3600, total // 60 % 60, total % 60)
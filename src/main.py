@@ -1,7 +1,10 @@
 import argparse
 
 from src.lx200.lx200_server import ServerLX200
+from src.motor.gpio_backend import GPIO_BACKENDS, GPIO_OPI
 from src.nexstar.nexstar_server import ServerNexStar
+from src.server import SERVE_MODES, MODE_SYNC, DEFAULT_MAX_CONNECTIONS, DEFAULT_IDLE_TIMEOUT
+from src.utils.reply_cache import DEFAULT_TICK
 from src.utils.app_logger import AppLogger
 
 DEFAULT_HOST = '0.0.0.0'
@@ -15,15 +18,24 @@ log = AppLogger.info("MAIN")
 def main():
     args = _parse_args()
 
+    if args.async_log:
+        # форматирование и запись лога - в фоновом потоке, не в потоках импульсов и клиентов
+        AppLogger.start_async()
+
     is_sync = args.sync or args.type == 'sim'
+    mode = args.mode or (MODE_SYNC if is_sync else None)
     protocol = args.protocol
 
+    options = dict(mode=mode, max_connections=args.max_connections, idle_timeout=args.idle_timeout,
+                   position_tick=args.position_tick, gpio=args.gpio, metrics_port=args.metrics_port,
+                   record=args.record, tracking=args.tracking)
+
     server = None
     try:
         if protocol == 'lx200':
-            server = ServerLX200(args.ip, args.port, args.type, is_sync)
+            server = ServerLX200(args.ip, args.port, args.type, is_sync, **options)
         elif protocol == 'nexstar':
-            server = ServerNexStar(args.ip, args.port, args.type, is_sync)
+            server = ServerNexStar(args.ip, args.port, args.type, is_sync, **options)
         else:
             raise ValueError(f"Неизвестный протокол: {protocol}")
 
@@ -36,6 +48,7 @@ def main():
     finally:
         if server is not None:
             server.stop()
+        AppLogger.stop_async()
 
 def _parse_args():
     parser = argparse.ArgumentParser(description='Запуск сервера монтировки')
@@ -57,6 +70,37 @@ def _parse_args():
     parser.add_argument('-s', '--sync', action=argparse.BooleanOptionalAction, default=False,
                         help="Синхронный режим (по умолчанию: False)")
 
+    parser.add_argument('-m', '--mode', type=str, default=None,
+                        choices=SERVE_MODES,
+                        help="Режим обслуживания клиентов: 'thread' - поток на клиента, 'sync' - по очереди, "
+                             "'async' - цикл событий asyncio (по умолчанию: thread, или sync при --sync)")
+
+    parser.add_argument('--max-connections', type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help=f'Максимум одновременных клиентов в режиме async (по умолчанию: {DEFAULT_MAX_CONNECTIONS})')
+
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help=f'Таймаут неактивного клиента в режиме async, сек (по умолчанию: {DEFAULT_IDLE_TIMEOUT})')
+
+    parser.add_argument('--position-tick', type=float, default=DEFAULT_TICK,
+                        help=f'Период пересчета ответа о положении для всех клиентов, сек (по умолчанию: {DEFAULT_TICK})')
+
+    parser.add_argument('-g', '--gpio', type=str, default=GPIO_OPI,
+                        choices=GPIO_BACKENDS,
+                        help="GPIO-библиотека для 'real': 'opi' - OPi.GPIO, 'gpiod' - libgpiod v2 (по умолчанию: opi)")
+
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Порт HTTP для метрик в формате Prometheus на 127.0.0.1 (по умолчанию: выключено)")
+
+    parser.add_argument('--record', type=str, default=None,
+                        help="Файл для записи сеансов клиентов (воспроизведение: python -m src.session_recorder)")
+
+    parser.add_argument('--tracking', action=argparse.BooleanOptionalAction, default=False,
+                        help="Сопровождение сразу при старте сервера, иначе - после первой команды режима "
+                             "сопровождения, синхронизации или GOTO (по умолчанию: False)")
+
+    parser.add_argument('--async-log', action=argparse.BooleanOptionalAction, default=True,
+                        help="Вывод лога через очередь в фоновом потоке (по умолчанию: True)")
+
     return parser.parse_args()
 
 
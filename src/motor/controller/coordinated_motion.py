@@ -0,0 +1,94 @@
+from src.motor.controller.step_motor_controller import StepMotorController
+from src.motor.pulse_engine import PulseEngine
+from src.utils.app_logger import AppLogger
+
+
+def bresenham(major, minor):
+    """Для каждого из major шагов ведущей оси - делает ли шаг ведомая ось (ровно minor раз, равномерно)"""
+    pattern = []
+    error = major // 2
+    for _ in range(major):
+        error -= minor
+        if error < 0:
+            error += major
+            pattern.append(True)
+        else:
+            pattern.append(False)
+    return pattern
+
+
+class CoordinatedMotion:
+    """
+    Согласованное движение двух осей по прямой из одного потока.
+
+    Ось с большим числом шагов ведущая, по ее профилю разгона строится общая шкала импульсов,
+    ведомая ось шагает на тех же фронтах по алгоритму Брезенхема. Обе оси трогаются
+    и останавливаются одновременно, при отмене тормозят вдоль той же прямой.
+    """
+
+    def __init__(self, motor_h: StepMotorController, motor_v: StepMotorController):
+        self.logger = AppLogger.info("Coordinated motion")
+        self.motors = (motor_h, motor_v)
+        self.pulses = PulseEngine(motor_h.gpio, motor_h.pins.step)
+        self.last_stats = None
+
+    def move_degrees(self, degrees_h, degrees_v, speed=5, cancel=None, carry=False):
+        """
+        Одновременный поворот обеих осей, возвращает фактически выполненные углы (h, v).
+
+        По умолчанию поворот считается от фактического положения осей (carry, см. StepMotorController.move_degrees).
+        """
+        motors = self.motors
+        with motors[0].lock, motors[1].lock:
+            # шаги считаются под блокировками: положение не изменится до начала движения
+            steps = [motor.plan_steps(degrees, carry) for motor, degrees in zip(motors, (degrees_h, degrees_v))]
+            counts = [abs(s) for s in steps]
+
+            major = 0 if counts[0] >= counts[1] else 1
+            minor = 1 - major
+            total = counts[major]
+
+            for motor, s in zip(motors, steps):
+                motor.begin_move(s)
+                motor.activate()
+
+            if total:
+                self._move(motors[major], motors[minor], total, counts[minor], speed, cancel)
+
+            executed = [motor.end_move() for motor in motors]
+            for motor in motors:
+                motor.deactivate()
+
+        return tuple(motor._calculate_degrees(s) for motor, s in zip(motors, executed))
+
+    def _move(self, lead, follower, total, follower_total, speed, cancel):
+        profile = lead.profile
+        delays = profile.delays(total, speed)
+
+        both = [lead.pins.step, follower.pins.step]
+        single = [lead.pins.step]
+        pattern = bresenham(total, follower_total)
+        pins = [both if step else single for step in pattern]
+
+        follower_done = []
+        done = 0
+        for step in pattern:
+            done += step
+            follower_done.append(done)
+
+        self.logger.info(f"Согласованное движение: {lead.axis} {total} шагов, {follower.axis} {follower_total} шагов, "
+                         f"расчетное время {profile.duration(total, speed):.2f} сек")
+
+        def on_step(n):
+            follower.advance(follower_done[n - 1])
+            lead.advance(n)
+
+        def on_cancel(delay):
+            stop = profile.stop_delays(delay, speed)
+            self.logger.info("Движение отменено на шаге %d/%d, торможение %d шагов", lead.steps_done, total, len(stop))
+            return stop
+
+        self.last_stats = self.pulses.run(delays, cancel, on_cancel, on_step, pins)
+        self.last_stats.record("+".join(motor.axis for motor in self.motors))
+        self.logger.info(f"Движение завершено: {lead.axis} {lead.steps_done}/{total}, "
+                         f"{follower.axis} {follower.steps_done}/{follower_total}. Точность импульсов: {self.last_stats}")
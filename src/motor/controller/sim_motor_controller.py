@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
-from typing import override
+try:
+    from typing import override
+except ImportError:  # Python < 3.12
+    from typing_extensions import override
 
 from src.motor.motor import Motor
 from src.motor.pins.a4988_motor_pins import A4988MotorPins
 from src.motor.controller.step_motor_controller import StepMotorController
 
+# поворот в симуляторе выполняется частями не больше этого угла, между ними проверяется отмена
+SIM_CHUNK_DEGREES = 1.0
+
 
 class SimMotorController(StepMotorController):
     """Контроллер для симулятора двигателя"""
@@ -12,11 +18,34 @@ class SimMotorController(StepMotorController):
         super().__init__(motor_params, pins, gpio_lib, axis, motor_index)
 
     @override
-    def move_degrees(self, degrees, speed=5):
-        """Поворот на заданное количество градусов"""
+    def move_degrees(self, degrees, speed=5, cancel=None, carry=True):
+        """
+        Поворот на заданное количество градусов, возвращает фактически выполненный поворот.
+
+        Вал в симуляторе поворачивается частями по SIM_CHUNK_DEGREES с учетом в счетчике шагов,
+        как у реального мотора: между частями проверяется отмена, прогресс движения виден
+        из других потоков. Блокировку мотора не берет - две оси могут двигаться из разных потоков.
+        """
+        steps = self.plan_steps(degrees, carry)
+        self.begin_move(steps)
+        if steps == 0 or (cancel is not None and cancel.is_set()):
+            return self._calculate_degrees(self.end_move())
+
         self.activate()
+        self.logger.info(f"Поворот по оси ({self.axis}) на {degrees:.2f}° ({abs(steps)} шагов)")
 
-        self.logger.info(f"Поворот по оси ({self.axis}) на {degrees:.2f}°")
-        self.gpio.kopis_motorsim.move_degrees(self.motor_index, degrees, speed)
+        chunk = max(1, round(SIM_CHUNK_DEGREES * self.steps_per_degree))
+        direction = 1 if steps > 0 else -1
+        done = 0
+        while done < abs(steps):
+            if cancel is not None and cancel.is_set():
+                self.logger.info(f"Поворот по оси ({self.axis}) отменен на шаге {done}/{abs(steps)}")
+                break
+            part = min(chunk, abs(steps) - done)
+            self.gpio.kopis_motorsim.move_degrees(self.motor_index, direction * self._calculate_degrees(part), speed)
+            done += part
+            self.advance(done)
 
         self.deactivate()
+
+        return self._calculate_degrees(self.end_move())
@@ -3,7 +3,9 @@
 import threading
 import time
 
+from src.motor.motion_profile import MotionProfile
 from src.motor.motor import Motor
+from src.motor.pulse_engine import PulseEngine, PULSES
 from src.motor.pins.a4988_motor_pins import A4988MotorPins
 from src.utils.app_logger import AppLogger
 
@@ -23,8 +25,8 @@ class StepMotorController:
         self.gpio.setwarnings(False)
         self.gpio.setmode(self.gpio.SUNXI)
 
-        # Блокировка для потокобезопасности
-        self.lock = threading.Lock()
+        # Блокировка для потокобезопасности, повторная: поворот можно рассчитать и выполнить под одной блокировкой
+        self.lock = threading.RLock()
 
         # Настройка пинов GPIO
         self.gpio.setup(self.pins.step, self.gpio.OUT)
@@ -48,6 +50,15 @@ class StepMotorController:
         # Инициализация микрошага
         self.microstep_divisor = 1  # Значение по умолчанию
 
+        # абсолютное положение оси в микрошагах - единственный источник истины, градусы считаются из него
+        self.position = 0
+        # заданное положение в микрошагах: дробная часть шага не теряется, а переносится в следующее движение
+        self._commanded = 0.0
+        # всего выполненных шагов, только растет (по нему видно, что ось сдвинулась)
+        self.steps_executed = 0
+        self._direction = -1  # пин DIR в LOW после инициализации
+        self._start_position = 0
+
         if self.pins.ms:
             self.gpio.setup(self.pins.ms[0], self.gpio.OUT)
 
@@ -61,73 +72,182 @@ class StepMotorController:
 
         self.is_active = False
 
+        # прогресс текущего движения, обновляется на каждом шаге
+        self.steps_done = 0
+        self.steps_total = 0
+
+        self._profile = None
+
+        # импульсы STEP по расчетному времени и статистика точности последнего движения
+        self.pulses = PulseEngine(self.gpio, self.pins.step)
+        self.last_stats = None
+
         self.logger.info(f"Инициализирован шаговый мотор '{self.motor_params.name}' с индексом '{self.motor_index}'")
 
+    @property
+    def profile(self) -> MotionProfile:
+        """Профиль разгона/торможения в импульсах с учетом текущего микрошага"""
+        if self._profile is None or self._profile_divisor != self.microstep_divisor:
+            self._profile = MotionProfile.for_motor(self.motor_params, self.microstep_divisor)
+            self._profile_divisor = self.microstep_divisor
+        return self._profile
+
     def set_microstep(self, divisor):
         """Установка микрошага"""
         if divisor in self.microstep_config and self.pins.ms:
             for pin, value in zip(self.pins.ms, self.microstep_config[divisor]):
                 self.gpio.output(pin, value)
+            # положение хранится в микрошагах, при смене микрошага пересчитываем его
+            scale = divisor / self.microstep_divisor
+            self.position = round(self.position * scale)
+            self._commanded *= scale
             self.microstep_divisor = divisor
             self.logger.info(f"Установлен микрошаг: 1/{divisor}")
         else:
             self.logger.info(f"Невозможно установить микрошаг 1/{divisor}")
 
-    def move_degrees(self, degrees, speed=5):
-        """Поворот на заданное количество градусов"""
+    def move_degrees(self, degrees, speed=5, cancel: threading.Event = None, carry=True):
+        """
+        Поворот на заданное количество градусов, возвращает фактически выполненный поворот в градусах.
+
+        carry - учитывать недошагнутый остаток предыдущих сдвигов; для поворота, рассчитанного
+        от текущего фактического положения (наведение), остаток не нужен.
+        """
         with self.lock:  # thread safety
             self.activate()
 
             # Расчет шагов с учетом микрошага
-            steps = self._calculate_steps(degrees)
+            steps = self.plan_steps(degrees, carry)
 
             direction = "по часовой" if steps >= 0 else "против часовой"
             self.logger.info(f"Поворот на {degrees}° ({abs(steps)} шагов, {direction})")
             self.logger.info(f"Микрошаг: 1/{self.microstep_divisor}, Скорость: {speed}")
 
-            self.move(steps, speed)
+            executed = self.move(steps, speed, cancel)
             self.deactivate()
 
-    def _calculate_steps(self, degrees):
-        steps = int((degrees / 360.0) * self.motor_params.steps_per_turn * self.microstep_divisor)
-        return steps
-
-    def move(self, steps, speed=5):
-        """Движение на указанное количество шагов"""
+            return self._calculate_degrees(executed)
+
+    @property
+    def steps_per_degree(self):
+        return self.motor_params.steps_per_turn * self.microstep_divisor / 360.0
+
+    @property
+    def position_degrees(self):
+        """Абсолютное положение оси в градусах (от положения при включении)"""
+        return self.position / self.steps_per_degree
+
+    def plan_steps(self, degrees, carry=True):
+        """Число шагов для поворота на degrees: до ближайшего к заданному положению микрошага"""
+        if not carry:
+            self._commanded = float(self.position)
+        self._commanded += degrees * self.steps_per_degree
+        return round(self._commanded) - self.position
+
+    def _calculate_degrees(self, steps):
+        return steps / self.steps_per_degree
+
+    def begin_move(self, steps):
+        """Начало движения на steps шагов: направление и учет прогресса"""
+        self._direction = 1 if steps >= 0 else -1
+        self._start_position = self.position
+        self.steps_done = 0
+        self.steps_total = abs(steps)
+        self.set_direction(self._direction)
+
+    def advance(self, done):
+        """Выполнено done шагов текущего движения"""
+        self.steps_executed += done - self.steps_done
+        self.position = self._start_position + self._direction * done
+        self.steps_done = done
+
+    def end_move(self):
+        """Конец движения, возвращает выполненные шаги со знаком направления"""
+        if self.steps_done < self.steps_total:
+            # движение прервано - заданным считается достигнутое положение
+            self._commanded = float(self.position)
+        return self.position - self._start_position
+
+    def move(self, steps, speed=5, cancel: threading.Event = None):
+        """
+        Движение на указанное количество шагов с разгоном и торможением по профилю мотора.
+
+        Если во время движения установлено событие cancel, мотор тормозит по профилю и останавливается.
+        Возвращает число фактически выполненных шагов со знаком направления.
+        """
         if steps == 0:
-            return
+            return 0
 
         speed = self.motor_params.max_speed if speed > self.motor_params.max_speed else speed
 
-        direction = 1 if steps >= 0 else -1
         steps_abs = abs(steps)
+        self.begin_move(steps)
 
-        # Установка направления
-        self.gpio.output(self.pins.dir, self.gpio.HIGH if direction > 0 else self.gpio.LOW)
+        # Расчет задержек
+        profile = self.profile
+        delays = profile.delays(steps_abs, speed)
 
-        # Расчет задержки
-        min_delay = 0.001  # Увеличил для надежности
-        max_delay = 0.02  # Увеличил для надежности
-        base_delay = max_delay - (speed - 1) * (max_delay - min_delay) / 9
-
-        self.logger.info(f"Задержка на шаг: {base_delay:.6f} сек")
+        self.logger.info(f"Задержка на шаг: {delays[0]:.6f}-{min(delays):.6f} сек, "
+                         f"расчетное время {profile.duration(steps_abs, speed):.2f} сек")
 
         start_time = time.time()
+        step_log = max(steps_abs // 10, 1)
 
-        # Генерация импульсов
-        for i in range(steps_abs):
-            self.gpio.output(self.pins.step, self.gpio.HIGH)
-            time.sleep(base_delay / 2)
-            self.gpio.output(self.pins.step, self.gpio.LOW)
-            time.sleep(base_delay / 2)
+        def on_step(done):
+            self.advance(done)
 
             # Прогресс каждые 10%
-            if steps_abs > 10 and i % (steps_abs // 10) == 0:
-                progress = (i / steps_abs) * 100
-                elapsed = time.time() - start_time
-                self.logger.info(f"Выполнено: {progress:.1f}% ({i}/{steps_abs} шагов, {elapsed:.2f} сек)")
+            if steps_abs > 10 and done % step_log == 0:
+                # вызывается между импульсами: сообщение собирается при выводе, а не здесь
+                self.logger.info("Выполнено: %.1f%% (%d/%d шагов, %.2f сек)",
+                                 done / steps_abs * 100, done, steps_abs, time.time() - start_time)
 
-        self.logger.info(f"Движение завершено. Время: {time.time() - start_time:.2f} сек")
+        def on_cancel(delay):
+            stop = profile.stop_delays(delay, speed)
+            self.logger.info("Движение отменено на шаге %d/%d, торможение %d шагов", self.steps_done, steps_abs, len(stop))
+            return stop
+
+        # Генерация импульсов
+        self.last_stats = self.pulses.run(delays, cancel, on_cancel, on_step)
+        self.last_stats.record(self.axis)
+
+        self.logger.info(f"Движение завершено: {self.steps_done}/{steps_abs} шагов. Время: {time.time() - start_time:.2f} сек")
+        self.logger.info(f"Точность импульсов: {self.last_stats}")
+
+        return self.end_move()
+
+    def track_steps(self, steps):
+        """
+        Короткая серия шагов сопровождения: без расчета профиля, на стартовой скорости мотора,
+        импульсы по расчетному времени через PulseEngine. Драйвер остается включенным
+        (сопровождение шагает постоянно), лог - только отладочный. Возвращает выполненные шаги.
+        """
+        if steps == 0:
+            return 0
+        with self.lock:
+            self.activate()
+            self.begin_move(steps)
+            stats = self.pulses.run([1.0 / self.profile.start_velocity] * abs(steps), on_step=self.advance)
+            self._commanded = float(self.position)
+            PULSES.labels(self.axis).inc(abs(steps))
+            self.logger.debug("Сопровождение: %+d шагов, %s", steps, stats)
+            return self.end_move()
+
+    def prepare_step(self, direction):
+        """Направление для шага, импульс которого выдается снаружи (ручное движение), до переднего фронта"""
+        if direction != self._direction:
+            self._direction = direction
+            self.set_direction(direction)
+
+    def count_step(self, direction):
+        """Учесть в счетчике положения шаг, импульс которого выдан снаружи"""
+        self.position += direction
+        self._commanded = float(self.position)
+        self.steps_executed += 1
+
+    def set_direction(self, direction):
+        """Установка направления вращения (direction >= 0 - по часовой)"""
+        self.gpio.output(self.pins.dir, self.gpio.HIGH if direction >= 0 else self.gpio.LOW)
 
     def activate(self):
         """Включение драйвера"""
@@ -153,3 +273,11 @@ class StepMotorController:
 
     def in_progress(self):
         return self.is_active
+
+    def progress(self) -> float:
+        """Доля выполненных шагов текущего (или последнего) движения, от 0 до 1"""
+        return self.steps_done / self.steps_total if self.steps_total else 0.0
+
+    def reset_progress(self):
+        self.steps_done = 0
+        self.steps_total = 0
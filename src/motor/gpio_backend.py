@@ -0,0 +1,122 @@
+import string
+
+GPIO_OPI = 'opi'      # OPi.GPIO, один вызов output() на каждый пин
+GPIO_GPIOD = 'gpiod'  # libgpiod v2, все линии одним запросом, фронты нескольких пинов одним set_values
+GPIO_BACKENDS = (GPIO_OPI, GPIO_GPIOD)
+
+# основной контроллер PIO (порты PA..PI) и R_PIO (PL, PM) у H6/H616 - разные gpiochip
+DEFAULT_CHIP = "/dev/gpiochip0"
+DEFAULT_R_CHIP = "/dev/gpiochip1"
+R_PORTS = "LM"
+
+LINES_PER_PORT = 32
+
+
+def load_gpio(backend=GPIO_OPI):
+    """GPIO-библиотека с интерфейсом OPi.GPIO для StepMotorController, ImportError если она не установлена"""
+    if backend == GPIO_GPIOD:
+        return GpiodGPIO()
+    if backend == GPIO_OPI:
+        import OPi.GPIO as GPIO
+        return GPIO
+    raise ValueError(f"Неизвестная GPIO-библиотека: {backend}")
+
+
+class GpiodGPIO:
+    """
+    GPIO через libgpiod v2 с интерфейсом OPi.GPIO (setmode/setup/output).
+
+    Все линии одного gpiochip запрашиваются одним request_lines, а output() со списком пинов
+    меняет их одним set_values (один ioctl), поэтому импульс STEP на обе оси - один системный вызов.
+    Пины задаются именами PXY (режим SUNXI) или номерами линий.
+    """
+    SUNXI = 'SUNXI'
+    BOARD = 'BOARD'
+    OUT = 'OUT'
+    IN = 'IN'
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self, chip=DEFAULT_CHIP, r_chip=DEFAULT_R_CHIP, consumer="astro_pi", gpiod_module=None):
+        if gpiod_module is None:
+            import gpiod as gpiod_module
+        self.gpiod = gpiod_module
+        self._active = gpiod_module.line.Value.ACTIVE
+        self._inactive = gpiod_module.line.Value.INACTIVE
+
+        self.chips = {'': chip, 'R': r_chip}
+        self.consumer = consumer
+
+        self._lines = {}     # пин -> (gpiochip, линия)
+        self._values = {}    # gpiochip -> {линия: значение}
+        self._requests = {}  # gpiochip -> LineRequest
+
+    @staticmethod
+    def line_offset(pin):
+        """Номер линии по имени пина: (позиция буквы порта в алфавите - 1) * 32 + номер пина"""
+        if isinstance(pin, int):
+            return pin
+        name = pin.upper()
+        if len(name) < 3 or name[0] != 'P' or name[1] not in string.ascii_uppercase or not name[2:].isdigit():
+            raise ValueError(f"Неверное имя пина: {pin}")
+        port = name[1]
+        base = 'L' if port in R_PORTS else 'A'
+        return (ord(port) - ord(base)) * LINES_PER_PORT + int(name[2:])
+
+    def _chip_for(self, pin):
+        if isinstance(pin, str) and pin[1:2].upper() in R_PORTS:
+            return self.chips['R']
+        return self.chips['']
+
+    def setwarnings(self, value):
+        pass
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, mode):
+        if mode != self.OUT:
+            raise ValueError(f"Поддерживаются только выходы: {pin}")
+        if pin in self._lines:
+            return
+
+        chip = self._chip_for(pin)
+        offset = self.line_offset(pin)
+        self._lines[pin] = (chip, offset)
+        self._values.setdefault(chip, {}).setdefault(offset, self._inactive)
+
+        # новую линию нельзя добавить в существующий запрос - запрашиваем линии чипа заново
+        request = self._requests.pop(chip, None)
+        if request is not None:
+            request.release()
+
+    def _request(self, chip):
+        request = self._requests.get(chip)
+        if request is None:
+            values = self._values[chip]
+            settings = self.gpiod.LineSettings(direction=self.gpiod.line.Direction.OUTPUT)
+            request = self._requests[chip] = self.gpiod.request_lines(
+                chip, consumer=self.consumer, config={tuple(values): settings}, output_values=dict(values))
+        return request
+
+    def output(self, pins, value):
+        """Установить значение одного пина или сразу нескольких (список/кортеж)"""
+        level = self._active if value else self._inactive
+        if not isinstance(pins, (list, tuple)):
+            pins = (pins,)
+
+        changes = {}
+        for pin in pins:
+            chip, offset = self._lines[pin]
+            changes.setdefault(chip, {})[offset] = level
+
+        for chip, lines in changes.items():
+            self._values[chip].update(lines)
+            self._request(chip).set_values(lines)
+
+    def cleanup(self, pin=None):
+        for request in self._requests.values():
+            request.release()
+        self._requests.clear()
+        self._lines.clear()
+        self._values.clear()
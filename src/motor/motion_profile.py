@@ -0,0 +1,82 @@
+import math
+
+# скорость, ниже которой разгон считается завершенным (доля от крейсерской)
+_RAMP_TOLERANCE = 0.01
+
+
+class MotionProfile:
+    """
+    Профиль движения шагового двигателя: разгон, движение с постоянной скоростью и торможение.
+
+    Все величины в импульсах STEP: скорость - имп/с, ускорение - имп/с², рывок - имп/с³.
+    Без рывка (jerk=None) получается трапеция, с рывком - S-кривая (ускорение нарастает плавно).
+    Без ускорения (acceleration=None) мотор сразу идет с крейсерской скоростью, как раньше.
+    Результат - задержки между импульсами, по одной на шаг.
+    """
+
+    def __init__(self, start_velocity, max_velocity, acceleration=None, jerk=None):
+        """Скорость, с которой мотор трогается без разгона"""
+        self.start_velocity = start_velocity
+        """Максимальная скорость (соответствует скорости 10)"""
+        self.max_velocity = max_velocity
+        self.acceleration = acceleration
+        self.jerk = jerk
+
+        self._ramps = {}
+
+    @classmethod
+    def for_motor(cls, motor_params, microstep_divisor=1):
+        """Профиль из параметров мотора (в полных шагах) для заданного микрошага"""
+        scale = microstep_divisor
+        return cls(motor_params.start_velocity * scale,
+                   motor_params.max_velocity * scale,
+                   motor_params.acceleration * scale if motor_params.acceleration else None,
+                   motor_params.jerk * scale if motor_params.jerk else None)
+
+    def cruise_velocity(self, speed) -> float:
+        """Крейсерская скорость для скорости 1..10 (линейно от стартовой до максимальной)"""
+        speed = min(max(speed, 1), 10)
+        return self.start_velocity + (self.max_velocity - self.start_velocity) * (speed - 1) / 9
+
+    def ramp(self, velocity) -> tuple:
+        """Задержки шагов разгона от стартовой скорости до velocity (торможение - в обратном порядке)"""
+        ramp = self._ramps.get(velocity)
+        if ramp is None:
+            ramp = self._ramps[velocity] = tuple(self._build_ramp(velocity))
+        return ramp
+
+    def _build_ramp(self, target):
+        if not self.acceleration or target <= self.start_velocity:
+            return
+
+        v = self.start_velocity
+        a = 0.0 if self.jerk else self.acceleration
+
+        while target - v > target * _RAMP_TOLERANCE:
+            dt = 1.0 / v
+            yield dt
+
+            if self.jerk:
+                # ускорение растет с рывком jerk и убывает так, чтобы к крейсерской скорости стать нулевым
+                a = min(a + self.jerk * dt, self.acceleration, math.sqrt(2 * self.jerk * (target - v)))
+            v = min(v + a * dt, target)
+
+    def delays(self, steps, speed) -> list:
+        """Задержки между импульсами для движения на steps шагов со скоростью speed (1..10)"""
+        steps = abs(steps)
+        velocity = self.cruise_velocity(speed)
+        ramp = self.ramp(velocity)
+
+        # на коротком движении не успеваем разогнаться: половина разгон, половина торможение
+        n = min(len(ramp), steps // 2)
+        cruise = ramp[n] if n < len(ramp) else 1.0 / velocity
+
+        return [*ramp[:n], *[cruise] * (steps - 2 * n), *reversed(ramp[:n])]
+
+    def stop_delays(self, delay, speed) -> list:
+        """Задержки торможения до остановки, если сейчас мотор идет с задержкой delay"""
+        return [d for d in reversed(self.ramp(self.cruise_velocity(speed))) if d > delay]
+
+    def duration(self, steps, speed) -> float:
+        """Расчетное время движения, сек"""
+        return math.fsum(self.delays(steps, speed))
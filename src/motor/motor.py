@@ -4,7 +4,8 @@
 class Motor:
     """Параметры шагового двигателя"""
 
-    def __init__(self, name, speed_variation_ratio, rotor_steps, rated_voltage, phase_resistance, max_speed):
+    def __init__(self, name, speed_variation_ratio, rotor_steps, rated_voltage, phase_resistance, max_speed,
+                 start_velocity=50.0, max_velocity=1000.0, acceleration=None, jerk=None):
         self.name = name
         """Коэффициент редукции"""
         self.speed_variation_ratio = speed_variation_ratio
@@ -16,6 +17,14 @@ class Motor:
         self.phase_resistance = phase_resistance
         """Максимальная скорость"""
         self.max_speed = max_speed
+        """Скорость, с которой мотор трогается и останавливается без разгона (полных шагов/с)"""
+        self.start_velocity = start_velocity
+        """Крейсерская скорость на максимальной скорости 10 (полных шагов/с)"""
+        self.max_velocity = max_velocity
+        """Ускорение разгона и торможения (полных шагов/с²), None - без разгона"""
+        self.acceleration = acceleration
+        """Рывок (полных шагов/с³), None - трапециевидный профиль вместо S-кривой"""
+        self.jerk = jerk
 
     @property
     def steps_per_turn(self):
@@ -15,6 +15,10 @@ MOTORS = {
         rotor_steps=200,  # 1.8 градуса на шаг
         rated_voltage=12.0,
         phase_resistance=2.8,
-        max_speed=200
+        max_speed=200,
+        start_velocity=50.0,
+        max_velocity=250.0,  # 1.25 оборота в секунду
+        acceleration=500.0,
+        jerk=5000.0
     )
 }
\ No newline at end of file
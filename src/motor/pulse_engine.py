@@ -0,0 +1,156 @@
+import itertools
+import math
+import time
+
+from src.utils.metrics import METRICS, DURATION_BUCKETS
+
+# за сколько до момента импульса перестаем спать и ждем активно (time.sleep просыпается с опозданием)
+SPIN_THRESHOLD = 0.001
+# не короче этого импульс STEP и пауза после него (A4988 - от 1 мкс, с запасом на задержки GPIO)
+MIN_PULSE = 0.00002
+
+PULSES = METRICS.counter('astropi_step_pulses_total', "Выданные импульсы STEP", ('axis',))
+MOVE_SECONDS = METRICS.histogram('astropi_move_seconds', "Длительность движения моторов", ('axis',),
+                                 DURATION_BUCKETS)
+MAX_LATENESS = METRICS.histogram('astropi_step_lateness_max_seconds',
+                                 "Наибольшее опоздание фронта STEP за движение", ('axis',))
+DRIFT = METRICS.histogram('astropi_move_drift_seconds', "Насколько движение оказалось дольше расчетного",
+                          ('axis',))
+
+
+class PulseStats:
+    """Статистика опоздания фронтов STEP относительно расчетного времени за одно движение, сек"""
+
+    def __init__(self, lateness, planned, elapsed):
+        ordered = sorted(lateness)
+        self.edges = len(ordered)
+        self.mean = math.fsum(ordered) / len(ordered) if ordered else 0.0
+        self.p99 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.99) - 1)] if ordered else 0.0
+        self.max = ordered[-1] if ordered else 0.0
+        """Расчетная и фактическая длительность движения"""
+        self.planned = planned
+        self.elapsed = elapsed
+
+    @property
+    def drift(self):
+        """Насколько движение оказалось дольше расчетного"""
+        return self.elapsed - self.planned
+
+    def record(self, axis):
+        """Учесть движение в метриках, вызывается после выдачи импульсов, а не между ними"""
+        PULSES.labels(axis).inc(self.edges // 2)
+        MOVE_SECONDS.labels(axis).observe(self.elapsed)
+        MAX_LATENESS.labels(axis).observe(self.max)
+        DRIFT.labels(axis).observe(self.drift)
+
+    def __str__(self):
+        return (f"фронтов {self.edges}, опоздание: среднее {self.mean * 1e6:.0f} мкс, "
+                f"p99 {self.p99 * 1e6:.0f} мкс, макс {self.max * 1e6:.0f} мкс, "
+                f"длительность {self.elapsed:.3f}/{self.planned:.3f} сек")
+
+
+class PulseEngine:
+    """
+    Генератор импульсов STEP по заранее рассчитанной временной шкале.
+
+    Моменты всех фронтов отсчитываются от начала движения по монотонным часам, поэтому
+    задержки планировщика и GIL на одном шаге не накапливаются: следующий фронт все равно
+    выдается в свое расчетное время. До SPIN_THRESHOLD перед фронтом поток спит,
+    остаток ждет активно, уступая GIL другим потокам.
+    """
+
+    def __init__(self, gpio, pin, clock=time.perf_counter, spin_threshold=SPIN_THRESHOLD):
+        self.gpio = gpio
+        self.pin = pin
+        self.clock = clock
+        self.spin_threshold = spin_threshold
+
+    @staticmethod
+    def timeline(delays, start=0.0):
+        """Абсолютные моменты передних фронтов для последовательности задержек между шагами"""
+        return list(itertools.accumulate(delays[:-1], initial=start)) if delays else []
+
+    def wait_until(self, deadline):
+        """Дождаться момента deadline, возвращает опоздание"""
+        remaining = deadline - self.clock()
+        if remaining > self.spin_threshold:
+            time.sleep(remaining - self.spin_threshold)
+        while True:
+            now = self.clock()
+            if now >= deadline:
+                return now - deadline
+            time.sleep(0)
+
+    def run(self, delays, cancel=None, stop=None, on_step=None, pins=None) -> PulseStats:
+        """
+        Выдать импульсы с задержками delays между передними фронтами (импульс - половина задержки).
+
+        Если установлено событие cancel, оставшиеся шаги заменяются на stop(текущая задержка) -
+        торможение до остановки. on_step(n) вызывается после каждого шага.
+        pins - для каждого шага список пинов STEP, на которые одновременно выдается импульс
+        (по умолчанию только pin этого генератора), список передается в gpio.output одним вызовом.
+        """
+        high, low = self.gpio.HIGH, self.gpio.LOW
+        single = [self.pin]
+        lateness = []
+
+        start = self.clock()
+        rises = self.timeline(delays, start)
+        cancelled = cancel is None
+
+        i = 0
+        while i < len(delays):
+            if not cancelled and cancel.is_set():
+                cancelled = True
+                tail = stop(delays[i]) if stop is not None else []
+                if len(tail) < len(delays) - i:
+                    delays = delays[:i] + tail
+                    rises = rises[:i] + self.timeline(tail, rises[i])
+                if i == len(delays):
+                    break
+
+            rise = rises[i]
+            step_pins = pins[i] if pins is not None else single
+
+            lateness.append(self.wait_until(rise))
+            self.gpio.output(step_pins, high)
+
+            lateness.append(self.wait_until(rise + delays[i] / 2))
+            self.gpio.output(step_pins, low)
+
+            i += 1
+            if on_step is not None:
+                on_step(i)
+
+        planned = rises[len(delays) - 1] + delays[-1] / 2 - start if delays else 0.0
+        return PulseStats(lateness, planned, self.clock() - start)
+
+    def stream(self, steps, on_step=None) -> PulseStats:
+        """
+        Импульсы по скользящей шкале: steps - итератор пар (задержка до следующего фронта, пины).
+
+        Следующая пара запрашивается после выдачи текущего импульса, поэтому шкалу можно
+        считать по ходу движения (ручное движение меняет скорость на лету). Моменты фронтов,
+        как и в run, отсчитываются от начала, задержки не накапливаются. Пустой список
+        пинов - только ожидание. Импульс - половина задержки, поэтому задержки короче
+        2 * MIN_PULSE итератор выдавать не должен. on_step(pins) вызывается после импульса.
+        """
+        high, low = self.gpio.HIGH, self.gpio.LOW
+        lateness = []
+
+        start = rise = end = self.clock()
+        for delay, pins in steps:
+            if pins:
+                lateness.append(self.wait_until(rise))
+                self.gpio.output(pins, high)
+                end = rise + delay / 2
+                lateness.append(self.wait_until(end))
+                self.gpio.output(pins, low)
+                if on_step is not None:
+                    on_step(pins)
+            else:
+                self.wait_until(rise)
+                end = rise
+            rise += delay
+
+        return PulseStats(lateness, end - start, self.clock() - start)
@@ -0,0 +1,160 @@
+import collections
+import queue
+import threading
+from concurrent.futures import Future
+
+from src.utils.app_logger import AppLogger
+
+DEFAULT_QUEUE_SIZE = 8
+
+GOTO = 'goto'  # поворот оси в абсолютный угол
+SLEW = 'slew'  # относительный сдвиг оси
+
+
+class AxisCommand:
+    """Команда движения одной оси"""
+
+    def __init__(self, kind, angle, speed):
+        self.kind = kind
+        self.angle = angle
+        self.speed = speed
+        self.cancel = threading.Event()
+        self.future = Future()
+
+    def __str__(self):
+        return f"{self.kind} {self.angle:+.4f}° (скорость {self.speed})"
+
+
+class AxisWorker:
+    """
+    Постоянный поток движения одной оси с ограниченной очередью команд.
+
+    Команды клиентов не двигают мотор в своем потоке, а ставятся в очередь оси и сразу
+    получают Future. Правила очереди:
+    - новый GOTO заменяет все ожидающие команды оси (они отменяются), выполняемую команду
+      он прерывает с торможением - ось едет к последней заданной цели;
+    - сдвиг с той же скоростью, что и последняя ожидающая команда-сдвиг, объединяется с ней:
+      углы складываются, оба вызова получают один и тот же Future;
+    - при заполненной очереди submit бросает queue.Full.
+    Движение выполняют goto(angle, speed, cancel) и slew(angle, speed, cancel) монтировки,
+    мотор оси они берут под его блокировку, поэтому согласованное движение обеих осей
+    и команды отдельных осей не перекрываются.
+    """
+
+    def __init__(self, name, goto, slew, maxsize=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.logger = AppLogger.info(name)
+        self.maxsize = maxsize
+        self._handlers = {GOTO: goto, SLEW: slew}
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._active = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def goto(self, angle, speed) -> Future:
+        """Поворот оси в абсолютный угол angle"""
+        return self.submit(GOTO, angle, speed)
+
+    def slew(self, angle, speed) -> Future:
+        """Сдвиг оси на angle градусов"""
+        return self.submit(SLEW, angle, speed)
+
+    def submit(self, kind, angle, speed) -> Future:
+        if kind not in self._handlers:
+            raise ValueError(f"Неизвестная команда оси: {kind}")
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Поток оси {self.name} остановлен")
+
+            if kind == GOTO:
+                replaced = self._drop_queued()
+                if self._active is not None:
+                    self._active.cancel.set()
+                if replaced:
+                    self.logger.info(f"Новый GOTO заменил {replaced} ожидающих команд")
+            elif self._queue and self._queue[-1].kind == SLEW and self._queue[-1].speed == speed:
+                last = self._queue[-1]
+                last.angle += angle
+                return last.future
+
+            if len(self._queue) >= self.maxsize:
+                raise queue.Full(f"Очередь оси {self.name} заполнена ({self.maxsize} команд)")
+
+            command = AxisCommand(kind, angle, speed)
+            self._queue.append(command)
+            self._condition.notify()
+            return command.future
+
+    def _drop_queued(self):
+        dropped = 0
+        while self._queue:
+            self._queue.popleft().future.cancel()
+            dropped += 1
+        return dropped
+
+    def cancel_pending(self) -> int:
+        """Снять с очереди ожидающие команды, возвращает их количество"""
+        with self._condition:
+            return self._drop_queued()
+
+    def cancel(self) -> int:
+        """Отменить ожидающие команды и остановить выполняемую, возвращает число снятых с очереди"""
+        with self._condition:
+            if self._active is not None:
+                self._active.cancel.set()
+            return self._drop_queued()
+
+    @property
+    def busy(self) -> bool:
+        """Есть выполняемая или ожидающие команды"""
+        return self._active is not None or bool(self._queue)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _next(self):
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+            command = self._active = self._queue.popleft()
+            return command
+
+    def _run(self):
+        while True:
+            command = self._next()
+            if command is None:
+                return
+            try:
+                if command.future.set_running_or_notify_cancel():
+                    try:
+                        result = self._handlers[command.kind](command.angle, command.speed, command.cancel)
+                    except Exception as e:
+                        self.logger.error(f"Ошибка команды {command}: {e}")
+                        command.future.set_exception(e)
+                    else:
+                        command.future.set_result(result)
+            finally:
+                with self._condition:
+                    self._active = None
+                    self._condition.notify_all()
+
+    def join(self, timeout=None) -> bool:
+        """Дождаться, пока очередь опустеет, возвращает False по таймауту"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self.busy, timeout)
+
+    def shutdown(self, wait=True):
+        with self._condition:
+            self._closed = True
+            self.cancel()
+            self._condition.notify_all()
+        if wait:
+            self._thread.join(timeout=5)
@@ -1,16 +1,34 @@
+import threading
+import time
+
+from src.motor.controller.coordinated_motion import CoordinatedMotion
+from src.motor.controller.step_motor_controller import StepMotorController
 from src.motor.motor import Motor
 from src.motor.pins.motor_pins import MotorPins
+from src.mount.axis_worker import AxisWorker
+from src.mount.manual_slew import ManualSlew
+from src.mount.motion_executor import MotionExecutor
 from src.mount.mount import Mount
+from src.mount.tracking_engine import TrackingEngine
 from src.mount.tracking_mode import TrackingMode
+from src.utils import astropi_utils
 from src.utils.app_logger import AppLogger
 from src.utils.location import SkyCoordinate, Location
+from src.utils.metrics import METRICS, DURATION_BUCKETS
 
 MAX_SPEED = 10
 HIGH_SPEED = 5
 MID_SPEED = 3
 LOW_SPEED = 1
 
+GOTO_SECONDS = METRICS.histogram('astropi_goto_seconds', "Длительность наведения", buckets=DURATION_BUCKETS)
+GOTO_RESULTS = METRICS.counter('astropi_goto_total', "Наведения по результату (done, cancelled, error)",
+                               ('result',))
+
 class MountController:
+    # скорость наведения, если она не задана командой
+    default_speed = MAX_SPEED
+
     def __init__(self, mount_params: Mount, motor_params: Motor, pins_h: MotorPins, pins_v: MotorPins,
                  motor_h_index: str, motor_v_index: str):
         self.logger = AppLogger.info(mount_params.name)
@@ -25,6 +43,16 @@ class MountController:
         self.motor_v = self.create_motor_v_controller(motor_params, self.pins_v, motor_v_index)
         self.motor_h = self.create_motor_h_controller(motor_params, self.pins_h, motor_h_index)
 
+        # шаговые моторы на одном GPIO двигаются вместе из потока движения, иначе - по очереди
+        self.coordinated = self.create_coordinated_motion()
+
+        # положение осей шаговых моторов считается из их счетчиков микрошагов (см. current)
+        self.step_tracking = isinstance(self.motor_h, StepMotorController) and isinstance(self.motor_v, StepMotorController)
+        # углы моторов при нулевых счетчиках, задаются синхронизацией
+        self._zero = SkyCoordinate.zero()
+
+        self._version = 0
+
         self.location = Location.zero_north_east()
 
         self.sync = SkyCoordinate.zero()
@@ -37,6 +65,70 @@ class MountController:
 
         self.goto_in_progress = False
 
+        # положение в начале и в конце текущего GOTO, по ним интерполируется положение во время движения
+        self._goto_start = None
+        self._goto_final = None
+
+        self.motion = MotionExecutor(f"{mount_params.name} motion")
+        # события отмены поставленных в очередь и выполняемых GOTO
+        self._cancel_events = set()
+        self._cancel_lock = threading.Lock()
+
+        # постоянные потоки команд отдельных осей (сдвиги и поворот одной оси)
+        self.axis_h = AxisWorker(f"{mount_params.name} H", self._goto_axis_h, self.slew_motor_h)
+        self.axis_v = AxisWorker(f"{mount_params.name} V", self._goto_axis_v, self.slew_motor_v)
+
+        # ручное движение с заданной скоростью (стрелки пульта)
+        self.slew = ManualSlew(self)
+
+        # компенсация вращения Земли по режиму params.tracking_mode, запускает сервер (см. Server.start_tracking)
+        self.tracking = TrackingEngine(self)
+
+    @property
+    def current(self) -> SkyCoordinate:
+        """Текущие углы моторов (для шаговых моторов - из счетчиков микрошагов, в том числе во время движения)"""
+        if self.step_tracking:
+            # мотор вертикали вращается против направления склонения
+            return SkyCoordinate(
+                astropi_utils.normalize_degrees_unsigned(self._zero.get_horizontal() + self.motor_h.position_degrees),
+                self._zero.get_vertical() - self.motor_v.position_degrees)
+        return self._current
+
+    @current.setter
+    def current(self, value: SkyCoordinate):
+        if self.step_tracking:
+            # моторы не двигаются, сдвигается только отсчет
+            self._zero = SkyCoordinate(value.get_horizontal() - self.motor_h.position_degrees,
+                                       value.get_vertical() + self.motor_v.position_degrees)
+        else:
+            self._current = value
+        self.position_changed()
+
+    @property
+    def position_version(self) -> int:
+        """Растет при любом изменении положения или места наблюдения, по нему сбрасываются кэши ответов"""
+        if self.step_tracking:
+            return self._version + self.motor_h.steps_executed + self.motor_v.steps_executed
+        return self._version
+
+    @property
+    def location(self) -> Location:
+        return self._location
+
+    @location.setter
+    def location(self, value: Location):
+        self._location = value
+        self.position_changed()
+
+    @property
+    def busy(self) -> bool:
+        """Монтировка выполняет или ждет выполнения какого-либо движения"""
+        return self.goto_in_progress or self.motion.busy or self.axis_h.busy or self.axis_v.busy
+
+    def position_changed(self):
+        """Отметить изменение положения (сбрасывает кэшированные ответы о координатах)"""
+        self._version += 1
+
     def set_sync(self, target: SkyCoordinate):
         self.current = SkyCoordinate(target.get_horizontal(), target.get_vertical())
 
@@ -49,52 +141,203 @@ class MountController:
     def create_motor_h_controller(self, motor_params, pins, motor_index):
         raise NotImplementedError("Мотор горизонтали не проинициализирован")
 
+    def create_coordinated_motion(self):
+        if (isinstance(self.motor_h, StepMotorController) and isinstance(self.motor_v, StepMotorController)
+                and self.motor_h.gpio is self.motor_v.gpio):
+            return CoordinatedMotion(self.motor_h, self.motor_v)
+        return None
+
     def get_mount_tracking_type(self) -> TrackingMode:
         return self.params.tracking_mode
 
-    def goto(self, target: SkyCoordinate, speed=MAX_SPEED):
+    def set_tracking_mode(self, mode: TrackingMode):
+        """Режим сопровождения, OFF - моторы стоят"""
+        self.params.tracking_mode = TrackingMode(mode)
+        self.logger.info(f"Режим сопровождения: {self.params.tracking_mode.name}")
+
+    def goto(self, target: SkyCoordinate, speed=None, cancel: threading.Event = None):
+        if speed is None:
+            speed = self.default_speed
+        started = time.perf_counter()
+        result = 'error'
         try:
             self.logger.info(f"Инициализация поворота: по вертикали: {target.get_vertical():.4f}°, по горизонтали: {target.get_horizontal():.4f}°")
 
             self.goto_in_progress = True
-            self.move_motor_v(target.get_vertical(), speed)
-            self.move_motor_h(target.get_horizontal(), speed)
+            self.move_motors(target, speed, cancel)
 
+            result = 'cancelled' if cancel is not None and cancel.is_set() else 'done'
             self.logger.info("Оба двигателя завершили движение")
         except ValueError:
             self.logger.error("Ошибка ввода! Попробуйте снова.")
         except KeyboardInterrupt:
+            result = 'cancelled'
             self.logger.warn("Прервано пользователем")
         finally:
             self.goto_in_progress = False
+            GOTO_SECONDS.observe(time.perf_counter() - started)
+            GOTO_RESULTS.labels(result).inc()
 
         return self.current
 
-    def move_motor_v(self, angle, speed=HIGH_SPEED):
+    def move_motors(self, target: SkyCoordinate, speed=MAX_SPEED, cancel: threading.Event = None):
+        """Поворот обоих моторов на углы target, вызывается из goto"""
+        if self.coordinated is not None:
+            self.coordinated.move_degrees(target.get_horizontal(), target.get_vertical(), speed, cancel)
+            self.position_changed()
+        else:
+            self.move_motor_v(target.get_vertical(), speed, cancel)
+            self.move_motor_h(target.get_horizontal(), speed, cancel)
+
+    def goto_position(self, target: SkyCoordinate, speed=None):
+        """
+        Неблокирующее наведение моторов в абсолютное положение target (углы моторов).
+
+        Относительный поворот считается в момент начала движения от фактического положения.
+        Новое наведение прерывает выполняемое (с торможением) и снимает ожидающие, поэтому
+        при нескольких GOTO подряд монтировка едет к последней цели. Возвращает Future.
+        """
+        self.slew.stop()  # ручное движение затормозит, наведение начнется после него
+        # новая цель заменяет прежние: ожидающие GOTO снимаются, выполняемое тормозит,
+        # команды отдельных осей тоже отменяются
+        cancel = threading.Event()
+        with self._cancel_lock:
+            for event in self._cancel_events:
+                event.set()
+            self._cancel_events.add(cancel)
+        self.motion.cancel_pending()
+        self.axis_h.cancel()
+        self.axis_v.cancel()
+
+        self.goto_in_progress = True
+        future = self.motion.submit(self._goto_position, target, speed, cancel)
+        future.add_done_callback(lambda _: self._goto_done(cancel))
+        return future
+
+    def _goto_done(self, cancel: threading.Event):
+        with self._cancel_lock:
+            self._cancel_events.discard(cancel)
+            if not self._cancel_events:
+                self.goto_in_progress = False
+
+    def cancel_goto(self):
+        """
+        Отмена наведения: ожидающие GOTO снимаются с очереди, выполняемое тормозит и останавливается.
+        Текущее положение после остановки соответствует фактически выполненным шагам.
+        """
+        with self._cancel_lock:
+            events = list(self._cancel_events)
+        for event in events:
+            event.set()
+        self.slew.stop()
+        self.motion.cancel_pending()
+        self.axis_h.cancel()
+        self.axis_v.cancel()
+
+        if events:
+            self.logger.info("Наведение отменено")
+
+    def _goto_position(self, target: SkyCoordinate, speed=None, cancel: threading.Event = None):
+        if cancel is not None and cancel.is_set():
+            return self.current
+
+        # поворот считается и выполняется под блокировками обеих осей: команды отдельных осей не вклиниваются
+        with self.motor_h.lock, self.motor_v.lock:
+            return self._goto_locked(target, speed, cancel)
+
+    def _goto_locked(self, target: SkyCoordinate, speed, cancel):
+        start = SkyCoordinate(self.current.get_horizontal(), self.current.get_vertical())
+
+        # кратчайший путь через 0°/360°, мотор вертикали вращается против направления склонения
+        delta_h = astropi_utils.normalize_degrees_signed(target.get_horizontal() - start.get_horizontal())
+        delta_v = astropi_utils.normalize_degrees_signed(start.get_vertical() - target.get_vertical())
+
+        self.logger.info(f"Текущие углы моторов: H={start.get_horizontal():.4f}°, V={start.get_vertical():.4f}°")
+        self.logger.info(f"Целевые углы моторов: H={target.get_horizontal():.4f}°, V={target.get_vertical():.4f}°")
+        self.logger.info(f"Относительный поворот: H={delta_h:.4f}°, V={delta_v:.4f}°")
+
+        self.motor_h.reset_progress()
+        self.motor_v.reset_progress()
+        self._goto_start, self._goto_final = start, target
+        try:
+            self.goto(SkyCoordinate(delta_h, delta_v), speed, cancel)
+            # после отмены остаемся там, куда фактически довели моторы
+            stopped = self.get_position() if cancel is not None and cancel.is_set() else target
+        finally:
+            self._goto_start = self._goto_final = None
+
+        if self.step_tracking:
+            # положение уже в счетчиках моторов, с точностью до микрошага
+            self.position_changed()
+        else:
+            self.current = SkyCoordinate(stopped.get_horizontal(), stopped.get_vertical())
+        return self.current
+
+    def get_position(self) -> SkyCoordinate:
+        """Текущие углы моторов, во время GOTO - по числу уже выполненных шагов"""
+        start, final = self._goto_start, self._goto_final
+        if self.step_tracking or start is None or final is None:
+            return self.current
+
+        h = start.get_horizontal() + self.motor_h.progress() * astropi_utils.normalize_degrees_signed(
+            final.get_horizontal() - start.get_horizontal())
+        v = start.get_vertical() + self.motor_v.progress() * (final.get_vertical() - start.get_vertical())
+        return SkyCoordinate(astropi_utils.normalize_degrees_unsigned(h), v)
+
+    def _goto_axis_h(self, angle, speed, cancel: threading.Event = None):
+        """Поворот мотора горизонтали в абсолютный угол angle кратчайшим путем (команда потока оси)"""
+        with self.motor_h.lock:
+            delta = astropi_utils.normalize_degrees_signed(angle - self.current.get_horizontal())
+            self.slew_motor_h(delta, speed, cancel, carry=False)
+        return self.current.get_horizontal()
+
+    def _goto_axis_v(self, angle, speed, cancel: threading.Event = None):
+        """Поворот мотора вертикали в абсолютный угол angle (команда потока оси)"""
+        with self.motor_v.lock:
+            # мотор вертикали вращается против направления склонения
+            delta = self.current.get_vertical() - angle
+            if self.step_tracking:
+                self.slew_motor_v(delta, speed, cancel, carry=False)
+            else:
+                moved = self.motor_v.move_degrees(delta, speed, cancel, carry=False)
+                self.current = SkyCoordinate(self.current.get_horizontal(), self.current.get_vertical() - moved)
+        return self.current.get_vertical()
+
+    def move_motor_v(self, angle, speed=HIGH_SPEED, cancel: threading.Event = None):
         """Функция для движения двигателя по вертикали"""
         if speed <= 0:
             return
-        self.motor_v.move_degrees(angle, speed)
-        self.current.dec_alt_v = angle
+        self.motor_v.move_degrees(angle, speed, cancel, carry=False)
+        if not self.step_tracking:
+            self.current.dec_alt_v = angle
+        self.position_changed()
 
-    def move_motor_h(self, angle, speed=HIGH_SPEED):
+    def move_motor_h(self, angle, speed=HIGH_SPEED, cancel: threading.Event = None):
         """Функция для движения двигателя по горизонтали"""
         if speed <= 0:
             return
-        self.motor_h.move_degrees(angle, speed)
-        self.current.ra_az_h = angle
+        self.motor_h.move_degrees(angle, speed, cancel, carry=False)
+        if not self.step_tracking:
+            self.current.ra_az_h = angle
+        self.position_changed()
 
 
-    def slew_motor_v(self, angle, speed=HIGH_SPEED):
+    def slew_motor_v(self, angle, speed=HIGH_SPEED, cancel: threading.Event = None, carry=True):
         """Функция для сдвига двигателя по вертикали"""
         if speed <= 0:
             return
-        self.motor_v.move_degrees(angle, speed)
-        self.current.dec_alt_v += angle
+        moved = self.motor_v.move_degrees(angle, speed, cancel, carry)
+        if not self.step_tracking:
+            self.current.dec_alt_v += moved
+        self.position_changed()
+        return moved
 
-    def slew_motor_h(self, angle, speed=HIGH_SPEED):
+    def slew_motor_h(self, angle, speed=HIGH_SPEED, cancel: threading.Event = None, carry=True):
         """Функция для сдвига двигателя по горизонтали"""
         if speed <= 0:
             return
-        self.motor_h.move_degrees(angle, speed)
-        self.current.ra_az_h += angle
+        moved = self.motor_h.move_degrees(angle, speed, cancel, carry)
+        if not self.step_tracking:
+            self.current.ra_az_h += moved
+        self.position_changed()
+        return moved
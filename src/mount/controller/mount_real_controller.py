@@ -1,12 +1,11 @@
 import sys
-import threading
 
+from src.motor.gpio_backend import GPIO_OPI, load_gpio
 from src.motor.motor import Motor
 from src.motor.pins.a4988_motor_pins import A4988MotorPins
 from src.mount.controller.mount_controller import MountController
 from src.mount.mount import Mount
 from src.mount.tracking_mode import TrackingMode
-from src.utils.location import SkyCoordinate
 
 MAX_SPEED = 2
 HIGH_SPEED = 5
@@ -27,7 +26,14 @@ PIN_MS_ALL_DEC = "PL3"    # 10 сиреневый
 
 
 class MountRealController(MountController):
-    def __init__(self, mount_params: Mount, motor_params: Motor, motor_h_index, motor_v_index):
+    # GOTO без заданной скорости: обе оси согласованно (CoordinatedMotion) на скорости MAX_SPEED
+    default_speed = MAX_SPEED
+
+    def __init__(self, mount_params: Mount, motor_params: Motor, motor_h_index, motor_v_index, gpio_backend=GPIO_OPI):
+        # одна GPIO-библиотека на оба мотора, создается при создании первого мотора
+        self.gpio_backend = gpio_backend
+        self.gpio = None
+
         super().__init__(mount_params, motor_params,
                          A4988MotorPins(PIN_STEP_RA, PIN_DIR_RA, PIN_ENABLE_RA, [PIN_MS_ALL_RA, PIN_MS_ALL_RA, PIN_MS_ALL_RA]),
                          A4988MotorPins(PIN_STEP_DEC, PIN_DIR_DEC, PIN_ENABLE_DEC, [PIN_MS_ALL_DEC, PIN_MS_ALL_DEC, PIN_MS_ALL_DEC]),
@@ -46,41 +52,13 @@ class MountRealController(MountController):
         return self.create_motor_controller(axis, motor_params, pins, motor_index)
 
     def create_motor_controller(self, axis, motor_params, pins, motor_index=None):
-            self.logger.info("Выбран реальный тип контроллера A4988")
+            self.logger.info(f"Выбран реальный тип контроллера A4988 (GPIO: {self.gpio_backend})")
             try:
-                import OPi.GPIO as GPIO
+                if self.gpio is None:
+                    self.gpio = load_gpio(self.gpio_backend)
                 from src.motor.controller.step_motor_controller import StepMotorController
-                return StepMotorController(motor_params, pins, GPIO, axis)
+                return StepMotorController(motor_params, pins, self.gpio, axis)
             except ImportError as e:
                 self.logger.error(
-                    "Ошибка: A4988 контроллер недоступен. Убедитесь, что установлены зависимости (например, OPi.GPIO) или запуститесь в режиме симуляции")
+                    "Ошибка: A4988 контроллер недоступен. Убедитесь, что установлены зависимости (OPi.GPIO или gpiod) или запуститесь в режиме симуляции")
                 sys.exit(1)
-
-    def goto(self, target: SkyCoordinate, speed=MAX_SPEED):
-        try:
-            self.logger.info(
-                f"Инициализация поворота: по вертикали: {target.get_vertical():.4f}°, по горизонтали: {target.get_horizontal():.4f}°")
-
-            self.goto_in_progress = True
-
-            # Создаем потоки для каждого двигателя
-            thread_ra = threading.Thread(target=super().move_motor_h, args=(target.get_horizontal(), speed))
-            thread_dec = threading.Thread(target=super().move_motor_v, args=(target.get_vertical(), speed))
-
-            # Запускаем потоки одновременно
-            thread_ra.start()
-            thread_dec.start()
-
-            # Ждем завершения обоих потоков
-            thread_ra.join()
-            thread_dec.join()
-
-            self.logger.info("Оба двигателя завершили движение")
-        except ValueError:
-            self.logger.error("Ошибка ввода! Попробуйте снова.")
-        except KeyboardInterrupt:
-            self.logger.warn("Прервано пользователем")
-        finally:
-            self.goto_in_progress = False
-
-        return self.current
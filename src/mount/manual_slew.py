@@ -0,0 +1,170 @@
+import math
+import threading
+from concurrent import futures
+
+from src.motor.pulse_engine import MIN_PULSE
+from src.utils.app_logger import AppLogger
+
+AXIS_H = 0  # Ra/Az
+AXIS_V = 1  # Dec/Alt
+
+MAX_WAIT = 0.05     # секунд, не дольше этого скорость не пересчитывается
+SLEW_CHUNK = 0.25   # секунд движения за один сдвиг, если моторы не шаговые (симулятор)
+CHUNK_SPEED = 5
+
+
+class ManualSlew:
+    """
+    Ручное движение осей с заданной скоростью (стрелки пульта) до команды остановки.
+
+    set_rate только меняет скорость оси и сразу возвращается. Шаги генерирует задание
+    в потоке движения монтировки: скорость каждой оси плавно (с ускорением из профиля мотора)
+    подходит к заданной, импульсы выдает PulseEngine по расчетному времени, задание
+    завершается, когда обе оси остановились.
+    Скорости в градусах в секунду в углах монтировки, знак - направление.
+    """
+
+    def __init__(self, mount):
+        self.logger = AppLogger.info("Manual slew")
+        self.mount = mount
+
+        self._rates = [0.0, 0.0]
+        self._lock = threading.Lock()
+        self._future = None
+        self._running = False  # задание поставлено и еще не решило завершиться
+
+    @property
+    def active(self) -> bool:
+        future = self._future
+        return future is not None and not future.done()
+
+    def rate(self, axis) -> float:
+        return self._rates[axis]
+
+    def set_rate(self, axis, rate):
+        """Скорость оси axis в град/с, 0 - остановка оси"""
+        with self._lock:
+            self._rates[axis] = rate
+            if rate and not self._running:
+                self._running = True
+                future = self._future = self.mount.motion.submit(self._run)
+                future.add_done_callback(self._done)
+
+    def _done(self, future):
+        # задание могли снять с очереди (отмена GOTO) до запуска
+        with self._lock:
+            if self._future is future:
+                self._running = False
+
+    def _finish(self) -> bool:
+        """Завершить задание, если за это время не задали новую скорость"""
+        with self._lock:
+            if any(self._rates):
+                return False
+            self._running = False
+            return True
+
+    def stop(self):
+        """Остановить обе оси (с торможением), возвращает Future задания или None"""
+        with self._lock:
+            self._rates = [0.0, 0.0]
+        return self._future if self.active else None
+
+    def _targets(self):
+        with self._lock:
+            return list(self._rates)
+
+    def _run(self):
+        self.logger.info(f"Ручное движение: H {self._rates[AXIS_H]:+.4f}°/с, V {self._rates[AXIS_V]:+.4f}°/с")
+        if self.mount.step_tracking and self.mount.coordinated is not None:
+            self._run_steps()
+        else:
+            self._run_chunks()
+        self.logger.info("Ручное движение остановлено")
+
+    def _run_steps(self):
+        """Шаговые моторы на одном GPIO: импульсы обеих осей по скользящей шкале PulseEngine"""
+        mount = self.mount
+        # мотор вертикали вращается против направления оси V
+        axes = ((mount.motor_h, 1), (mount.motor_v, -1))
+        fired = []  # (мотор, направление) шагов текущего импульса
+
+        def on_step(pins):
+            for motor, direction in fired:
+                motor.count_step(direction)
+
+        with mount.motor_h.lock, mount.motor_v.lock:
+            for motor, _ in axes:
+                motor.activate()
+            try:
+                stats = mount.coordinated.pulses.stream(self._pulses(axes, fired), on_step)
+                self.logger.info(f"Точность импульсов: {stats}")
+            finally:
+                for motor, _ in axes:
+                    motor.deactivate()
+
+    def _pulses(self, axes, fired):
+        """
+        Скользящая шкала импульсов: (задержка до следующего фронта, пины STEP) по текущим скоростям.
+
+        Скорость каждой оси подходит к заданной с ускорением профиля, момент следующего шага
+        считается по пройденной доле шага. Шаги осей, которые приходятся ближе 2 * MIN_PULSE
+        друг к другу, выдаются одним импульсом, поэтому импульс и пауза не короче MIN_PULSE.
+        Без шагов шкала проверяет заданную скорость не реже раза в MAX_WAIT.
+        """
+        velocity = [0.0, 0.0]  # имп/с со знаком направления мотора
+        phase = [0.0, 0.0]     # доля шага, пройденная с последнего импульса
+        window = 2 * MIN_PULSE
+        dt = 0.0
+        while True:
+            targets = self._targets()
+            fired.clear()
+            pins = []
+            for i, (motor, sign) in enumerate(axes):
+                target = targets[i] * sign * motor.steps_per_degree
+                velocity[i] = self._approach(velocity[i], target, motor.profile, dt)
+                phase[i] += velocity[i] * dt
+                # шаг, если доля дошла до целого или дойдет в пределах окна объединения
+                if abs(phase[i]) >= 1.0 or (phase[i] * velocity[i] > 0
+                                            and abs(phase[i]) >= 1.0 - abs(velocity[i]) * window):
+                    direction = 1 if phase[i] > 0 else -1
+                    motor.prepare_step(direction)
+                    fired.append((motor, direction))
+                    pins.append(motor.pins.step)
+                    phase[i] -= direction
+
+            if not pins and not any(targets) and not any(velocity) and self._finish():
+                return
+
+            dt = MAX_WAIT
+            for v, p in zip(velocity, phase):
+                if v:
+                    dt = min(dt, (1.0 - p * math.copysign(1.0, v)) / abs(v))
+            dt = max(dt, window)
+            yield dt, pins
+
+    @staticmethod
+    def _approach(velocity, target, profile, dt):
+        """Новая скорость: к target не быстрее ускорения профиля, ниже стартовой скорости - сразу"""
+        if not profile.acceleration:
+            return target
+        limit = profile.acceleration * dt
+        new = velocity + max(-limit, min(limit, target - velocity))
+        if abs(new) < profile.start_velocity:
+            # мотор трогается и останавливается на стартовой скорости без разгона
+            new = target if abs(target) < profile.start_velocity else math.copysign(profile.start_velocity, target)
+        return new
+
+    def _run_chunks(self):
+        """Для моторов без счетчика шагов (симулятор): сдвиги осей на SLEW_CHUNK секунд движения"""
+        while True:
+            rate_h, rate_v = self._targets()
+            if not rate_h and not rate_v and self._finish():
+                break
+            # сдвиги идут через очереди осей, оси двигаются одновременно
+            chunks = []
+            if rate_h:
+                chunks.append(self.mount.axis_h.slew(rate_h * SLEW_CHUNK, CHUNK_SPEED))
+            if rate_v:
+                chunks.append(self.mount.axis_v.slew(-rate_v * SLEW_CHUNK, CHUNK_SPEED))
+            futures.wait(chunks)
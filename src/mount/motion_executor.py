@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.utils.app_logger import AppLogger
+
+
+class MotionExecutor:
+    """
+    Фоновый поток движения монтировки.
+
+    Команды движения (GOTO) выполняются здесь, а не в потоке обработки команд клиента,
+    поэтому сервер сразу отвечает на команду и продолжает отвечать на опросы (L, e/E, M)
+    во время наведения. Задания выполняются строго по очереди.
+    """
+
+    def __init__(self, name="motion"):
+        self.name = name
+        self.logger = AppLogger.info(name)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._futures = set()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Поставить задание в очередь, возвращает Future с результатом fn"""
+        with self._lock:
+            self._pending += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            self._futures.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Ошибка задания движения: {future.exception()}")
+
+    @property
+    def busy(self) -> bool:
+        """Есть выполняемые или ожидающие задания"""
+        return self._pending > 0
+
+    def cancel_pending(self) -> int:
+        """Снять с очереди еще не начатые задания, возвращает их количество"""
+        with self._lock:
+            futures = list(self._futures)
+        return sum(1 for future in futures if future.cancel())
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
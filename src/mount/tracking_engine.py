@@ -0,0 +1,212 @@
+import math
+import threading
+import time
+
+from src.mount.tracking_mode import TrackingMode
+from src.utils import astropi_utils
+from src.utils.app_logger import AppLogger
+from src.utils.location import SkyCoordinate
+
+SIDEREAL_DAY = 86164.0905                # секунд
+SIDEREAL_RATE = 360.0 / SIDEREAL_DAY     # град/с, ~15.04"/с
+DEFAULT_MAX_WAIT = 1.0                   # секунд, не дольше этого движение не проверяется
+MAX_TRACK_STEPS = 16                     # шагов на ось за один такт, большее отставание - не сопровождение
+
+# мотор азимута повернут на 180° относительно азимута от севера (см. ServerNexStar.goto_az_alt)
+ALT_AZ_MOTOR_OFFSET = 180.0
+
+
+def horizontal_to_equatorial(az, alt, lat):
+    """Азимут (от севера к востоку) и высота -> часовой угол и склонение, градусы"""
+    az, alt, lat = math.radians(az), math.radians(alt), math.radians(lat)
+    dec = math.asin(math.sin(alt) * math.sin(lat) + math.cos(alt) * math.cos(lat) * math.cos(az))
+    ha = math.atan2(-math.sin(az) * math.cos(alt),
+                    math.sin(alt) * math.cos(lat) - math.cos(alt) * math.sin(lat) * math.cos(az))
+    return math.degrees(ha), math.degrees(dec)
+
+
+def equatorial_to_horizontal(ha, dec, lat):
+    """Часовой угол и склонение -> азимут (от севера к востоку) и высота, градусы"""
+    ha, dec, lat = math.radians(ha), math.radians(dec), math.radians(lat)
+    alt = math.asin(math.sin(dec) * math.sin(lat) + math.cos(dec) * math.cos(lat) * math.cos(ha))
+    az = math.atan2(-math.sin(ha) * math.cos(dec),
+                    math.sin(dec) * math.cos(lat) - math.cos(dec) * math.sin(lat) * math.cos(ha))
+    return astropi_utils.normalize_degrees_unsigned(math.degrees(az)), math.degrees(alt)
+
+
+class TrackingStats:
+    """Точность сопровождения с момента последнего наведения или синхронизации"""
+
+    def __init__(self, elapsed, steps, error_h, error_v, rate_error):
+        self.elapsed = elapsed
+        self.steps = steps
+        """Отставание осей от расчетного положения, угловые секунды"""
+        self.error_h = error_h
+        self.error_v = error_v
+        """Относительная ошибка скорости по горизонтальной оси (фактический сдвиг / расчетный - 1)"""
+        self.rate_error = rate_error
+
+    def __str__(self):
+        return (f"сопровождение {self.elapsed:.0f} сек, {self.steps} шагов, отставание H {self.error_h:+.1f}\", "
+                f"V {self.error_v:+.1f}\", ошибка скорости {self.rate_error * 1e6:+.0f} ppm")
+
+
+class TrackingEngine:
+    """
+    Сопровождение объекта: компенсация вращения Земли в фоновом потоке.
+
+    От положения после наведения (или синхронизации) рассчитывается, где должны быть оси
+    в каждый момент: на экваториальной монтировке растет только часовой угол (ось RA),
+    на азимутальной положение пересчитывается через часовой угол и склонение, поэтому
+    скорости обеих осей меняются вместе с положением объекта. Когда ось отстает
+    на полшага, делается шаг, следующий шаг планируется по текущей скорости оси.
+    Шаги идут через счетчики моторов (track_steps: импульсы PulseEngine на стартовой
+    скорости, без профиля и без INFO-лога), поэтому сразу учитываются в положении монтировки.
+    Во время GOTO сопровождение приостанавливается, после любого внешнего движения
+    (в том числе во время шагов сопровождения) отсчет начинается заново от нового положения.
+    За такт ось делает не больше MAX_TRACK_STEPS шагов, большее отставание не догоняется.
+    """
+
+    def __init__(self, mount, clock=time.monotonic, rate=SIDEREAL_RATE, max_wait=DEFAULT_MAX_WAIT):
+        self.logger = AppLogger.info("Tracking")
+        self.mount = mount
+        self.clock = clock
+        self.rate = rate
+        self.max_wait = max_wait
+
+        self._thread = None
+        self._stop = threading.Event()
+
+        self._anchor_time = None
+        self._anchor = None
+        self._version = None
+        self.steps = 0
+
+    @property
+    def mode(self) -> TrackingMode:
+        return self.mount.get_mount_tracking_type()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tracking", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._anchor is not None:
+            self.logger.info(f"Сопровождение остановлено: {self.stats()}")
+            self._anchor = None
+            self._release()
+
+    def _release(self):
+        """Выключить драйверы, которые сопровождение держало включенными"""
+        if not self.mount.step_tracking:
+            return
+        for motor in (self.mount.motor_h, self.mount.motor_v):
+            with motor.lock:
+                motor.deactivate()
+
+    def _run(self):
+        self.logger.info(f"Сопровождение запущено: {self.mode.name}")
+        while not self._stop.wait(self.tick()):
+            pass
+
+    def _latitude(self):
+        location = self.mount.location
+        lat = location.lat.decimal()
+        return -lat if location.north_south == 1 else lat
+
+    def desired(self, now) -> SkyCoordinate:
+        """Углы моторов, в которых объект остается на месте, в момент now"""
+        anchor = self._anchor
+        hour_angle = self.rate * (now - self._anchor_time)
+
+        if self.mode == TrackingMode.ALT_AZ:
+            lat = self._latitude()
+            ha, dec = horizontal_to_equatorial(anchor.get_az() - ALT_AZ_MOTOR_OFFSET, anchor.get_alt(), lat)
+            az, alt = equatorial_to_horizontal(ha + hour_angle, dec, lat)
+            return SkyCoordinate(astropi_utils.normalize_degrees_unsigned(az + ALT_AZ_MOTOR_OFFSET), alt)
+
+        # экваториальная: угол мотора RA - часовой угол объекта
+        return SkyCoordinate(astropi_utils.normalize_degrees_unsigned(anchor.get_horizontal() + hour_angle),
+                             anchor.get_vertical())
+
+    def _lag(self, now):
+        desired, current = self.desired(now), self.mount.current
+        return (astropi_utils.normalize_degrees_signed(desired.get_horizontal() - current.get_horizontal()),
+                desired.get_vertical() - current.get_vertical())
+
+    def tick(self) -> float:
+        """Один шаг сопровождения, возвращает, через сколько секунд его повторить"""
+        mount = self.mount
+        if self.mode == TrackingMode.OFF or not mount.step_tracking or mount.busy:
+            if self._anchor is not None and self.mode == TrackingMode.OFF:
+                self._release()
+            self._anchor = None
+            return self.max_wait
+
+        now = self.clock()
+        before = mount.position_version
+        if self._anchor is None or before != self._version:
+            # положение изменили снаружи (наведение, синхронизация, сдвиг) - сопровождаем от него
+            self._anchor_time, self._anchor = now, mount.current
+            self.steps = 0
+
+        lag_h, lag_v = self._lag(now)
+        motors = ((mount.motor_h, lag_h), (mount.motor_v, -lag_v))  # мотор V вращается против оси V
+        plan = [(motor, int(lag * motor.steps_per_degree + math.copysign(0.5, lag)))  # от полушага и больше
+                for motor, lag in motors]
+        if any(abs(steps) > MAX_TRACK_STEPS for _, steps in plan):
+            # такое отставание сопровождение не набирает, догонять его было бы наведением
+            self.logger.warning(f"Отставание больше {MAX_TRACK_STEPS} шагов, отсчет от текущего положения")
+            self._anchor_time, self._anchor = now, mount.current
+            self._version = before
+            self.steps = 0
+            return self._next_wait(now)
+
+        executed = 0
+        for motor, steps in plan:
+            if steps:
+                done = motor.track_steps(steps)
+                executed += abs(done)
+                self.steps += abs(done)
+
+        if mount.position_version == before + executed:
+            self._version = before + executed
+        else:
+            # во время шагов положение изменили снаружи (синхронизация, наведение) - отсчет заново
+            self._anchor = None
+            return 0.0
+
+        return self._next_wait(self.clock())
+
+    def _next_wait(self, now):
+        """Время до момента, когда одна из осей отстанет на полшага"""
+        lag_h, lag_v = self._lag(now)
+        later_h, later_v = self._lag(now + 1.0)
+        wait = self.max_wait
+        for motor, lag, rate in ((self.mount.motor_h, lag_h, later_h - lag_h), (self.mount.motor_v, lag_v, later_v - lag_v)):
+            if rate:
+                half_step = 0.5 / motor.steps_per_degree
+                wait = min(wait, (math.copysign(half_step, rate) - lag) / rate)
+        return max(wait, 0.0)
+
+    def stats(self) -> TrackingStats:
+        now = self.clock()
+        if self._anchor is None:
+            return TrackingStats(0.0, 0, 0.0, 0.0, 0.0)
+
+        lag_h, lag_v = self._lag(now)
+        expected = astropi_utils.normalize_degrees_signed(
+            self.desired(now).get_horizontal() - self._anchor.get_horizontal())
+        rate_error = -lag_h / expected if expected else 0.0
+        return TrackingStats(now - self._anchor_time, self.steps, lag_h * 3600, lag_v * 3600, rate_error)
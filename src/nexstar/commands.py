@@ -31,3 +31,33 @@ class Command(bytes, Enum):
     def to_char(self):
         return chr(self[0])
 
+
+
+# Полная длина каждой команды в байтах (вместе с буквой команды)
+COMMAND_LENGTHS = {
+    Command.HANDSHAKE: 2,                # K + символ
+    Command.VERSION: 1,
+    Command.PASS_THROUGH: 8,             # P + 7 байт
+    Command.GET_MODEL: 1,
+    Command.GET_LOCATION: 1,
+    Command.SET_LOCATION: 9,             # W + ABCDEFGH
+    Command.GET_TIME: 1,
+    Command.SET_TIME: 9,                 # H + QRSTUVWX
+    Command.GET_TRACKING_MODE: 1,
+    Command.SET_TRACKING_MODE: 2,        # T + режим
+    Command.ALIGN_COMPLETE: 1,
+    Command.SYNC_RA_DEC: 10,             # S + 34AB,12CE
+    Command.SYNC_RA_DEC_PRECISION: 18,   # s + 34AB0500,12CE0500
+    Command.GOTO_RA_DEC: 10,
+    Command.GOTO_RA_DEC_PRECISION: 18,
+    Command.GOTO_AZM_ALT: 10,
+    Command.GOTO_AZM_ALT_PRECISION: 18,
+    Command.GOTO_IN_PROG: 1,
+    Command.CANCEL_GOTO: 1,
+    Command.GET_RA_DEC: 1,
+    Command.GET_RA_DEC_PRECISION: 1,
+    Command.GET_AZM_ALT: 1,
+    Command.GET_AZM_ALT_PRECISION: 1,
+    Command.END: 1,
+    Command.ZERO: 1,
+}
@@ -8,10 +8,15 @@ class Device(IntEnum):
     RTC = 178  # Real-Time Clock
 
 class Direction(IntEnum):
-    POSITIVE = 36
+    POSITIVE = 36       # фиксированная скорость 0-9
     NEGATIVE = 37
+    POSITIVE_RATE = 6   # переменная скорость, угловые секунды в секунду * 4
+    NEGATIVE_RATE = 7
 
 class Extra(IntEnum):
+    GOTO_FAST = 2       # поворот оси в положение (доля оборота, 24 бита)
+    GOTO_SLOW = 23
+    SLEW_DONE = 19      # 0xFF - ось стоит, 0x00 - выполняет команды
     GET_DEVICE_VERSION = 254
     IS_GPS_LINKED = 55
 
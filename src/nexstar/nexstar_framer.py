@@ -0,0 +1,46 @@
+from src.framing import StreamFramer
+from src.nexstar.commands import COMMAND_LENGTHS
+
+# длина команды по первому байту, 0 - неизвестная команда
+_LENGTH_BY_BYTE = [0] * 256
+for _command, _length in COMMAND_LENGTHS.items():
+    _LENGTH_BY_BYTE[_command[0]] = _length
+
+# однобайтовые команды (e, E, L, ...) отдаем готовыми объектами без выделения памяти
+_SINGLE_BYTE_FRAMES = [bytes([b]) for b in range(256)]
+
+FRAMER_BUFFER = 512
+
+
+def default_lengths() -> list:
+    """Копия таблицы длин команд по первому байту, ее можно дополнять новыми командами"""
+    return list(_LENGTH_BY_BYTE)
+
+
+class NexStarFramer(StreamFramer):
+    """
+    Разбор потока команд NexStar по фиксированной длине каждой команды.
+
+    Клиенты шлют несколько опросов 'e' подряд в одном пакете, а 9-байтовые
+    W/H могут прийти по частям - в обоих случаях каждая команда извлекается
+    целиком. Неизвестная команда забирает весь остаток буфера, как и раньше.
+    lengths - таблица длин по первому байту (по умолчанию COMMAND_LENGTHS), сервер передает
+    свою, чтобы команды, зарегистрированные позже, разбирались и в уже открытых соединениях.
+    """
+
+    def __init__(self, size=FRAMER_BUFFER, lengths=None):
+        super().__init__(size)
+        self.lengths = _LENGTH_BY_BYTE if lengths is None else lengths
+
+    def _next_frame(self, pos) -> int:
+        size = self.lengths[self.buffer[pos]]
+        if not size:
+            return self.length - pos
+        if pos + size > self.length:
+            return 0
+        return size
+
+    def _frame(self, pos, size) -> bytes:
+        if size == 1:
+            return _SINGLE_BYTE_FRAMES[self.buffer[pos]]
+        return bytes(self.view[pos:pos + size])
@@ -1,9 +1,18 @@
 import datetime
+import logging
+import time
 
+from src.mount.controller.mount_controller import MAX_SPEED, LOW_SPEED
+from src.mount.manual_slew import AXIS_H, AXIS_V
+from src.mount.tracking_engine import SIDEREAL_RATE
+from src.mount.tracking_mode import TrackingMode
 from src.nexstar.commands import Command
+from src.nexstar.nexstar_framer import NexStarFramer, default_lengths
 from src.server import Server
 from src.utils import astropi_utils, coordinate_utils
+from src.utils.app_logger import lazy
 from src.utils.location import SkyCoordinate
+from src.utils.metrics import METRICS
 from src.nexstar.constants import Device, Direction, Extra
 from src.nexstar.nexstar_utils import strip_command_letter, to_byte_command, get_time, bytes_to_location, \
     location_to_bytes, byte_to_datetime_utc
@@ -14,81 +23,127 @@ APP_VERSION = [4, 10]
 DEVICE_VERSION = [4, 10]
 GPS_VERSION = [1, 3]
 
+# скорости ручного движения пульта 1-9, град/с (1-5 - кратные звездной, 6-9 - быстрые)
+SLEW_RATES = {1: 2 * SIDEREAL_RATE, 2: 4 * SIDEREAL_RATE, 3: 8 * SIDEREAL_RATE, 4: 16 * SIDEREAL_RATE,
+              5: 32 * SIDEREAL_RATE, 6: 0.3, 7: 1.0, 8: 2.0, 9: 4.0}
+
 NEXSTAR_BUFFER = 18  # in documentation, the longest command is 18 bytes
 
+COMMAND_SECONDS = METRICS.histogram('astropi_nexstar_command_seconds', "Время обработки команды NexStar",
+                                    ('command',))
+
 
 class ServerNexStar(Server):
 
-    def __init__(self, host='0.0.0.0', port=4030, mount_type='real', sync=False):
-        super().__init__(host, port, Server.name, mount_type, "NexStar", sync)
+    def __init__(self, host='0.0.0.0', port=4030, mount_type='real', sync=False, **kwargs):
+        super().__init__(host, port, Server.name, mount_type, "NexStar", sync, **kwargs)
 
         self.buffer = NEXSTAR_BUFFER
         self.major = APP_VERSION[0]
         self.minor = APP_VERSION[1]
 
+        # длины команд для разбора потока, register_command дополняет их
+        self._lengths = default_lengths()
+        self._build_dispatch_table()
+
     def get_buffer(self):
         return self.buffer
 
+    def create_framer(self):
+        return NexStarFramer(lengths=self._lengths)
+
+    def _build_dispatch_table(self):
+        """Таблица обработчиков по первому байту команды, строится один раз"""
+        self._dispatch = [None] * 256
+        self._devices = {}
+        self._command_seconds = [None] * 256  # гистограммы времени обработки по первому байту
+
+        handlers = {
+            Command.END: lambda data: b'',
+            Command.ZERO: lambda data: data,  # not sure that's right
+            Command.PASS_THROUGH: self.pass_through,
+            Command.GET_LOCATION: lambda data: self.get_location(),
+            Command.SET_LOCATION: self.set_location,
+            Command.GET_RA_DEC: lambda data: self.get_ra_dec(False),
+            Command.GET_RA_DEC_PRECISION: lambda data: self.get_ra_dec(True),
+            Command.SYNC_RA_DEC: lambda data: self.sync_ra_dec(data, False),
+            Command.SYNC_RA_DEC_PRECISION: lambda data: self.sync_ra_dec(data, True),
+            Command.GET_TIME: lambda data: get_time(),
+            Command.SET_TIME: self.set_time,
+            Command.HANDSHAKE: self.handshake,
+            Command.VERSION: lambda data: self.get_app_version(),
+            Command.GOTO_IN_PROG: lambda data: self.is_goto_in_progress(),
+            Command.ALIGN_COMPLETE: lambda data: self.is_alignment_in_prog(),
+            Command.GET_TRACKING_MODE: lambda data: self.get_tracking_mode(),
+            Command.SET_TRACKING_MODE: self.set_tracking_mode,
+            Command.GOTO_RA_DEC: self.goto_ra_dec,
+            Command.GOTO_RA_DEC_PRECISION: self.goto_ra_dec_prec,
+            Command.GOTO_AZM_ALT: self.goto_az_alt,
+            Command.GOTO_AZM_ALT_PRECISION: self.goto_az_alt_prec,
+            Command.GET_MODEL: lambda data: self.get_model(),
+            Command.CANCEL_GOTO: lambda data: self.cancel_goto_command(),
+        }
+        for command, handler in handlers.items():
+            self.register_command(command, handler)
+
+        devices = {
+            Device.GPS: self.gps_commands,
+            Device.AZM_RA_MOTOR: self.azm_ra_motor_commands,
+            Device.ALT_DEC_MOTOR: self.alt_dec_motor_commands,
+            Device.RTC: self.rtc_commands,
+        }
+        for dev_code, handler in devices.items():
+            self.register_device(dev_code, handler)
+
+    def register_command(self, command, handler, length=None):
+        """
+        Регистрирует обработчик команды.
+
+        Параметры:
+            command (Command | bytes | int): команда или ее первый байт
+            handler: функция handler(data: bytes) -> bytes, получает команду целиком
+            length (int): длина команды в байтах для разбора потока, None - длина из COMMAND_LENGTHS
+                (команда без длины забирает весь остаток прочитанного)
+        """
+        code = command if isinstance(command, int) else command[0]
+        self._dispatch[code] = handler
+        if length is not None:
+            if length < 1:
+                raise ValueError(f"Неверная длина команды {command!r}: {length}")
+            self._lengths[code] = length
+
+    def register_device(self, dev_code, handler):
+        """Регистрирует обработчик pass-through команд (P) для устройства dev_code"""
+        self._devices[int(dev_code)] = handler
+
     def handle_command(self, data):
 
         if not isinstance(data, bytes):
             return None
 
-        self.logger.debug(f"Получена команда: {data}")
+        self.logger.debug("Получена команда: %s", data)
 
         if not data:
             return None
 
-        if data == Command.END:
-            return b''
-        elif data == Command.ZERO:
-            return data  # not sure that's right
-        elif data.startswith(Command.PASS_THROUGH):
-            return self.pass_through(data)
-        elif data.startswith(Command.GET_LOCATION):
-            return self.get_location()
-        elif data.startswith(Command.SET_LOCATION):
-            return self.set_location(data)
-        elif data.startswith(Command.GET_RA_DEC):
-            return self.get_ra_dec(False)
-        elif data.startswith(Command.GET_RA_DEC_PRECISION):
-            return self.get_ra_dec(True)
-        elif data.startswith(Command.SYNC_RA_DEC):
-            return self.sync_ra_dec(data, False)
-        elif data.startswith(Command.SYNC_RA_DEC_PRECISION):
-            return self.sync_ra_dec(data, True)
-        elif data.startswith(Command.GET_TIME):
-            return get_time()
-        elif data.startswith(Command.SET_TIME):
-            return self.set_time(data)
-        elif data.startswith(Command.HANDSHAKE):
-            return self.handshake(data)
-        elif data.startswith(Command.VERSION):
-            return self.get_app_version()
-        elif data.startswith(Command.GOTO_IN_PROG):
-            return self.is_goto_in_progress()
-        elif data.startswith(Command.ALIGN_COMPLETE):
-            return self.is_alignment_in_prog()
-        elif data.startswith(Command.GET_TRACKING_MODE):
-            return self.get_tracking_mode()
-        elif data.startswith(Command.SET_TRACKING_MODE):
-            return self.set_tracking_mode(data)
-        elif data.startswith(Command.GOTO_RA_DEC):
-            return self.goto_ra_dec(data)
-        elif data.startswith(Command.GOTO_RA_DEC_PRECISION):
-            return self.goto_ra_dec_prec(data)
-        elif data.startswith(Command.GOTO_AZM_ALT):
-            return self.goto_az_alt(data)
-        elif data.startswith(Command.GOTO_AZM_ALT_PRECISION):
-            return self.goto_az_alt_prec(data)
-        elif data.startswith(Command.GET_MODEL):
-            return self.get_model()
-        elif data.startswith(Command.CANCEL_GOTO):
-            self.cancel_goto()
-            return Command.END
-        else:
+        code = data[0]
+        handler = self._dispatch[code]
+        if handler is None:
             return Command.END
 
+        started = time.perf_counter()
+        response = handler(data)
+        histogram = self._command_seconds[code]
+        if histogram is None:
+            label = chr(code) if 0x20 < code < 0x7f else f"0x{code:02x}"
+            histogram = self._command_seconds[code] = COMMAND_SECONDS.labels(label)
+        histogram.observe(time.perf_counter() - started)
+        return response
+
+    def cancel_goto_command(self):
+        self.cancel_goto()
+        return Command.END
+
     def handshake(self, data):
         self.logger.info(f"Клиент запрашивает состояние. ОК")
         return data[1:] + Command.END
@@ -139,8 +194,10 @@ class ServerNexStar(Server):
         return to_byte_command(self.mount.params.tracking_mode.value)
 
     def set_tracking_mode(self, data):
-        self.mount.params.tracking_mode = data[1:]
-        self.logger.info(f"Режим отслеживания движения установлен: {self.mount.params.tracking_mode}")
+        mode = TrackingMode(data[1])
+        self.mount.set_tracking_mode(mode)
+        if mode != TrackingMode.OFF:
+            self.start_tracking()
         return Command.END
 
     def has_gps(self):
@@ -148,46 +205,71 @@ class ServerNexStar(Server):
 
     def pass_through(self, data):
         dev_code = data[2]
-        if dev_code == Device.GPS:
-            return self.gps_commands(data)  # get GPS commands
-        elif dev_code == Device.AZM_RA_MOTOR:
-            direction = data[3]
-            speed = data[4]
-            slew_angle = 5
-            if direction == Direction.POSITIVE:  # '$' → positive → вправо (восток)
-                self.logger.info(f"Фиксированный сдвиг по ч.с. по горизонтали со скоростью {speed}")
-                self.mount.slew_motor_h(slew_angle, speed)
-            elif direction == Direction.NEGATIVE:  # '%' → negative → влево (запад)
-                self.logger.info(f"Фиксированный сдвиг п.ч.с по горизонтали со скоростью {speed}")
-                self.mount.slew_motor_h(-slew_angle, speed)
-            elif direction == Extra.GET_DEVICE_VERSION:
-                self.logger.info(f"Версия Azm/RA двигателя: v{DEVICE_VERSION[0]}.{DEVICE_VERSION[1]}")
-                return self.version_to_byte(DEVICE_VERSION[0], DEVICE_VERSION[1])
-            else:
-                self.logger.info(f"Необработанный сдвиг {direction}")
-            return Command.END
-        elif dev_code == Device.ALT_DEC_MOTOR:
-            direction = data[3]
-            speed = data[4]
-            slew_angle = 1
-            if direction == Direction.POSITIVE:  # '$' → positive → вверх (север)
-                self.logger.info(f"Фиксированный сдвиг по ч.с. по вертикали со скоростью {speed}")
-                self.mount.slew_motor_v(-slew_angle, speed)
-            elif direction == Direction.NEGATIVE:  # '%' → negative → вниз (юг)
-                self.logger.info(f"Фиксированный сдвиг п.ч.с по вертикали со скоростью {speed}")
-                self.mount.slew_motor_v(slew_angle, speed)
-            elif direction == Extra.GET_DEVICE_VERSION:
-                self.logger.info(f"Версия Alt/DEC двигателя: v{DEVICE_VERSION[0]}.{DEVICE_VERSION[1]}")
-                return self.version_to_byte(DEVICE_VERSION[0], DEVICE_VERSION[1])
-            else:
-                self.logger.info(f"Необработанный сдвиг {direction}")
+        handler = self._devices.get(dev_code)
+        if handler is None:
+            self.logger.warning(f'Неизвестное устройство с кодом: {dev_code}')
             return Command.END
-        elif dev_code == Device.RTC:
-            return self.rtc_commands(data) # незнаю что возвращать
+
+        return handler(data)
+
+    def azm_ra_motor_commands(self, data):
+        if data[3] == Extra.GET_DEVICE_VERSION:
+            self.logger.info(f"Версия Azm/RA двигателя: v{DEVICE_VERSION[0]}.{DEVICE_VERSION[1]}")
+            return self.version_to_byte(DEVICE_VERSION[0], DEVICE_VERSION[1])
+        if data[3] in (Extra.GOTO_FAST, Extra.GOTO_SLOW):
+            return self.motor_goto_command(AXIS_H, data)
+        if data[3] == Extra.SLEW_DONE:
+            return (b'\x00' if self.mount.axis_h.busy else b'\xff') + Command.END
+        return self.motor_slew_command(AXIS_H, data)
+
+    def alt_dec_motor_commands(self, data):
+        if data[3] == Extra.GET_DEVICE_VERSION:
+            self.logger.info(f"Версия Alt/DEC двигателя: v{DEVICE_VERSION[0]}.{DEVICE_VERSION[1]}")
+            return self.version_to_byte(DEVICE_VERSION[0], DEVICE_VERSION[1])
+        if data[3] in (Extra.GOTO_FAST, Extra.GOTO_SLOW):
+            return self.motor_goto_command(AXIS_V, data)
+        if data[3] == Extra.SLEW_DONE:
+            return (b'\x00' if self.mount.axis_v.busy else b'\xff') + Command.END
+        return self.motor_slew_command(AXIS_V, data)
+
+    def motor_slew_command(self, axis, data):
+        """
+        Ручное движение оси: '$'/'%' - фиксированная скорость 0-9 (вправо/вверх и влево/вниз),
+        6/7 - переменная скорость в 1/4 угловой секунды в секунду. Скорость 0 останавливает ось.
+        Движение идет в фоне до следующей команды, ответ отправляется сразу.
+        """
+        direction = data[3]
+        if direction in (Direction.POSITIVE, Direction.NEGATIVE):
+            rate = SLEW_RATES.get(data[4], 0.0)
+        elif direction in (Direction.POSITIVE_RATE, Direction.NEGATIVE_RATE):
+            rate = ((data[4] << 8) | data[5]) / 4 / 3600
         else:
-            self.logger.warning(f'Неизвестное устройство с кодом: {dev_code}')
+            self.logger.info(f"Необработанный сдвиг {direction}")
             return Command.END
 
+        if direction in (Direction.NEGATIVE, Direction.NEGATIVE_RATE):
+            rate = -rate
+
+        self.logger.info(f"Ручное движение по {'горизонтали' if axis == AXIS_H else 'вертикали'}: {rate:+.4f}°/с")
+        self.mount.slew.set_rate(axis, rate)
+        return Command.END
+
+    def motor_goto_command(self, axis, data):
+        """
+        Поворот одной оси в положение: 3 байта данных - доля оборота (24 бита), GOTO_FAST -
+        максимальная скорость, GOTO_SLOW - низкая. Команда ставится в очередь оси, ответ сразу.
+        """
+        degrees = int.from_bytes(data[4:7], 'big') / 0x1000000 * 360.0
+        speed = MAX_SPEED if data[3] == Extra.GOTO_FAST else LOW_SPEED
+        if axis == AXIS_H:
+            self.logger.info(f"Поворот оси горизонтали в {degrees:.4f}° (скорость {speed})")
+            self.mount.axis_h.goto(degrees, speed)
+        else:
+            degrees = astropi_utils.normalize_degrees_signed(degrees)
+            self.logger.info(f"Поворот оси вертикали в {degrees:.4f}° (скорость {speed})")
+            self.mount.axis_v.goto(degrees, speed)
+        return Command.END
+
     def rtc_commands(self, data):
         return Command.END
 
@@ -214,12 +296,14 @@ class ServerNexStar(Server):
         return self.coord_bytes() + Command.END
 
     def set_location(self, data: bytes):
-        self.mount.location = bytes_to_location(data)
+        self.mount.set_location(bytes_to_location(data))
         self.logger.info(f"GPS координаты заданы: {self.mount.location}")
 
     def is_goto_in_progress(self):
-        if self.mount.goto_in_progress:
-             self.logger.info(f"Монтировка в процессе наведения GOTO (Ra: {self.get_sync().ra_az_h}, Dec: {self.get_sync().dec_alt_v})")
+        if self.mount.goto_in_progress and self.logger.isEnabledFor(logging.DEBUG):
+            # клиент опрашивает L несколько раз в секунду - только в отладочном логе
+            sync = self.get_sync()
+            self.logger.debug("Монтировка в процессе наведения GOTO (Ra: %s, Dec: %s)", sync.ra_az_h, sync.dec_alt_v)
 
         return bytes([self.mount.goto_in_progress]) + Command.END
 
@@ -245,9 +329,10 @@ class ServerNexStar(Server):
             от оборота это равно 4814/65536 = 0,07346. Чтобы рассчитать градусы, просто умножьте на 360, что даст значение
             26,4441 градуса.
         """
-        lst = astropi_utils.calculate_local_sidereal_time(self.mount.location.long.decimal())
-        ra = astropi_utils.normalize_degrees_signed(lst - self.get_current().get_ra())
-        dec = self.get_current().get_dec()
+        return self.position_cache.get(self.mount.position_version, precise, lambda: self._ra_dec_reply(precise))
+
+    def _ra_dec_reply(self, precise: bool):
+        ra, dec = self.get_ra_dec_degrees()
 
         ra_hex = astropi_utils.degrees_to_hex(ra, precise)
         dec_hex = astropi_utils.degrees_to_hex(dec, precise)
@@ -271,6 +356,7 @@ class ServerNexStar(Server):
         prec_dec = astropi_utils.hex_to_degrees(dec_hex, precise)
 
         self.mount.set_sync(SkyCoordinate(prec_ra, prec_dec))
+        self.start_tracking()
 
         self.logger.info(
             f"Синхронизация по координатам: П.В (Ra):{self.get_sync().get_ra():.2f} ({ra_hex}), Скл (Dec): {self.get_sync().get_dec():.2f} ({dec_hex})")
@@ -285,7 +371,6 @@ class ServerNexStar(Server):
     def goto_ra_dec(self, data, precise: bool = False):
         try:
             self.logger.info(f"Старт команды GOTO Ra/Dec (точный режим: {precise})")
-            self.mount.goto_in_progress = True
 
             ra_dec = strip_command_letter(data)
             ra_dec_arr = ra_dec.split(',')
@@ -297,45 +382,31 @@ class ServerNexStar(Server):
             # Преобразование в углы моторов
             lst = astropi_utils.calculate_local_sidereal_time(self.mount.location.long.decimal())
 
-            target_motor_ra = lst - ra_target_deg  # [0, 360)
+            target_motor_ra = astropi_utils.normalize_degrees_unsigned(lst - ra_target_deg)  # [0, 360)
             target_motor_dec = dec_target_deg  # [-90, 90]
 
-            # Текущие углы моторов
-            current_motor_ra = self.mount.current.get_ra()
-            current_motor_dec = self.mount.current.get_dec()
+            # сообщения собираются только при выводе, строки J2000 - тоже
+            current = self.get_current()
+            self.logger.info("LST = %s", lst)
+            self.logger.info("Текущая цель (RA/Dec): %.4f° / %.4f°", current.get_ra(), current.get_dec())
+            self.logger.info("Текущая цель (J2000 RA/Dec): %s", lazy(coordinate_utils.toJ2000, current.get_ra(), current.get_dec()))
+            self.logger.info("Цель (RA/Dec): %.4f° / %.4f°", ra_target_deg, dec_target_deg)
+            self.logger.info("Цель (J2000 RA/Dec): %s", lazy(coordinate_utils.toJ2000, ra_target_deg, dec_target_deg))
 
-            # Считаем разницу (относительные углы для поворота)
-            # Учитываем кратчайший путь для RA (через 0°/360°)
-            delta_ra = astropi_utils.normalize_degrees_signed(target_motor_ra - current_motor_ra)
-            delta_dec = astropi_utils.normalize_degrees_signed(current_motor_dec - target_motor_dec)
+            # наведение идет в фоне, клиент получает ответ сразу и дальше опрашивает L
+            self.mount.goto_position(SkyCoordinate(target_motor_ra, target_motor_dec))
+            self.start_tracking()
 
-            self.logger.info(f"LST = {lst}")
-            self.logger.info(f"Текущая цель (RA/Dec): {self.get_current().get_ra():.4f}° / {self.get_current().get_dec():.4f}°")
-            self.logger.info(f"Текущая цель (J2000 RA/Dec): {coordinate_utils.toJ2000(self.get_current().get_ra(), self.get_current().get_dec())}")
-            self.logger.info(f"Цель (RA/Dec): {ra_target_deg:.4f}° / {dec_target_deg:.4f}°")
-            self.logger.info(f"Цель (J2000 RA/Dec): {coordinate_utils.toJ2000(ra_target_deg, dec_target_deg)}")
-            self.logger.info(f"Целевые углы моторов: RA(h)={target_motor_ra:.4f}°, Dec(v)={target_motor_dec:.4f}°")
-            self.logger.info(f"Текущие углы моторов: RA(h)={current_motor_ra:.4f}°, Dec(v)={current_motor_dec:.4f}°")
-            self.logger.info(f"RA: текущий={current_motor_ra:.2f}, цель={target_motor_ra:.2f}")
-            self.logger.info(f"Dec: текущий={current_motor_dec:.2f}, цель={target_motor_dec:.2f}")
-            self.logger.info(f"Относительный поворот: RA(h)={delta_ra:.4f}°, Dec(v)={delta_dec:.4f}°")
-
-            self.mount.goto(SkyCoordinate(delta_ra, delta_dec))
-
-            self.mount.current = SkyCoordinate(target_motor_ra, target_motor_dec)
-
-            self.mount.goto_in_progress = False
             return Command.END
         except Exception as e:
             self.logger.error(e)
             return bytes([0]) + Command.END
 
     def goto_az_alt_prec(self, data):
-        return self.goto_ra_dec(data, True)
+        return self.goto_az_alt(data, True)
 
     def goto_az_alt(self, data, precise: bool = False):
         self.logger.info(f"Старт команды GOTO Az/Alt (точный режим: {precise})")
-        self.mount.goto_in_progress = True
 
         az_alt = strip_command_letter(data)
         az_alt_arr = az_alt.split(',')
@@ -346,24 +417,12 @@ class ServerNexStar(Server):
 
         # Целевые углы моторов
         target_motor_az = astropi_utils.normalize_degrees_unsigned(az_target_deg + 180.0) # [0, 360)
-        target_motor_alt = alt_target_deg # - 360.0  # Dec — прямой угол [-90, 90]
+        target_motor_alt = astropi_utils.normalize_degrees_signed(alt_target_deg)  # Alt — прямой угол [-90, 90]
 
-        # Текущие углы моторов
-        current_motor_az = self.mount.motor_h_angle
-        current_motor_alt = self.mount.motor_v_angle
-
-        delta_az = current_motor_az - (self.get_current().get_az() - target_motor_az)
-        delta_alt = current_motor_alt - (self.get_current().get_alt() - target_motor_alt)
-
-        self.logger.info(f"Текущая цель (Az/Alt): {self.get_current().get_ra():.4f}° / {self.get_current().get_dec():.4f}°")
+        self.logger.info(f"Текущая цель (Az/Alt): {self.get_current().get_az():.4f}° / {self.get_current().get_alt():.4f}°")
         self.logger.info(f"Цель (Az/Alt): {az_target_deg:.4f}° / {alt_target_deg:.4f}°")
-        self.logger.info(f"Целевые углы моторов: Az(h)={target_motor_az:.4f}°, Alt(v)={target_motor_alt:.4f}°")
-        self.logger.info(f"Текущие углы моторов: Az(h)={current_motor_az:.4f}°, Alt(v)={current_motor_alt:.4f}°")
-        self.logger.info(f"Относительный поворот: Az(h)={delta_az:.4f}°, Alt(v)={delta_alt:.4f}°")
 
-        self.mount.goto(SkyCoordinate(delta_az, delta_alt))
+        self.mount.goto_position(SkyCoordinate(target_motor_az, target_motor_alt))
+        self.start_tracking()
 
-        self.mount.current = SkyCoordinate(target_motor_az, target_motor_alt)
-
-        self.mount.goto_in_progress = False
         return Command.END
@@ -1,14 +1,20 @@
 import socket
+import threading
 import time
 from abc import ABC, abstractmethod
 
+from src.framing import StreamFramer
+from src.motor.gpio_backend import GPIO_OPI
 from src.motor.motor_list import MOTORS
 from src.mount.controller.mount_real_controller import MountRealController
-from src.mount.controller.mount_sim_controller import MountSimController
 from src.mount.mount_list import MOUNT_LIST
+from src.session_recorder import SessionRecorder
 from src.utils import astropi_utils
 from src.utils.app_logger import AppLogger
 from src.utils.location import Location, SkyCoordinate
+from src.utils.metrics import METRICS, MetricsServer
+from src.utils.reply_cache import QuantizedCache, DEFAULT_TICK
+from src.utils.sidereal import SIDEREAL_CLOCK
 
 TEST_LOCATION = Location.fromLatLong(58, 0, 54, 56, 16, 28)
 
@@ -20,6 +26,22 @@ ZERO = SkyCoordinate(0.0, 0.0)
 RA_0_DEC_90 = SkyCoordinate(0.0, 90.0)
 DEFAULT_TARGET = RA_0_DEC_90
 
+# Режимы обслуживания клиентов
+MODE_THREAD = 'thread'  # отдельный поток на каждого клиента
+MODE_SYNC = 'sync'      # клиенты обслуживаются по очереди
+MODE_ASYNC = 'async'    # один поток, цикл событий asyncio (selector)
+SERVE_MODES = (MODE_THREAD, MODE_SYNC, MODE_ASYNC)
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_IDLE_TIMEOUT = 300.0  # секунд без команд до разрыва соединения (async)
+
+CONNECTIONS = METRICS.counter('astropi_connections_total', "Подключения клиентов", ('protocol',))
+CLIENTS = METRICS.gauge('astropi_clients', "Подключенные клиенты", ('protocol',))
+READ_SECONDS = METRICS.histogram('astropi_read_seconds', "Обработка одного чтения из сокета (все команды в нем)",
+                                 ('protocol',))
+CLIENT_ERRORS = METRICS.counter('astropi_client_errors_total', "Ошибки обработки команд клиентов", ('protocol',))
+GOTO_ACTIVE = METRICS.gauge('astropi_goto_in_progress', "Выполняется наведение (1/0)")
+
 class Server(ABC):
     buffer = 1024
     name = 'AstroPi'
@@ -27,7 +49,10 @@ class Server(ABC):
 
     LOG_RAW_COMMANDS = False
 
-    def __init__(self, host='0.0.0.0', port=10001, name='AstroPi', mount_type='real', protocol='', sync=False):
+    def __init__(self, host='0.0.0.0', port=10001, name='AstroPi', mount_type='real', protocol='', sync=False,
+                 mode=None, max_connections=DEFAULT_MAX_CONNECTIONS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 position_tick=DEFAULT_TICK, gpio=GPIO_OPI, metrics_port=None,
+                 record=None, tracking=False):
         self.host = host
         self.port = port
         self.name = name
@@ -45,64 +70,223 @@ class Server(ABC):
         self.protocol = protocol
         self.sync = sync
 
-        if mount_type == "sim":
-            self.mount = MountSimController(DEFAULT_MOUNT, CURRENT_MOTOR)
-        else:
-            self.mount = MountRealController(DEFAULT_MOUNT, CURRENT_MOTOR, "MotorX", "MotorY")
+        self.mode = mode or (MODE_SYNC if sync else MODE_THREAD)
+        if self.mode not in SERVE_MODES:
+            raise ValueError(f"Неизвестный режим сервера: {self.mode}")
+
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.active_connections = 0
+
+        # цикл событий, событие остановки и клиенты для режима async
+        self._loop = None
+        self._stop_event = None
+        self._async_clients = set()
+
+        self.gpio_backend = gpio
+        self.mount = self.create_mount(mount_type)
+
+        # общий для всех клиентов кэш ответов о положении (см. get_ra_dec_degrees)
+        self.position_cache = QuantizedCache(position_tick)
 
         self.tracking_mode = self.mount.params.tracking_mode
+        # сопровождение сразу при старте сервера, иначе - после первой команды режима сопровождения,
+        # синхронизации или GOTO: до них положение монтировки неизвестно и моторы не должны двигаться
+        self.tracking_on_start = tracking
 
         self.mount.set_location(TEST_LOCATION)
         self.mount.set_sync(DEFAULT_TARGET)
 
+        # метрики этого сервера, дочерние метрики с метками создаются один раз
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+        self._connections = CONNECTIONS.labels(self.protocol)
+        self._clients = CLIENTS.labels(self.protocol)
+        self._read_seconds = READ_SECONDS.labels(self.protocol)
+        self._client_errors = CLIENT_ERRORS.labels(self.protocol)
+        GOTO_ACTIVE.set_function(lambda: int(self.mount.goto_in_progress))
+
+        # запись сеансов клиентов в файл для воспроизведения (см. src/session_recorder.py)
+        self.recorder = SessionRecorder(record) if record else None
+
     def _setup_server_socket(self):
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
+        self.port = self.server_socket.getsockname()[1]  # при port=0 порт выбирает ОС
         self.server_socket.settimeout(1)  # graceful shutdown timeout
 
+    def create_mount(self, mount_type):
+        if mount_type == "sim":
+            # kopis есть только на Windows с Компас-3D, поэтому импортируем по требованию
+            from src.mount.controller.mount_sim_controller import MountSimController
+            return MountSimController(DEFAULT_MOUNT, CURRENT_MOTOR)
+
+        return MountRealController(DEFAULT_MOUNT, CURRENT_MOTOR, "MotorX", "MotorY", self.gpio_backend)
+
     @abstractmethod
     def handle_command(self, cmd):
-        """Abstract method for handle of protocol-specific commands"""
+        """
+        Abstract method for handle of protocol-specific commands.
+
+        В режиме async вызывается в цикле событий и не должен блокироваться (см. _handle_client_async).
+        """
         pass
 
+    def create_framer(self) -> StreamFramer:
+        """Разбор входящего потока на команды, по умолчанию одно чтение - одна команда"""
+        return StreamFramer(self.get_buffer())
+
     def _handle_client(self, conn, addr):
+        framer = self.create_framer()
+        recorder = self.recorder
+        session = recorder.open(addr, self.protocol) if recorder else None
+        self._connections.inc()
+        self._clients.inc()
         try:
             self.logger.info(f"Клиент подключен: {addr}")
             while self.running:
                 data = None
                 try:
-                    data = conn.recv(self.get_buffer())
-                    if not data:
+                    if not framer.recv_into(conn):
                         break
 
-                    if self.LOG_RAW_COMMANDS:
-                        self.logger.info(f"Получена команда: {data}")
-
-                    response = self.handle_command(data)
+                    started = time.perf_counter()
+                    data = framer.frames()
+                    if recorder:
+                        recorder.inbound(session, data)
+                    response = self._respond_all(data)
+                    self._read_seconds.observe(time.perf_counter() - started)
                     if response:
+                        if recorder:
+                            recorder.outbound(session, response)
                         conn.sendall(response)
 
-                    if self.LOG_RAW_COMMANDS:
-                        self.logger.info(f"Отправлен ответ: {response}")
-
                 except (ConnectionResetError, socket.timeout):
                     self.logger.error(f"Соединение разорвано по таймауту: {socket.timeout}")
                     break
-                except UnicodeDecodeError as e:
-                    self.logger.error(f"Неудалось разобрать команду: {data} (Ошибка: {e})")
                 except Exception as e:
+                    self._client_errors.inc()
                     self.logger.error(f"Ошибка получения команды {data}: {e})")
 
         finally:
+            self._clients.dec()
+            if recorder:
+                recorder.close(session)
             conn.close()
             self.logger.info(f"Соединение с {addr} закрыто")
 
+    def _respond_all(self, frames):
+        """Ответы на все команды из одного чтения, отправляются одним sendall"""
+        if len(frames) == 1:
+            return self._respond(frames[0])
+
+        responses = [self._respond(frame) for frame in frames]
+        return b''.join(response for response in responses if response)
+
+    def _respond(self, data):
+        """Ответ на полученные данные, общий для всех режимов обслуживания"""
+        if self.LOG_RAW_COMMANDS:
+            self.logger.info(f"Получена команда: {data}")
+
+        try:
+            response = self.handle_command(data)
+        except UnicodeDecodeError as e:
+            self.logger.error(f"Неудалось разобрать команду: {data} (Ошибка: {e})")
+            return None
+
+        if self.LOG_RAW_COMMANDS:
+            self.logger.info(f"Отправлен ответ: {response}")
+
+        return response
+
+    async def _handle_client_async(self, reader, writer):
+        """
+        Клиент в режиме async. Команды обрабатываются прямо в цикле событий, поэтому
+        handle_command не должен блокироваться: движение выполняется в фоне (MotionExecutor,
+        AxisWorker), обработчик только ставит его в очередь и сразу отвечает.
+
+        Таймаут неактивности - один таймер на соединение (loop.call_later), а не wait_for
+        на каждое чтение: чтение только запоминает время, таймер при срабатывании
+        переставляет себя на оставшееся время или закрывает соединение.
+        """
+        import asyncio
+
+        addr = writer.get_extra_info('peername')
+
+        if self.active_connections >= self.max_connections:
+            self.logger.warning(f"Превышен лимит соединений ({self.max_connections}), клиент {addr} отклонен")
+            writer.close()
+            return
+
+        self.active_connections += 1
+        self._async_clients.add(writer)
+        self._connections.inc()
+        self._clients.inc()
+        framer = self.create_framer()
+        recorder = self.recorder
+        session = recorder.open(addr, self.protocol) if recorder else None
+
+        loop = asyncio.get_running_loop()
+        last_read = loop.time()
+        idle = False
+
+        def check_idle():
+            nonlocal timer, idle
+            remaining = last_read + self.idle_timeout - loop.time()
+            if remaining > 0:
+                timer = loop.call_later(remaining, check_idle)
+            else:
+                idle = True
+                writer.close()  # ожидающее чтение вернет конец потока
+
+        timer = loop.call_later(self.idle_timeout, check_idle)
+        try:
+            self.logger.info(f"Клиент подключен: {addr}")
+            while self.running:
+                data = None
+                try:
+                    data = await reader.read(framer.free())
+                    if not data:
+                        if idle:
+                            self.logger.warning(f"Клиент {addr} неактивен {self.idle_timeout} сек, соединение закрывается")
+                        break
+
+                    last_read = loop.time()
+                    started = time.perf_counter()
+                    framer.feed(data)
+                    data = framer.frames()
+                    if recorder:
+                        recorder.inbound(session, data)
+                    response = self._respond_all(data)
+                    self._read_seconds.observe(time.perf_counter() - started)
+                    if response:
+                        if recorder:
+                            recorder.outbound(session, response)
+                        writer.write(response)
+                        await writer.drain()
+
+                except ConnectionError:
+                    break
+                except Exception as e:
+                    self._client_errors.inc()
+                    self.logger.error(f"Ошибка получения команды {data}: {e})")
+
+        finally:
+            timer.cancel()
+            self.active_connections -= 1
+            self._clients.dec()
+            if recorder:
+                recorder.close(session)
+            self._async_clients.discard(writer)
+            writer.close()
+            self.logger.info(f"Соединение с {addr} закрыто")
+
     def get_buffer(self):
         return self.buffer
 
     def get_tracking_mode(self):
-        return self.tracking_mode
+        return self.mount.get_mount_tracking_type()
 
     def has_gps(self):
         return self.mount.params.has_gps
@@ -114,42 +298,105 @@ class Server(ABC):
         self.location = loc
 
     def cancel_goto(self):
-        self.mount.goto_in_progress = False
+        self.mount.cancel_goto()
+
+    def start_tracking(self):
+        """Запустить сопровождение, если оно еще не идет (режим берется из параметров монтировки)"""
+        if not self.mount.tracking.running:
+            self.mount.tracking.start()
 
     def get_sync(self) -> SkyCoordinate:
         return self.mount.sync
 
     def get_current(self) -> SkyCoordinate:
-        return self.mount.current
+        return self.mount.get_position()
+
+    def get_ra_dec_degrees(self):
+        """
+        Текущие RA/Dec телескопа в градусах.
+
+        Местное звездное время пересчитывается не чаще одного раза за квант кэша положения
+        и при каждом изменении положения монтировки.
+        """
+        return self.position_cache.get(self.mount.position_version, 'ra_dec', self._calculate_ra_dec)
+
+    def _calculate_ra_dec(self):
+        lst = astropi_utils.calculate_local_sidereal_time(self.mount.location.long.decimal())
+        current = self.get_current()
+        ra = astropi_utils.normalize_degrees_signed(lst - current.get_ra())
+        return ra, current.get_dec()
 
     def start(self):
         self.running = True
         self.server_socket.listen()
+        # сокет уже принимает подключения, astropy загрузится в фоне при первой калибровке LST
+        SIDEREAL_CLOCK.start()
+        if self.tracking_on_start:
+            self.start_tracking()
+        if self.metrics_port is not None and self.metrics_server is None:
+            self.metrics_server = MetricsServer(port=self.metrics_port).start()
         host_ip = astropi_utils.get_local_ip()
-        self.logger.info(f"Сервер {self.name} запущен на {host_ip}:{self.port} (протокол: {self.protocol}, режим: {'синхронный' if self.sync else 'асинхронный'})")
+        self.logger.info(f"Сервер {self.name} запущен на {host_ip}:{self.port} (протокол: {self.protocol}, режим: {self.mode})")
 
         try:
-            while self.running:
-                try:
-                    conn, addr = self.server_socket.accept()
-                    if self.sync:
-                        self._handle_client(conn, addr)
-                    else:
-                        import threading
-                        client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(conn, addr),
-                        daemon=True)
-                        client_thread.start()
-                except socket.timeout:
-                    continue
+            if self.mode == MODE_ASYNC:
+                import asyncio  # нужен только в режиме async, не замедляем старт остальных режимов
+                asyncio.run(self._serve_async())
+            else:
+                self._serve_threaded()
         except Exception as e:
             self.logger.error(f"Ошибка сервера: {e}")
         finally:
             self.stop()
 
+    def _serve_threaded(self):
+        while self.running:
+            try:
+                conn, addr = self.server_socket.accept()
+                if self.mode == MODE_SYNC:
+                    self._handle_client(conn, addr)
+                else:
+                    client_thread = threading.Thread(
+                    target=self._handle_client,
+                    args=(conn, addr),
+                    daemon=True)
+                    client_thread.start()
+            except socket.timeout:
+                continue
+
+    async def _serve_async(self):
+        import asyncio
+
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if not self.running:
+            return  # stop() вызван до запуска цикла
+
+        server = await asyncio.start_server(self._handle_client_async, sock=self.server_socket)
+        async with server:
+            await self._stop_event.wait()
+            server.close()
+            # отключаем клиентов, не дожидаясь таймаутов чтения
+            for writer in list(self._async_clients):
+                writer.close()
+            await server.wait_closed()
+
     def stop(self):
         self.running = False
+        self.mount.tracking.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.recorder is not None:
+            self.recorder.stop()
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                # сокет закроет сам цикл событий, будить accept по таймауту не нужно
+                loop.call_soon_threadsafe(self._stop_event.set)
+                return
+            except RuntimeError:
+                pass  # цикл уже остановлен
         if self.server_socket:
             self.server_socket.close()
         self.logger.warning(f"Сервер {self.name} остановлен")
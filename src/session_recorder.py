@@ -0,0 +1,272 @@
+"""
+Запись сеансов клиентов в двоичный файл и их воспроизведение.
+
+Файл начинается с MAGIC, дальше идут записи: заголовок RECORD (тип, номер соединения,
+время time.time(), длина данных) и сами данные. OPEN - подключение (данные - адрес клиента
+и протокол), IN - одна команда клиента после разбора потока, OUT - ответ на одно чтение
+из сокета, CLOSE - отключение. Файл только дописывается, поэтому записи нескольких запусков
+сервера и соединений идут подряд, соединения различаются номером.
+
+Запуск:
+    python -m src.session_recorder dump sessions.bin
+    python -m src.session_recorder replay sessions.bin [--host 127.0.0.1] [--port 4030] [--speed 1]
+"""
+import argparse
+import itertools
+import socket
+import struct
+import threading
+import time
+
+from src.utils.app_logger import AppLogger
+
+MAGIC = b'APSR\x01'
+RECORD = struct.Struct('<BIdI')  # тип, соединение, время, длина данных
+
+OPEN = 1
+IN = 2
+OUT = 3
+CLOSE = 4
+KIND_NAMES = {OPEN: 'OPEN', IN: 'IN', OUT: 'OUT', CLOSE: 'CLOSE'}
+
+FILE_BUFFER = 64 * 1024
+REPLY_TIMEOUT = 2.0  # сколько ждать ответ при воспроизведении
+
+
+class SessionRecorder:
+    """
+    Запись команд и ответов всех соединений сервера в один файл.
+
+    Запись идет через буфер файла под одной блокировкой, на диск данные попадают при
+    заполнении буфера и при отключении клиента. stop() записывает CLOSE для сеансов,
+    которые еще открыты (клиенты, отключенные вместе с сервером), записи после stop()
+    отбрасываются.
+    """
+
+    def __init__(self, path):
+        self.logger = AppLogger.info("Recorder")
+        self.path = path
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._open = set()  # номера соединений без записи CLOSE
+        self._file = open(path, 'ab', buffering=FILE_BUFFER)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.logger.info(f"Запись сеансов клиентов в {path}")
+
+    def open(self, addr, protocol) -> int:
+        """Начало сеанса, возвращает номер соединения"""
+        conn_id = next(self._ids)
+        client = f"{addr[0]}:{addr[1]} {protocol}" if addr else protocol
+        data = client.encode('utf-8')
+        header = RECORD.pack(OPEN, conn_id, time.time(), len(data))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(header)
+                self._file.write(data)
+                self._open.add(conn_id)
+        return conn_id
+
+    def inbound(self, conn_id, frames):
+        """Команды клиента из одного чтения"""
+        now = time.time()
+        with self._lock:
+            if self._file is None:
+                return
+            for frame in frames:
+                self._file.write(RECORD.pack(IN, conn_id, now, len(frame)))
+                self._file.write(frame)
+
+    def outbound(self, conn_id, data):
+        self._write(OUT, conn_id, data)
+
+    def close(self, conn_id):
+        with self._lock:
+            if self._file is not None and conn_id in self._open:
+                self._close_locked(conn_id, time.time())
+                self._file.flush()
+
+    def stop(self):
+        with self._lock:
+            if self._file is not None:
+                now = time.time()
+                for conn_id in sorted(self._open):
+                    self._close_locked(conn_id, now)
+                self._file.close()
+                self._file = None
+
+    def _close_locked(self, conn_id, timestamp):
+        self._open.discard(conn_id)
+        self._file.write(RECORD.pack(CLOSE, conn_id, timestamp, 0))
+
+    def _write(self, kind, conn_id, data):
+        header = RECORD.pack(kind, conn_id, time.time(), len(data))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(header)
+            self._file.write(data)
+
+
+class Session:
+    """Записанный сеанс одного соединения: события (время, тип, данные) в порядке записи"""
+
+    def __init__(self, conn_id, client=''):
+        self.conn_id = conn_id
+        self.client = client
+        self.events = []
+
+    @property
+    def started(self):
+        return self.events[0][0] if self.events else 0.0
+
+    def commands(self):
+        return sum(1 for _, kind, _ in self.events if kind == IN)
+
+
+def read_records(path):
+    """Все записи файла по порядку: (тип, соединение, время, данные)"""
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: не файл записи сеансов")
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return  # конец файла или запись, оборванная при аварийной остановке
+            kind, conn_id, timestamp, length = RECORD.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            yield kind, conn_id, timestamp, data
+
+
+def read_sessions(path) -> list:
+    """
+    Сеансы из файла по времени начала. Номера соединений начинаются заново при каждом
+    запуске сервера, поэтому OPEN с уже встречавшимся номером начинает новый сеанс.
+    """
+    sessions = []
+    current = {}
+    for kind, conn_id, timestamp, data in read_records(path):
+        if kind == OPEN or conn_id not in current:
+            session = current[conn_id] = Session(conn_id, data.decode('utf-8', 'replace') if kind == OPEN else '')
+            sessions.append(session)
+        session = current[conn_id]
+        session.events.append((timestamp, kind, data))
+        if kind == CLOSE:
+            del current[conn_id]
+    return sorted(sessions, key=lambda s: s.started)
+
+
+class ReplayResult:
+    """Итог воспроизведения сеанса: расхождения - (номер ответа, записанный ответ, полученный ответ)"""
+
+    def __init__(self, session):
+        self.session = session
+        self.responses = 0
+        self.mismatches = []
+        self.error = None
+        self.elapsed = 0.0
+
+    def __str__(self):
+        status = f"ошибка: {self.error}" if self.error else f"расхождений {len(self.mismatches)}"
+        return (f"сеанс {self.session.conn_id} ({self.session.client}): команд {self.session.commands()}, "
+                f"ответов {self.responses}, {status}, {self.elapsed:.2f} сек")
+
+
+def replay_session(session, host, port, speed=1.0, origin=None) -> ReplayResult:
+    """
+    Отправить команды сеанса серверу и сравнить ответы с записанными.
+
+    speed - во сколько раз быстрее записи выдерживать паузы между командами,
+    0 - без пауз. origin - момент perf_counter, соответствующий началу сеанса.
+    """
+    result = ReplayResult(session)
+    origin = time.perf_counter() if origin is None else origin
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=REPLY_TIMEOUT) as conn:
+            for timestamp, kind, data in session.events:
+                if kind == IN:
+                    if speed > 0:
+                        delay = origin + (timestamp - session.started) / speed - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    conn.sendall(data)
+                elif kind == OUT:
+                    actual = _receive(conn, len(data))
+                    if actual != data:
+                        result.mismatches.append((result.responses, data, actual))
+                    result.responses += 1
+    except OSError as e:
+        result.error = e
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def replay(sessions, host, port, speed=1.0) -> list:
+    """Воспроизвести сеансы одновременно, каждый в своем потоке, с исходными смещениями начала"""
+    if not sessions:
+        return []
+    first = min(session.started for session in sessions)
+    origin = time.perf_counter()
+    results = [None] * len(sessions)
+
+    def run(i, session):
+        offset = (session.started - first) / speed if speed > 0 else 0.0
+        results[i] = replay_session(session, host, port, speed, origin + offset)
+
+    threads = [threading.Thread(target=run, args=(i, session), daemon=True) for i, session in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _receive(conn, size):
+    """Прочитать size байт ответа или сколько успело прийти за REPLY_TIMEOUT"""
+    data = b''
+    try:
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    except socket.timeout:
+        pass
+    return data
+
+
+def _dump(path):
+    for kind, conn_id, timestamp, data in read_records(path):
+        moment = time.strftime('%H:%M:%S', time.localtime(timestamp)) + f"{timestamp % 1:.3f}"[1:]
+        print(f"{moment} #{conn_id} {KIND_NAMES.get(kind, kind):>5} {data!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Просмотр и воспроизведение записанных сеансов клиентов')
+    commands = parser.add_subparsers(dest='command', required=True)
+    dump = commands.add_parser('dump', help="вывести записи файла")
+    dump.add_argument('path')
+    play = commands.add_parser('replay', help="воспроизвести сеансы и сравнить ответы")
+    play.add_argument('path')
+    play.add_argument('--host', default='127.0.0.1')
+    play.add_argument('--port', type=int, default=4030)
+    play.add_argument('--speed', type=float, default=1.0, help="ускорение относительно записи, 0 - без пауз")
+    play.add_argument('--show', type=int, default=5, help="сколько расхождений вывести на сеанс")
+    args = parser.parse_args()
+
+    if args.command == 'dump':
+        _dump(args.path)
+        return
+
+    results = replay(read_sessions(args.path), args.host, args.port, args.speed)
+    for result in results:
+        print(result)
+        for index, expected, actual in result.mismatches[:args.show]:
+            print(f"    ответ {index}: записан {expected!r}, получен {actual!r}")
+
+
+if __name__ == '__main__':
+    main()
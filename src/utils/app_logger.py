@@ -1,32 +1,144 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 
+
+class LazyMessage:
+    """
+    Часть сообщения, которая вычисляется только при форматировании записи:
+    logger.info("Положение: %s", lazy(mount.get_position)). Если уровень отключен,
+    функция не вызывается, в асинхронном режиме она вызывается в потоке логирования.
+    """
+    __slots__ = ('fn', 'args')
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+
+def lazy(fn, *args) -> LazyMessage:
+    return LazyMessage(fn, *args)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, который не форматирует запись в вызывающем потоке (стандартный prepare
+    форматирует сразу): в очередь кладется пара (обработчик вывода, запись),
+    сообщение со всеми аргументами собирает и выводит поток логирования.
+    """
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record):
+        if record.exc_info:
+            # трейсбек форматируется сразу, пока кадры стека не изменились
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.queue.put_nowait((self.target, record))
+
+
+class _RoutingListener(logging.handlers.QueueListener):
+    """QueueListener, который выводит каждую запись обработчиком, указанным при постановке в очередь"""
+
+    def handle(self, item):
+        handler, record = item
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
 class AppLogger:
+    """
+    Логгеры приложения: сообщения уровня INFO в stdout, ERROR в stderr.
+
+    По умолчанию запись идет синхронно в потоке, который пишет в лог. После start_async()
+    логгеры только кладут записи в очередь, а форматирование и вывод выполняет один фоновый
+    поток (QueueListener): медленный stdout (journald, терминал) не задерживает потоки
+    импульсов и обработки команд.
+    """
+    _lock = threading.RLock()
+    _loggers = {}  # логгер -> обработчик прямого вывода
+    _queue = None
+    _listener = None
+    _queue_handlers = {}  # поток вывода -> QueueHandler
 
     @staticmethod
     def info(name=None):
+        return AppLogger._configure(name, logging.INFO, sys.stdout)
+
+    @staticmethod
+    def error(name=None):
+        return AppLogger._configure(name, logging.ERROR, sys.stderr)
+
+    @staticmethod
+    def _configure(name, level, stream):
         logger = logging.getLogger(name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(level)
 
-        if not logger.handlers:
-            ch = logging.StreamHandler(sys.stdout)
-            ch.setFormatter(logging.Formatter(LOG_FORMAT))
-            logger.addHandler(ch)
-            logger.propagate = False  # отключаем логирование выше по иерархии
+        with AppLogger._lock:
+            if not logger.handlers:
+                ch = logging.StreamHandler(stream)
+                ch.setFormatter(logging.Formatter(LOG_FORMAT))
+                AppLogger._loggers[logger] = ch
+                logger.addHandler(AppLogger._queue_handler(ch) if AppLogger.is_async() else ch)
+                logger.propagate = False  # отключаем логирование выше по иерархии
 
         return logger
 
     @staticmethod
-    def error(name=None):
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.ERROR)
+    def is_async() -> bool:
+        return AppLogger._listener is not None
 
-        if not logger.handlers:
-            ch = logging.StreamHandler(sys.stderr)
-            ch.setFormatter(logging.Formatter(LOG_FORMAT))
-            logger.addHandler(ch)
-            logger.propagate = False  # отключаем логгирование выше по иерархии
+    @staticmethod
+    def _queue_handler(handler):
+        """Один QueueHandler на каждый поток вывода, записи выводит обработчик первого логгера"""
+        stream = handler.stream
+        queue_handler = AppLogger._queue_handlers.get(stream)
+        if queue_handler is None:
+            queue_handler = AppLogger._queue_handlers[stream] = _DeferredQueueHandler(AppLogger._queue, handler)
+        return queue_handler
+
+    @staticmethod
+    def start_async():
+        """Перевести все логгеры на вывод через очередь и фоновый поток"""
+        with AppLogger._lock:
+            if AppLogger.is_async():
+                return
+            AppLogger._queue = queue.SimpleQueue()
+            AppLogger._queue_handlers = {}
+            for logger, handler in AppLogger._loggers.items():
+                logger.removeHandler(handler)
+                logger.addHandler(AppLogger._queue_handler(handler))
+
+            AppLogger._listener = _RoutingListener(AppLogger._queue)
+            AppLogger._listener.start()
+        atexit.register(AppLogger.stop_async)
+
+    @staticmethod
+    def stop_async():
+        """Вывести оставшиеся в очереди записи и вернуть синхронный вывод"""
+        with AppLogger._lock:
+            listener = AppLogger._listener
+            if listener is None:
+                return
+            for logger, handler in AppLogger._loggers.items():
+                for queue_handler in list(logger.handlers):
+                    if isinstance(queue_handler, _DeferredQueueHandler):
+                        logger.removeHandler(queue_handler)
+                logger.addHandler(handler)
+            AppLogger._listener = None
+            AppLogger._queue_handlers = {}
+        listener.stop()
 
-        return logger
@@ -12,6 +12,19 @@ from time import ctime, strftime, localtime
 #  Contains the necessary functions to calculate most commons format conversions used by the communications
 #  with the device and Stellarium.
 
+# Patterns are compiled once: the parsers run inline on the protocol hot path.
+_RAD_STR_RE = re.compile(r'^(-?)(\+?)[0-9]{1}\.[0-9]{4,8}')
+_DEG_DMS_RE = re.compile(r'^(-?)([0-9]{,3})(?:º|ᵒ)([0-9]{,3})\'([0-9]{,3})(?:\'\'|")$')
+_DEG_DECIMAL_RE = re.compile(r'^(-?[0-9]{,3}\.[0-9]{,6})(?:º|ᵒ)$')
+_HOUR_STR_RE = re.compile(r'^([0-9]{,3})h([0-9]{,3})m([0-9]{,3})s$')
+
+# LX200: RA "HH:MM:SS" / "HH:MM.T", Dec "sDD*MM'SS" / "sDD*MM" (degree sign is '*', ':', 'ß' or '°',
+# seconds separator is "'" or ':')
+_LX200_RA_RE = re.compile(r'^\s*(\d{1,2}):(\d{1,2})(?::(\d{1,2}(?:\.\d*)?)|\.(\d))?\s*#?$')
+_LX200_DEC_RE = re.compile(r'^\s*([+-]?)(\d{1,3})[*:\xdf°](\d{1,2})(?:[:\'](\d{1,2}(?:\.\d*)?))?\s*#?$')
+
+_DEG_TO_RAD = math.pi / 180
+
 
 # From radians to hours, with until six decimals of precision (float)
 # (rads * 180)/(15 * pi)
@@ -36,9 +49,7 @@ def rad_2_hour(rads):
 
 
 def radStr_2_deg(rad):
-    exp = re.compile('^(-?)(\+?)[0-9]{1}\.[0-9]{4,8}')
-
-    if(not exp.match(rad)):
+    if(not _RAD_STR_RE.match(rad)):
         return None
 
     r = float(rad)
@@ -76,30 +87,29 @@ def radStr_2_degStr(r):
 
 
 def degStr_2_rad(d):
-    exp1 = re.compile('^-?[0-9]{,3}(º|ᵒ)[0-9]{,3}\'[0-9]{,3}([\']{2}|")$')
-    exp2 = re.compile('^-?[0-9]{,3}\.[0-9]{,6}(º|ᵒ)$')
-
-    if(not exp1.match(d) and not exp2.match(d)):
-        logging.error("Error parametro: %s" % d)
+    d_ndeg = _degStr_2_deg_signed(d)
+    if d_ndeg is None:
         return None
-    elif(exp1.match(d)):
-        d = d.replace('º', '.').replace("''", '.').replace("'", '.')
-        d_dic = d.split('.')
-        d_deg = float(d_dic[0])
-        d_min = float(d_dic[1])
-        d_sec = float(d_dic[2])
-
-        if(d_deg < 0):
-            d_min = 0 - d_min
-            d_sec = 0 - d_sec
-
-        d_ndeg = (d_deg + (d_min / 60) + (d_sec / (60**2)))
-    else:
-        d_ndeg = float(d.replace('º', ''))
+
+    return round(d_ndeg * _DEG_TO_RAD, 6)
+
+
+def _degStr_2_deg_signed(d):
+    match = _DEG_DMS_RE.match(d)
+    if match:
+        sign, d_deg, d_min, d_sec = match.groups()
+        d_ndeg = int(d_deg or 0) + int(d_min or 0) / 60 + int(d_sec or 0) / 3600
+        return -d_ndeg if sign else d_ndeg
+
+    match = _DEG_DECIMAL_RE.match(d)
+    if match:
+        d_ndeg = float(match.group(1))
         if(d_ndeg < 0):
             d_ndeg = 360 - abs(d_ndeg)
+        return d_ndeg
 
-    return round((d_ndeg * math.pi) / 180, 6)
+    logging.error("Error parametro: %s" % d)
+    return None
 
 # Transforms from degrees to radians, both in string format
 #
@@ -134,32 +144,139 @@ def deg_2_degStr(deg):
 
 
 def hourStr_2_rad(h):
-    exp = re.compile('^[0-9]{,3}h[0-9]{,3}m[0-9]{,3}s$')
-    if(not exp.match(h)):
-        logging.error("Error in param: %s" % h)
+    nh = _hourStr_2_hour(h)
+    if nh is None:
         return None
 
-    h = h.replace('h', '.').replace("m", '.').replace("s", '.')
-    h_dic = h.split('.')
+    return round(nh * 15 * _DEG_TO_RAD, 6)
+
 
-    h_h = float(h_dic[0])
-    h_m = float(h_dic[1])
-    h_s = float(h_dic[2])
+def _hourStr_2_hour(h):
+    match = _HOUR_STR_RE.match(h)
+    if not match:
+        logging.error("Error in param: %s" % h)
+        return None
 
-    nh = (h_h + (h_m / 60) + (h_s / (60**2)))
+    h_h, h_m, h_s = match.groups()
+    return int(h_h or 0) + int(h_m or 0) / 60 + int(h_s or 0) / 3600
+
+# From hours in string format to degrees, without intermediate radians or strings
+#
+# \param h Hours in string format ("HhMmSSs")
+# \return Degrees in float format [0, 360)
 
-    return round((nh * 15 * math.pi) / 180, 6)
 
 def hourStr_2_deg(h):
-    h = hourStr_2_rad(h)
-    h = rad_2_radStr(h)
-    h = radStr_2_deg(h)
-    return h
+    nh = _hourStr_2_hour(h)
+    if nh is None:
+        return None
+
+    return (nh * 15) % 360
+
+# From degrees in string format to degrees in float format
+#
+# \param d Degrees in string format ("DºM'S''" || "D.dº")
+# \return Degrees in float format [0, 360)
+
 
 def degStr_2_deg(d):
-    d = degStr_2_radStr(d)
-    d = radStr_2_deg(d)
-    return d
+    d_ndeg = _degStr_2_deg_signed(d)
+    if d_ndeg is None:
+        return None
+
+    return d_ndeg % 360
+
+# From LX200 right ascension to degrees
+#
+# \param ra Right ascension in LX200 format ("HH:MM:SS" || "HH:MM.T", trailing '#' allowed)
+# \return Degrees in float format [0, 360) or None (also for hours >= 24, minutes or seconds >= 60)
+
+
+def lx200RaStr_2_deg(ra):
+    match = _LX200_RA_RE.match(ra)
+    if not match:
+        return None
+
+    hours, minutes, seconds, tenths = match.groups()
+    if int(hours) >= 24 or int(minutes) >= 60 or (seconds and float(seconds) >= 60):
+        return None
+    nh = int(hours) + int(minutes) / 60
+    if seconds:
+        nh += float(seconds) / 3600
+    elif tenths:
+        nh += int(tenths) / 600
+
+    return (nh * 15) % 360
+
+# From LX200 declination to degrees
+#
+# \param dec Declination in LX200 format ("sDD*MM'SS" || "sDD*MM:SS" || "sDD*MM", trailing '#' allowed)
+# \return Signed degrees in float format or None (also for minutes or seconds >= 60)
+
+
+def lx200DecStr_2_deg(dec):
+    match = _LX200_DEC_RE.match(dec)
+    if not match:
+        return None
+
+    sign, degrees, minutes, seconds = match.groups()
+    if int(minutes) >= 60 or (seconds and float(seconds) >= 60):
+        return None
+    nd = int(degrees) + int(minutes) / 60
+    if seconds:
+        nd += float(seconds) / 3600
+
+    return -nd if sign == '-' else nd
+
+# Bulk variants: parse an iterable of strings, invalid entries give None
+
+
+def hourStr_2_deg_bulk(values):
+    return [hourStr_2_deg(h) for h in values]
+
+
+def degStr_2_deg_bulk(values):
+    return [degStr_2_deg(d) for d in values]
+
+
+def lx200RaStr_2_deg_bulk(values):
+    return [lx200RaStr_2_deg(ra) for ra in values]
+
+
+def lx200DecStr_2_deg_bulk(values):
+    return [lx200DecStr_2_deg(dec) for dec in values]
+
+# From degrees to LX200 right ascension
+#
+# \param deg Right ascension in degrees (any range)
+# \param precise Long format "HH:MM:SS" if True, short "HH:MM.T" otherwise
+# \return Right ascension in LX200 format, without trailing '#'
+
+
+def deg_2_lx200RaStr(deg, precise=True):
+    hours = (deg % 360) / 15
+    if precise:
+        total = round(hours * 3600) % 86400
+        return '%02d:%02d:%02d' % (total // 3600, total // 60 % 60, total % 60)
+
+    total = round(hours * 600) % 14400  # tenths of a minute
+    return '%02d:%02d.%d' % (total // 600, total // 10 % 60, total % 10)
+
+# From degrees to LX200 declination
+#
+# \param deg Declination in degrees [-90, 90]
+# \param precise Long format "sDD*MM'SS" if True, short "sDD*MM" otherwise
+# \return Declination in LX200 format, without trailing '#'
+
+
+def deg_2_lx200DecStr(deg, precise=True):
+    sign = '-' if deg < 0 else '+'
+    if precise:
+        total = round(abs(deg) * 3600)
+        return '%s%02d*%02d\'%02d' % (sign, total // 3600, total // 60 % 60, total % 60)
+
+    total = round(abs(deg) * 60)
+    return '%s%02d*%02d' % (sign, total // 60, total % 60)
 
 
 # Transforms hours from float to string format
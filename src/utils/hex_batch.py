@@ -0,0 +1,103 @@
+"""
+Пакетные (NumPy) версии hex_to_degrees / degrees_to_hex из astropi_utils.
+
+Используются для воспроизведения записанных сессий и построения сеток наведения из десятков
+тысяч позиций NexStar. Результат побитово совпадает со скалярными функциями: округление
+до 4/8 знаков выполняется в целых числах (половина - к четному, как у round()),
+а деление на 10^digits в float64 округляется так же, как разбор десятичной строки в round().
+"""
+from fractions import Fraction
+
+import numpy as np
+
+from src.utils.astropi_utils import _SCALE_DEG_TO_HEX_CACHE, _DIGIT_CACHE, _MASK_CACHE, STANDARD, PRECISE
+
+_BITS_CACHE = {
+    False: STANDARD.bit_length() - 1,
+    True: PRECISE.bit_length() - 1
+}
+
+# value * 360 * 10^digits / 2^bits = value * numerator / 2^shift (дробь сокращена, чтобы не переполнить int64)
+_ROUNDING_CACHE = {}
+for _precise in (False, True):
+    _ratio = Fraction(360 * 10 ** _DIGIT_CACHE[_precise], 2 ** _BITS_CACHE[_precise])
+    _ROUNDING_CACHE[_precise] = (_ratio.numerator, _ratio.denominator.bit_length() - 1,
+                                 float(10 ** _DIGIT_CACHE[_precise]))
+
+# ASCII -> значение шестнадцатеричной цифры, NUL (дополнение строк в массиве 'S') пропускается
+_PAD = 16
+_INVALID = 255
+_NIBBLES = np.full(256, _INVALID, dtype=np.uint8)
+_NIBBLES[0] = _PAD
+for _i, _c in enumerate(b'0123456789ABCDEF'):
+    _NIBBLES[_c] = _i
+for _i, _c in enumerate(b'abcdef', start=10):
+    _NIBBLES[_c] = _i
+
+_HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+
+def _to_byte_strings(hex_values) -> np.ndarray:
+    values = np.asarray(hex_values)
+    if values.dtype.kind != 'S':
+        values = values.astype(str).astype('S')
+    return values.reshape(-1)
+
+
+def parse_hex(hex_values) -> np.ndarray:
+    """Массив шестнадцатеричных строк (str или bytes) -> массив int64"""
+    values = _to_byte_strings(hex_values)
+    width = values.dtype.itemsize
+    nibbles = _NIBBLES[values.view(np.uint8).reshape(len(values), width)]
+
+    if (nibbles == _INVALID).any():
+        raise ValueError("Некорректная шестнадцатеричная строка в пакете")
+
+    result = np.zeros(len(values), dtype=np.int64)
+    for column in nibbles.T:
+        digit = column != _PAD
+        result = np.where(digit, (result << 4) | column, result)
+    return result
+
+
+def hex_to_degrees_batch(hex_values, precise: bool) -> np.ndarray:
+    """
+    Пакетный hex_to_degrees: массив строк "12CE" / "1B0D70A6" -> массив градусов [0, 360).
+
+    Примеры:
+        >>> hex_to_degrees_batch(["12CE", "34AB"], False)
+        array([26.4441, 74.0643])
+    """
+    numerator, shift, divisor = _ROUNDING_CACHE[precise]
+    values = parse_hex(hex_values) & _MASK_CACHE[precise]  # normalize_angle: value/2^bits оборота
+
+    scaled = values * numerator
+    quotient = scaled >> shift
+    remainder = scaled & ((1 << shift) - 1)
+    half = 1 << (shift - 1)
+    quotient += (remainder > half) | ((remainder == half) & (quotient & 1 == 1))
+
+    return quotient / divisor
+
+
+def degrees_to_hex_int_batch(degrees, precise: bool) -> np.ndarray:
+    """Массив градусов -> массив целых долей оборота (до перевода в строку)"""
+    degrees = np.mod(np.asarray(degrees, dtype=np.float64).reshape(-1), 360.0)
+    return np.rint(degrees * _SCALE_DEG_TO_HEX_CACHE[precise]).astype(np.int64) & _MASK_CACHE[precise]
+
+
+def degrees_to_hex_batch(degrees, precise: bool) -> np.ndarray:
+    """
+    Пакетный degrees_to_hex: массив градусов -> массив строк из 4 или 8 шестнадцатеричных цифр.
+
+    Примеры:
+        >>> degrees_to_hex_batch([26.4441, -90.0], False)
+        array(['12CE', 'C000'], dtype='<U4')
+    """
+    digits = _DIGIT_CACHE[precise]
+    values = degrees_to_hex_int_batch(degrees, precise)
+
+    shifts = np.arange(digits - 1, -1, -1, dtype=np.int64) * 4
+    ascii_digits = _HEX_DIGITS[(values[:, None] >> shifts) & 0xF]
+
+    return np.ascontiguousarray(ascii_digits).view(f'S{digits}').reshape(-1).astype(f'U{digits}')
@@ -0,0 +1,361 @@
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils.app_logger import AppLogger
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_METRICS_HOST = '127.0.0.1'
+
+# границы корзин гистограмм, секунды
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class _Shards:
+    """
+    Значения метрики по потокам: каждый поток пишет только в свой словарь, без блокировок,
+    поэтому запись не задерживает поток импульсов. Словари потоков складываются только при чтении.
+
+    Словари завершившихся потоков (клиенты, задания движения) переносятся в общий базовый
+    словарь при регистрации нового потока и при чтении, поэтому список не растет
+    с каждым подключением. merge(накопленное, значение потока) возвращает новое значение.
+    """
+
+    def __init__(self, merge):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()  # регистрация потока, перенос и чтение базового словаря
+        self._all = []  # (поток, словарь потока)
+        self._base = {}
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._fold_dead()
+                self._all.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_dead(self):
+        """Перенести словари завершившихся потоков в базовый, вызывается под _lock"""
+        alive = []
+        for thread, shard in self._all:
+            if thread.is_alive():
+                alive.append((thread, shard))
+                continue
+            for key, value in shard.items():  # поток завершен, словарь больше не меняется
+                self._base[key] = self._merge(self._base[key], value) if key in self._base else value
+        self._all = alive
+
+    def snapshot(self):
+        with self._lock:
+            self._fold_dead()
+            shards = [shard for _, shard in self._all]
+            base = self._base.copy()  # значения базового словаря не изменяются, а заменяются
+        return [base] + [shard.copy() for shard in shards]  # copy словаря атомарна под GIL
+
+    @property
+    def threads(self) -> int:
+        """Сколько потоков пишут в метрику отдельно (для проверки переноса)"""
+        return len(self._all)
+
+
+def _add(total, value):
+    return total + value
+
+
+def _add_counts(total, counts):
+    return [a + b for a, b in zip(total, counts)]
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children = {}
+
+    def labels(self, *values):
+        """Метрика с заданными значениями меток, создается один раз и кэшируется"""
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name}: ожидаются метки {self.label_names}, получено {values}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._child(tuple(str(v) for v in values)))
+        return child
+
+    def _child(self, values):
+        raise NotImplementedError
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.label_names, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items(), key=lambda item: tuple(map(str, item[0]))):
+            lines.extend(self._render_child(child._values, child))
+        return lines
+
+    def _render_child(self, values, child):
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('_values', '_shards')
+
+    def __init__(self, values):
+        self._values = values
+        self._shards = _Shards(_add)
+
+    def inc(self, amount=1):
+        shard = self._shards.mine()
+        shard[None] = shard.get(None, 0) + amount
+
+    @property
+    def value(self):
+        return sum(shard.get(None, 0) for shard in self._shards.snapshot())
+
+
+class Counter(_Metric):
+    """Только растущий счетчик"""
+    kind = 'counter'
+
+    def _child(self, values):
+        return _CounterChild(values)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value)}"]
+
+
+class _GaugeChild:
+    """
+    Значение задается либо set(), либо изменениями inc()/dec() по потокам. Смешивать нельзя:
+    set() не может атомарно обнулить словари других потоков, и их изменения легли бы поверх.
+    """
+    __slots__ = ('_values', '_value', '_shards', '_function', '_mode')
+
+    def __init__(self, values):
+        self._values = values
+        self._value = 0.0
+        self._shards = _Shards(_add)
+        self._function = None
+        self._mode = None  # 'set' или 'inc' после первого изменения
+
+    def set(self, value):
+        if self._mode != 'set':
+            self._use('set')
+        self._value = value  # присваивание атомарно, последнее значение побеждает
+
+    def _use(self, mode):
+        if self._mode is not None and self._mode != mode:
+            raise ValueError(f"Gauge: set() нельзя смешивать с inc()/dec() (уже используется {self._mode})")
+        self._mode = mode
+
+    def inc(self, amount=1):
+        if self._mode != 'inc':
+            self._use('inc')
+        shard = self._shards.mine()
+        shard[None] = shard.get(None, 0) + amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Значение считается функцией при каждом чтении (ничего не стоит на горячем пути)"""
+        self._function = function
+
+    @property
+    def value(self):
+        if self._function is not None:
+            return self._function()
+        return self._value + sum(shard.get(None, 0) for shard in self._shards.snapshot())
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться"""
+    kind = 'gauge'
+
+    def _child(self, values):
+        return _GaugeChild(values)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ('_values', '_buckets', '_shards')
+
+    def __init__(self, values, buckets):
+        self._values = values
+        self._buckets = buckets
+        self._shards = _Shards(_add_counts)
+
+    def observe(self, value):
+        shard = self._shards.mine()
+        counts = shard.get(None)
+        if counts is None:
+            # счетчики корзин (последняя - +Inf) и сумма
+            counts = shard[None] = [0] * (len(self._buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self._buckets, value)] += 1
+        counts[-1] += value
+
+    def totals(self):
+        """Количество в каждой корзине (не накопленное), общее количество и сумма"""
+        buckets = [0] * (len(self._buckets) + 1)
+        total = 0.0
+        for shard in self._shards.snapshot():
+            counts = shard.get(None)
+            if counts is None:
+                continue
+            counts = list(counts)
+            for i in range(len(buckets)):
+                buckets[i] += counts[i]
+            total += counts[-1]
+        return buckets, sum(buckets), total
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными границами корзин (le - верхняя граница включительно)"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self, values):
+        return _HistogramChild(values, self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        buckets, count, total = child.totals()
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(self.buckets + (math.inf,), buckets):
+            cumulative += bucket
+            lines.append(f"{self.name}_bucket{self._label_text(values, [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Метрики процесса, повторная регистрация с тем же именем возвращает существующую метрику"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Метрика {name} уже зарегистрирована как {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._register(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()) -> Gauge:
+        return self._register(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labels, buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsServer:
+    """HTTP-сервер для сбора метрик (GET /metrics), работает в фоновом потоке"""
+
+    def __init__(self, registry=METRICS, host=DEFAULT_METRICS_HOST, port=0):
+        self.logger = AppLogger.info("Metrics")
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # каждый опрос в лог не пишем
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]  # при port=0 порт выбирает ОС
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Метрики доступны на http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
@@ -0,0 +1,45 @@
+import threading
+import time
+
+DEFAULT_TICK = 0.1  # секунд
+
+
+class QuantizedCache:
+    """
+    Кэш значений, действительных в пределах одного кванта времени (tick) и одной версии положения.
+
+    Значение пересчитывается, когда меняется версия положения монтировки или начинается
+    новый квант времени, поэтому сколько бы клиентов ни опрашивали координаты,
+    расчет выполняется не чаще одного раза за tick. При tick <= 0 кэш учитывает только версию.
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.RLock()  # build() может обращаться к этому же кэшу
+
+    def _stamp(self, version):
+        if self.tick > 0:
+            return version, int(self.clock() / self.tick)
+        return version, None
+
+    def get(self, version, key, build):
+        """Значение по ключу key для версии version, при промахе вычисляется через build()"""
+        stamp = self._stamp(version)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        with self._lock:
+            # пока ждали блокировку, значение мог посчитать другой поток
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+
+            value = build()
+            self._entries[key] = (stamp, value)
+            return value
+
+    def clear(self):
+        self._entries.clear()
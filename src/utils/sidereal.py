@@ -0,0 +1,170 @@
+"""
+Быстрый расчет звездного времени.
+
+GMST считается в замкнутом виде по модели IAU 2006 (угол поворота Земли ERA плюс полином
+прецессии), а время берется от монотонных часов, привязанных к UTC. Разница с astropy
+(в основном поправка UT1-UTC, которую модель не знает) измеряется при калибровке
+и добавляется к результату. Калибровка выполняется редко и в фоновом потоке,
+поэтому вызов стоит микросекунды вместо миллисекунд у astropy.
+"""
+import datetime
+import threading
+import time
+
+SECONDS_PER_DAY = 86400.0
+J2000_UNIX = 946728000.0  # 2000-01-01 12:00:00 UTC (JD 2451545.0)
+TT_MINUS_UTC = 69.184     # TAI-UTC (37 с) + 32.184 с, влияет только на малый полином прецессии
+
+DEFAULT_RECALIBRATE_INTERVAL = 600.0  # секунд
+
+# оценки погрешности, угловые секунды
+UNCALIBRATED_ERROR_ARCSEC = 0.9 * 15.04  # |UT1-UTC| <= 0.9 с
+CALIBRATION_ERROR_ARCSEC = 0.0001        # округление double в формуле и при сравнении
+DEFAULT_DRIFT_ARCSEC_PER_DAY = 0.05      # UT1-UTC меняется примерно на 1-3 мс в сутки
+
+
+def analytic_gmst_deg(unix_time: float) -> float:
+    """GMST в градусах по IAU 2006 (UT1 принимается равным UTC)"""
+    du = (unix_time - J2000_UNIX) / SECONDS_PER_DAY
+    # дробную часть суток выделяем отдельно, чтобы не терять точность на больших du
+    era = (du % 1.0 + 0.7790572732640 + 0.00273781191135448 * du) % 1.0 * 360.0
+
+    t = (du + TT_MINUS_UTC / SECONDS_PER_DAY) / 36525.0
+    poly = 0.014506 + (4612.156534 + (1.3915817 + (-0.00000044 + (-0.000029956 - 0.0000000368 * t) * t) * t) * t) * t
+
+    return (era + poly / 3600.0) % 360.0
+
+
+def astropy_time():
+    """
+    Класс astropy.time.Time, импортируется по требованию.
+
+    Импорт astropy занимает секунды на Orange Pi, поэтому он выполняется не при старте
+    сервера, а при первой калибровке в фоновом потоке (SiderealClock.start).
+    """
+    from astropy.time import Time
+    from astropy.utils import iers
+    iers.conf.auto_download = False
+    iers.conf.auto_max_age = None
+    return Time
+
+
+def astropy_gmst_deg(unix_time: float) -> float:
+    """Эталонное среднее звездное время Гринвича через astropy (медленно)"""
+    return astropy_time()(unix_time, format='unix', scale='utc').sidereal_time('mean', longitude=0.0).deg
+
+
+def _wrap_signed(angle: float) -> float:
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class SiderealClock:
+    """
+    Местное звездное время по монотонным часам с периодической калибровкой по astropy.
+
+    Параметры:
+        recalibrate_interval (float): период фоновой калибровки в секундах, None - только вручную (calibrate)
+        clock: монотонные часы
+        wall_clock: системное время UTC (unix), по нему привязываются монотонные часы
+    """
+
+    def __init__(self, recalibrate_interval=DEFAULT_RECALIBRATE_INTERVAL, clock=time.monotonic, wall_clock=time.time):
+        self.recalibrate_interval = recalibrate_interval
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        # (монотонное время привязки, unix привязки, поправка к модели в градусах, unix калибровки)
+        # заменяется целиком, поэтому читается без блокировки
+        self._state = (clock(), wall_clock(), 0.0, None)
+        self._drift_arcsec_per_day = DEFAULT_DRIFT_ARCSEC_PER_DAY
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def unix_now(self) -> float:
+        anchor_mono, anchor_unix, _, _ = self._state
+        return anchor_unix + (self.clock() - anchor_mono)
+
+    def gmst_deg(self, obs_time: datetime.datetime = None) -> float:
+        """Среднее звездное время Гринвича в градусах [0, 360)"""
+        if self._thread is None and self.recalibrate_interval is not None:
+            self.start()
+
+        anchor_mono, anchor_unix, offset, _ = self._state
+        if obs_time is None:
+            unix_time = anchor_unix + (self.clock() - anchor_mono)
+        else:
+            unix_time = obs_time.astimezone(datetime.timezone.utc).timestamp()
+
+        return (analytic_gmst_deg(unix_time) + offset) % 360.0
+
+    def lst_deg(self, longitude_deg: float, obs_time: datetime.datetime = None) -> float:
+        """Местное звездное время в градусах [0, 360) для восточной долготы longitude_deg"""
+        return (self.gmst_deg(obs_time) + longitude_deg) % 360.0
+
+    def calibrate(self) -> float:
+        """
+        Сравнивает модель с astropy в текущий момент и обновляет поправку.
+
+        Возвращает:
+            float: изменение поправки относительно предыдущей калибровки, угловые секунды
+        """
+        # astropy считает миллисекунды (при первом вызове - секунды), блокировку берем только для замены состояния
+        unix_time = self.wall_clock()
+        anchor_mono = self.clock()
+        offset = _wrap_signed(astropy_gmst_deg(unix_time) - analytic_gmst_deg(unix_time))
+
+        with self._lock:
+            _, _, last_offset, last_unix = self._state
+            if last_unix is not None and unix_time < last_unix:
+                return 0.0  # параллельная калибровка уже записала более свежий результат
+            change = _wrap_signed(offset - last_offset) * 3600.0
+            if last_unix is not None and unix_time > last_unix:
+                drift = abs(change) / ((unix_time - last_unix) / SECONDS_PER_DAY)
+                self._drift_arcsec_per_day = max(drift, DEFAULT_DRIFT_ARCSEC_PER_DAY)
+
+            self._state = (anchor_mono, unix_time, offset, unix_time)
+            return change
+
+    @property
+    def calibrated(self) -> bool:
+        return self._state[3] is not None
+
+    def error_bound_arcsec(self, obs_time: datetime.datetime = None) -> float:
+        """Оценка максимальной погрешности относительно astropy, угловые секунды"""
+        calibrated_unix = self._state[3]
+        if calibrated_unix is None:
+            return UNCALIBRATED_ERROR_ARCSEC
+
+        unix_time = self.unix_now() if obs_time is None else obs_time.timestamp()
+        elapsed_days = abs(unix_time - calibrated_unix) / SECONDS_PER_DAY
+        return CALIBRATION_ERROR_ARCSEC + self._drift_arcsec_per_day * elapsed_days
+
+    def start(self):
+        """Запускает фоновую калибровку (первая - сразу)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            # у каждого потока свое событие: поток, остановленный stop(), не продолжит работу после нового start()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                            name="sidereal-calibration", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Останавливает фоновую калибровку, после этого ее можно запустить снова (start)"""
+        with self._lock:
+            self._stop_event.set()
+            self._thread = None
+
+    def _run(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                self.calibrate()
+            except Exception:
+                pass  # модель без поправки остается рабочей, попробуем в следующий раз
+            stop_event.wait(self.recalibrate_interval)
+
+
+SIDEREAL_CLOCK = SiderealClock()
@@ -7,4 +7,7 @@ python3 -m src.main -r nexstar
 # -r (--protocol) выбор протокола передачи координат (lx200, nexstar, etc)
 # -i (--ip)       адрес хоста сервера
 # -p (--port)     порт хоста сервера
-# -s (--sync)     включить синхронный режим
\ No newline at end of file
+# -s (--sync)     включить синхронный режим
+# -m (--mode)     режим обслуживания клиентов (thread, sync, async)
+# --max-connections, --idle-timeout  лимит клиентов и таймаут неактивного клиента (для async)
+# -g (--gpio)     GPIO-библиотека для real (opi - OPi.GPIO, gpiod - libgpiod v2, все пины STEP одним вызовом)
@@ -0,0 +1,2 @@
+# Бенчмарки запускаются вручную, например: python -m test.benchmark.bench_dispatch
+# (имена файлов bench_*.py не собираются pytest)
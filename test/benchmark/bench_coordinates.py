@@ -0,0 +1,89 @@
+"""
+Разбор строковых координат: прежние функции coordinate_utils и новый слой разбора.
+
+Прежние реализации скопированы сюда без изменений (re.compile на каждый вызов,
+hourStr_2_deg через строку с радианами).
+Запуск: python -m test.benchmark.bench_coordinates
+"""
+import logging
+import math
+import re
+import timeit
+
+from src.utils import coordinate_utils
+
+NUMBER = 50_000
+
+
+def legacy_radStr_2_deg(rad):
+    exp = re.compile('^(-?)(\\+?)[0-9]{1}\\.[0-9]{4,8}')
+    if not exp.match(rad):
+        return None
+    r = float(rad)
+    if r < 0:
+        r = (2 * math.pi) - abs(r)
+    return (r * 180) / math.pi
+
+
+def legacy_rad_2_radStr(rad):
+    if rad < 0.0:
+        return '%f' % rad
+    return '+%f' % rad
+
+
+def legacy_hourStr_2_rad(h):
+    exp = re.compile('^[0-9]{,3}h[0-9]{,3}m[0-9]{,3}s$')
+    if not exp.match(h):
+        logging.error("Error in param: %s" % h)
+        return None
+    h = h.replace('h', '.').replace("m", '.').replace("s", '.')
+    h_dic = h.split('.')
+    nh = (float(h_dic[0]) + (float(h_dic[1]) / 60) + (float(h_dic[2]) / (60 ** 2)))
+    return round((nh * 15 * math.pi) / 180, 6)
+
+
+def legacy_hourStr_2_deg(h):
+    return legacy_radStr_2_deg(legacy_rad_2_radStr(legacy_hourStr_2_rad(h)))
+
+
+def legacy_degStr_2_rad(d):
+    exp1 = re.compile('^-?[0-9]{,3}(º|ᵒ)[0-9]{,3}\'[0-9]{,3}([\']{2}|")$')
+    exp2 = re.compile('^-?[0-9]{,3}\\.[0-9]{,6}(º|ᵒ)$')
+    if not exp1.match(d) and not exp2.match(d):
+        return None
+    elif exp1.match(d):
+        d = d.replace('º', '.').replace("''", '.').replace("'", '.')
+        d_dic = d.split('.')
+        d_deg, d_min, d_sec = float(d_dic[0]), float(d_dic[1]), float(d_dic[2])
+        if d_deg < 0:
+            d_min, d_sec = -d_min, -d_sec
+        d_ndeg = (d_deg + (d_min / 60) + (d_sec / (60 ** 2)))
+    else:
+        d_ndeg = float(d.replace('º', ''))
+        if d_ndeg < 0:
+            d_ndeg = 360 - abs(d_ndeg)
+    return round((d_ndeg * math.pi) / 180, 6)
+
+
+CASES = [
+    ("radStr_2_deg", lambda: legacy_radStr_2_deg("+0.785398"), lambda: coordinate_utils.radStr_2_deg("+0.785398")),
+    ("hourStr_2_rad", lambda: legacy_hourStr_2_rad("12h34m56s"), lambda: coordinate_utils.hourStr_2_rad("12h34m56s")),
+    ("hourStr_2_deg", lambda: legacy_hourStr_2_deg("12h34m56s"), lambda: coordinate_utils.hourStr_2_deg("12h34m56s")),
+    ("degStr_2_rad", lambda: legacy_degStr_2_rad("-45º30'15''"), lambda: coordinate_utils.degStr_2_rad("-45º30'15''")),
+]
+
+
+def main():
+    print(f"{'функция':>16} {'было, мкс':>10} {'стало, мкс':>11}")
+    for name, legacy, current in CASES:
+        before = timeit.timeit(legacy, number=NUMBER) / NUMBER * 1e6
+        after = timeit.timeit(current, number=NUMBER) / NUMBER * 1e6
+        print(f"{name:>16} {before:>10.2f} {after:>11.2f}")
+
+    ras = ["12:34:56#"] * 1000
+    bulk = timeit.timeit(lambda: coordinate_utils.lx200RaStr_2_deg_bulk(ras), number=100) / 100 / len(ras) * 1e6
+    print(f"{'LX200 RA, пакет':>16} {'-':>10} {bulk:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Стоимость выбора обработчика команды NexStar: прежняя цепочка startswith и таблица по первому байту.
+
+Обработчики заменены пустыми, поэтому измеряется только диспетчеризация. Столбец "таблица"
+повторяет выбор обработчика из handle_command без записи метрик, чтобы сравнение с цепочкой
+было честным; "с метриками" - весь handle_command, включая perf_counter и запись в гистограмму.
+Запуск: python -m test.benchmark.bench_dispatch
+"""
+import logging
+import timeit
+
+from src.nexstar.commands import Command
+from src.nexstar.nexstar_server import ServerNexStar
+from test.fakes import FakeMountController
+
+NUMBER = 200_000
+
+# порядок проверок как в прежнем handle_command
+LEGACY_ORDER = [
+    Command.PASS_THROUGH, Command.GET_LOCATION, Command.SET_LOCATION, Command.GET_RA_DEC,
+    Command.GET_RA_DEC_PRECISION, Command.SYNC_RA_DEC, Command.SYNC_RA_DEC_PRECISION, Command.GET_TIME,
+    Command.SET_TIME, Command.HANDSHAKE, Command.VERSION, Command.GOTO_IN_PROG, Command.ALIGN_COMPLETE,
+    Command.GET_TRACKING_MODE, Command.SET_TRACKING_MODE, Command.GOTO_RA_DEC, Command.GOTO_RA_DEC_PRECISION,
+    Command.GOTO_AZM_ALT, Command.GOTO_AZM_ALT_PRECISION, Command.GET_MODEL, Command.CANCEL_GOTO,
+]
+
+SAMPLES = [b'K', b'V', b'P', b'L', b'e', b'M']
+
+
+class BenchServer(ServerNexStar):
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+
+def noop(data):
+    return Command.END
+
+
+def legacy_dispatch(server, data):
+    if not isinstance(data, bytes):
+        return None
+    server.logger.debug(f"Получена команда: {data}")
+    if not data:
+        return None
+    if data == Command.END:
+        return b''
+    elif data == Command.ZERO:
+        return data
+    for command in LEGACY_ORDER:
+        if data.startswith(command):
+            return noop(data)
+    return Command.END
+
+
+def table_dispatch(server, data):
+    # handle_command без замера времени и гистограммы
+    if not isinstance(data, bytes):
+        return None
+    server.logger.debug("Получена команда: %s", data)
+    if not data:
+        return None
+    handler = server._dispatch[data[0]]
+    if handler is None:
+        return Command.END
+    return handler(data)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    server = BenchServer('127.0.0.1', 0)
+    for command in Command:
+        if command not in (Command.END, Command.ZERO):
+            server.register_command(command, noop)
+
+    print(f"{'команда':>8} {'цепочка, нс':>12} {'таблица, нс':>12} {'с метриками, нс':>16}")
+    for data in SAMPLES:
+        legacy = timeit.timeit(lambda: legacy_dispatch(server, data), number=NUMBER) / NUMBER * 1e9
+        table = timeit.timeit(lambda: table_dispatch(server, data), number=NUMBER) / NUMBER * 1e9
+        measured = timeit.timeit(lambda: server.handle_command(data), number=NUMBER) / NUMBER * 1e9
+        print(f"{data.decode():>8} {legacy:>12.0f} {table:>12.0f} {measured:>16.0f}")
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Нагрузочный тест сервера: N одновременных клиентов и пропускная способность по протоколам и режимам.
+
+Сервер (ServerNexStar или ServerLX200 на FakeMountController) запускается отдельным процессом
+на loopback, чтобы клиенты не делили с ним GIL. Каждый клиент - поток, который отправляет
+--commands команд по кругу из своего набора и ждет ответ на каждую. Наборы повторяют реальных
+клиентов: stellarium - опрос положения, skysafari - рукопожатие/версия/режим/GOTO в процессе
+вперемешку с опросом, goto - наведение с опросом и отменой. Клиентам наборы из --mix
+назначаются по очереди. Печатается команд/с, задержка ответа p50/p99/p999 и процессорное
+время сервера на команду (все потоки процесса сервера, включая сопровождение и импульсы).
+Логирование сервера отключено, измеряется путь обработки команд, а не вывод в терминал.
+
+В режиме sync клиенты обслуживаются по очереди, задержка считается с момента отправки
+команды, поэтому ожидание подключения в нее не входит, но снижает команд/с.
+Запуск:
+    python -m test.benchmark.bench_load [--clients 8] [--commands 2000] [--mix stellarium,skysafari]
+    python -m test.benchmark.bench_load --protocol nexstar --mode thread,async --mix goto
+"""
+import argparse
+import logging
+import math
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from src.lx200.lx200_server import ServerLX200
+from src.nexstar.nexstar_server import ServerNexStar
+from src.server import SERVE_MODES
+from test.fakes import FakeMountController
+
+HOST = '127.0.0.1'
+REPLY_TIMEOUT = 60.0
+
+# наборы команд клиентов, на каждую команду сервер отвечает одним ответом, который заканчивается на '#'
+MIXES = {
+    'nexstar': {
+        'stellarium': [b'e'],
+        'skysafari': [b'Kx', b'V', b't', b'J', b'L', b'e', b'e', b'e'],
+        'goto': [b'r20000000,10000000', b'L', b'e', b'L', b'e', b'M'],
+    },
+    'lx200': {
+        'stellarium': [b':GR#', b':GD#'],
+        'skysafari': [b':GVP#', b':GR#', b':GD#', b':D#', b':GR#', b':GD#'],
+    },
+}
+
+
+class BenchNexStar(ServerNexStar):
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+
+class BenchLX200(ServerLX200):
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+
+SERVERS = {'nexstar': BenchNexStar, 'lx200': BenchLX200}
+
+
+def serve(protocol, mode):
+    """
+    Дочерний процесс: печатает порт, затем на каждую строку из stdin - процессорное время
+    процесса. Закрытие stdin останавливает сервер.
+    """
+    logging.disable(logging.CRITICAL)
+    server = SERVERS[protocol](HOST, 0, mode=mode, position_tick=0)
+    threading.Thread(target=server.start, daemon=True).start()
+    print(server.port, flush=True)
+    for _ in sys.stdin:
+        print(time.process_time(), flush=True)
+    server.stop()
+
+
+class Client(threading.Thread):
+    def __init__(self, port, commands, count):
+        super().__init__(daemon=True)
+        self.port = port
+        self.commands = commands
+        self.count = count
+        self.latencies = []
+        self.error = None
+
+    def run(self):
+        try:
+            with socket.create_connection((HOST, self.port), timeout=REPLY_TIMEOUT) as conn:
+                for i in range(self.count):
+                    command = self.commands[i % len(self.commands)]
+                    started = time.perf_counter()
+                    conn.sendall(command)
+                    reply = b''
+                    while not reply.endswith(b'#'):
+                        chunk = conn.recv(64)
+                        if not chunk:
+                            raise ConnectionError(f"соединение закрыто после {i} команд")
+                        reply += chunk
+                    self.latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            self.error = e
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * q) - 1)] if ordered else 0.0
+
+
+def measure(protocol, mode, mixes, clients, count):
+    process = subprocess.Popen([sys.executable, '-m', 'test.benchmark.bench_load', '--serve', protocol, '--mode', mode],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+    def cpu_time():
+        process.stdin.write('\n')
+        process.stdin.flush()
+        return float(process.stdout.readline())
+
+    try:
+        port = int(process.stdout.readline())
+        workers = [Client(port, MIXES[protocol][mixes[i % len(mixes)]], count) for i in range(clients)]
+
+        cpu_started = cpu_time()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        cpu = cpu_time() - cpu_started
+    finally:
+        process.stdin.close()
+        process.wait()
+
+    for worker in workers:
+        if worker.error is not None:
+            raise RuntimeError(f"{protocol}/{mode}: ошибка клиента: {worker.error}")
+
+    latencies = sorted(latency for worker in workers for latency in worker.latencies)
+    return len(latencies), elapsed, cpu, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест сервера')
+    parser.add_argument('--protocol', default='nexstar,lx200', help="протоколы через запятую")
+    parser.add_argument('--mode', default=','.join(SERVE_MODES), help="режимы сервера через запятую")
+    parser.add_argument('--mix', default='stellarium,skysafari', help="наборы команд клиентов через запятую")
+    parser.add_argument('--clients', type=int, default=8, help="число одновременных клиентов")
+    parser.add_argument('--commands', type=int, default=2000, help="команд на клиента")
+    parser.add_argument('--serve', choices=list(SERVERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.mode)
+        return
+
+    mixes = args.mix.split(',')
+    print(f"Клиентов {args.clients}, команд на клиента {args.commands}, наборы: {', '.join(mixes)}")
+    print(f"{'протокол':>9} {'режим':>7} {'команд/с':>9} {'p50, мкс':>9} {'p99, мкс':>9} {'p999, мкс':>10} "
+          f"{'CPU, мкс/команду':>17}")
+    for protocol in args.protocol.split(','):
+        unknown = [mix for mix in mixes if mix not in MIXES[protocol]]
+        if unknown:
+            print(f"{protocol:>9}: нет наборов {', '.join(unknown)}, пропущен")
+            continue
+        for mode in args.mode.split(','):
+            total, elapsed, cpu, latencies = measure(protocol, mode, mixes, args.clients, args.commands)
+            p50, p99, p999 = (percentile(latencies, q) * 1e6 for q in (0.5, 0.99, 0.999))
+            print(f"{protocol:>9} {mode:>7} {total / elapsed:>9.0f} {p50:>9.0f} {p99:>9.0f} {p999:>10.0f} "
+                  f"{cpu / total * 1e6:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
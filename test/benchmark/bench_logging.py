@@ -0,0 +1,80 @@
+"""
+Опоздание импульсов STEP при логировании из цикла шагов: синхронный вывод и вывод через очередь.
+
+Один оборот NEMA17 на микрошаге 1/16 (3200 импульсов), на каждом --every шаге сообщение о прогрессе,
+как в StepMotorController.move. Вывод идет в поток, каждая запись в который занимает --write мс
+(заблокированный journald или медленный терминал), GPIO заменен FakeGPIO.
+Режимы чередуются --runs раз, печатаются медианы по прогонам.
+Запуск: python -m test.benchmark.bench_logging [--delay 0.0005] [--every 32] [--write 0.5] [--runs 5]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from src.motor.pulse_engine import PulseEngine
+from src.utils.app_logger import AppLogger
+from test.fakes import FakeGPIO
+
+STEPS = 3200
+
+
+class SlowSink:
+    def __init__(self, delay):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.writes += 1
+
+    def flush(self):
+        pass
+
+
+def run(logger, delays, every):
+    def on_step(done):
+        if done % every == 0:
+            logger.info("Выполнено: %.1f%% (%d/%d шагов)", done / STEPS * 100, done, STEPS)
+
+    return PulseEngine(FakeGPIO(), 'STEP').run(delays, on_step=on_step)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--delay', type=float, default=0.0005, help="задержка между шагами, сек")
+    parser.add_argument('--every', type=int, default=32, help="сообщение каждые N шагов")
+    parser.add_argument('--write', type=float, default=0.5, help="время одной записи в вывод, мс")
+    parser.add_argument('--runs', type=int, default=5, help="число прогонов каждого режима")
+    args = parser.parse_args()
+
+    sink = SlowSink(args.write / 1000)
+    stdout, sys.stdout = sys.stdout, sink
+    try:
+        logger = AppLogger.info("bench logging")
+    finally:
+        sys.stdout = stdout
+
+    delays = [args.delay] * STEPS
+    results = {'синхронный': [], 'через очередь': []}
+
+    for _ in range(args.runs):
+        results['синхронный'].append(run(logger, delays, args.every))
+
+        AppLogger.start_async()
+        try:
+            results['через очередь'].append(run(logger, delays, args.every))
+        finally:
+            AppLogger.stop_async()
+
+    print(f"{STEPS} шагов по {args.delay * 1e3:.2f} мс, сообщение каждые {args.every} шагов, "
+          f"запись {args.write:.2f} мс, прогонов {args.runs}, медианы:")
+    for name, runs in results.items():
+        mean, p99, worst, drift = (statistics.median(getattr(stats, field) for stats in runs)
+                                   for field in ('mean', 'p99', 'max', 'drift'))
+        print(f"{name:>14}: опоздание фронтов среднее {mean * 1e6:.0f} мкс, p99 {p99 * 1e6:.0f} мкс, "
+              f"макс {worst * 1e6:.0f} мкс, уход {drift * 1e3:+.1f} мс")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Точность импульсов STEP: прежний time.sleep на каждый полушаг и генератор по расчетному времени.
+
+Один оборот NEMA17 на микрошаге 1/16 (3200 импульсов) с постоянной задержкой,
+GPIO заменен FakeGPIO, поэтому измеряется только планирование фронтов.
+Запуск: python -m test.benchmark.bench_pulses [--delay 0.0005]
+"""
+import argparse
+import time
+
+from src.motor.pulse_engine import PulseEngine
+from test.fakes import FakeGPIO
+
+STEPS = 3200
+
+
+def legacy_run(gpio, delays):
+    """Прежний цикл StepMotorController.move"""
+    started = time.perf_counter()
+    for delay in delays:
+        gpio.output('STEP', gpio.HIGH)
+        time.sleep(delay / 2)
+        gpio.output('STEP', gpio.LOW)
+        time.sleep(delay / 2)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--delay', type=float, default=0.0005, help="задержка между шагами, сек")
+    args = parser.parse_args()
+
+    delays = [args.delay] * STEPS
+    nominal = args.delay * STEPS
+
+    legacy = legacy_run(FakeGPIO(), delays)
+    stats = PulseEngine(FakeGPIO(), 'STEP').run(delays)
+
+    print(f"{STEPS} шагов по {args.delay * 1e3:.2f} мс, расчетно {nominal:.3f} сек")
+    print(f"sleep на полушаг: {legacy:.3f} сек (уход {legacy - nominal:+.3f} сек)")
+    print(f"по расчетному времени: {stats.elapsed:.3f} сек (уход {stats.elapsed - nominal:+.3f} сек)")
+    print(f"опоздание фронтов: среднее {stats.mean * 1e6:.0f} мкс, p99 {stats.p99 * 1e6:.0f} мкс, "
+          f"макс {stats.max * 1e6:.0f} мкс")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Время от запуска процесса сервера до первого принятого подключения.
+
+Запускает сервер отдельным процессом и подключается к нему, пока не получит ответ
+на рукопожатие NexStar ('Kx' -> 'x#'). Повторяется несколько раз, печатается медиана.
+
+Запуск:
+    python -m test.benchmark.bench_startup                 # сервер на FakeMountController
+    python -m test.benchmark.bench_startup --type real     # настоящий src.main (на Orange Pi)
+    python -m test.benchmark.bench_startup --eager-astropy # как раньше: astropy импортируется до bind
+"""
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+HOST = '127.0.0.1'
+PORT = 4031
+CONNECT_TIMEOUT = 60.0
+
+
+def serve_fake(port, eager_astropy):
+    """Дочерний процесс: сервер NexStar на монтировке-заглушке"""
+    if eager_astropy:
+        import astropy.time  # noqa: F401
+
+    from src.nexstar.nexstar_server import ServerNexStar
+    from test.fakes import FakeMountController
+
+    class FakeServer(ServerNexStar):
+        def create_mount(self, mount_type):
+            return FakeMountController()
+
+    FakeServer(HOST, port).start()
+
+
+def _child_command(args):
+    if args.type == 'fake':
+        return [sys.executable, '-m', 'test.benchmark.bench_startup', '--serve', '--port', str(args.port)] \
+            + (['--eager-astropy'] if args.eager_astropy else [])
+    return [sys.executable, '-m', 'src.main', '-r', 'nexstar', '-t', args.type, '-i', HOST, '-p', str(args.port)]
+
+
+def _wait_first_connection(port, started):
+    while time.perf_counter() - started < CONNECT_TIMEOUT:
+        try:
+            with socket.create_connection((HOST, port), timeout=1) as conn:
+                conn.sendall(b'Kx')
+                if conn.recv(16) == b'x#':
+                    return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.005)
+    raise TimeoutError("Сервер не ответил")
+
+
+def measure(args):
+    started = time.perf_counter()
+    process = subprocess.Popen(_child_command(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return _wait_first_connection(args.port, started)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время до первого подключения к серверу')
+    parser.add_argument('--type', default='fake', choices=['fake', 'real', 'sim'])
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--eager-astropy', action='store_true')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_fake(args.port, args.eager_astropy)
+        return
+
+    results = [measure(args) for _ in range(args.runs)]
+    print(f"Время до первого подключения ({args.type}, astropy {'сразу' if args.eager_astropy else 'лениво'}): "
+          f"медиана {statistics.median(results) * 1000:.0f} мс, "
+          f"мин {min(results) * 1000:.0f} мс, макс {max(results) * 1000:.0f} мс")
+
+
+if __name__ == '__main__':
+    main()
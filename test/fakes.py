@@ -0,0 +1,113 @@
+# Подмены оборудования для тестов: GPIO без платы и монтировка на нём
+import enum
+import time
+import types
+
+from src.motor.controller.step_motor_controller import StepMotorController
+from src.motor.motor import Motor
+from src.motor.motor_list import MOTORS
+from src.motor.pins.a4988_motor_pins import A4988MotorPins
+from src.mount.controller.mount_controller import MountController
+from src.mount.mount_list import MOUNT_LIST
+
+# NEMA17 без микрошага (1.8° на шаг) с быстрыми импульсами, чтобы сотни движений шли за доли секунды
+FAST_NEMA17 = Motor("fast", 1.0, 200, 12.0, 2.8, 200, start_velocity=5000.0, max_velocity=5000.0)
+
+
+class FakeGPIO:
+    """Заглушка OPi.GPIO, запоминает все изменения пинов с отметкой времени"""
+    SUNXI = 'SUNXI'
+    BOARD = 'BOARD'
+    OUT = 'OUT'
+    IN = 'IN'
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self):
+        self.mode = None
+        self.pins = {}
+        self.events = []
+
+    def setwarnings(self, value):
+        pass
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, mode):
+        self.pins.setdefault(pin, self.LOW)
+
+    def output(self, pins, value):
+        now = time.perf_counter()
+        for pin in pins if isinstance(pins, (list, tuple)) else (pins,):
+            self.pins[pin] = value
+            self.events.append((now, pin, value))
+
+    def cleanup(self, pin=None):
+        self.pins.clear()
+
+    def edges(self, pin, value=HIGH):
+        """Моменты времени, когда пин переключался в значение value"""
+        return [t for t, p, v in self.events if p == pin and v == value]
+
+
+class FakeLineRequest:
+    """Запрос линий gpiod v2, запоминает каждый вызов set_values"""
+
+    def __init__(self, chip, lines, values):
+        self.chip = chip
+        self.lines = lines
+        self.values = dict(values)
+        self.calls = []
+        self.released = False
+
+    def set_values(self, values):
+        assert not self.released
+        assert set(values) <= set(self.lines)
+        self.values.update(values)
+        self.calls.append(dict(values))
+
+    def release(self):
+        self.released = True
+
+
+class FakeGpiod:
+    """Подмена модуля gpiod (v2): request_lines, LineSettings, line.Value и line.Direction"""
+
+    class Value(enum.Enum):
+        INACTIVE = 0
+        ACTIVE = 1
+
+    class Direction(enum.Enum):
+        INPUT = 1
+        OUTPUT = 2
+
+    def __init__(self):
+        self.line = types.SimpleNamespace(Value=self.Value, Direction=self.Direction)
+        self.requests = []
+
+    def LineSettings(self, direction=None, output_value=None):
+        return types.SimpleNamespace(direction=direction, output_value=output_value)
+
+    def request_lines(self, path, config, consumer=None, event_buffer_size=None, output_values=None):
+        lines = [line for key in config for line in (key if isinstance(key, tuple) else (key,))]
+        request = FakeLineRequest(path, lines, output_values or {})
+        self.requests.append(request)
+        return request
+
+
+class FakeMountController(MountController):
+    """Монтировка с реальными StepMotorController поверх FakeGPIO"""
+
+    def __init__(self, mount_params=MOUNT_LIST['AstroPi'], motor_params=MOTORS['NEMA17']):
+        self.gpio = FakeGPIO()
+        super().__init__(mount_params, motor_params,
+                         A4988MotorPins('STEP_H', 'DIR_H', 'EN_H'),
+                         A4988MotorPins('STEP_V', 'DIR_V', 'EN_V'),
+                         'H', 'V')
+
+    def create_motor_v_controller(self, motor_params, pins, motor_index):
+        return StepMotorController(motor_params, pins, self.gpio, 'Dec', motor_index)
+
+    def create_motor_h_controller(self, motor_params, pins, motor_index):
+        return StepMotorController(motor_params, pins, self.gpio, 'Ra', motor_index)
@@ -0,0 +1,53 @@
+import pytest
+
+import src.kopis_headless as GPIO
+from src.kopis_headless import kopis_motorsim
+
+
+@pytest.fixture
+def fast():
+    scale = kopis_motorsim.get_time_scale()
+    kopis_motorsim.set_time_scale(100)
+    yield
+    kopis_motorsim.set_time_scale(scale)
+    kopis_motorsim.setup_motors_by_mount_type(kopis_motorsim.EQ)
+    GPIO.cleanup()
+
+
+def test_pins_follow_kopis_rules():
+    GPIO.setmode(GPIO.SUNXI)
+
+    with pytest.raises(RuntimeError):
+        GPIO.output('PD15', GPIO.HIGH)  # пин не настроен на выход
+    with pytest.raises(IndexError):
+        GPIO.setup('PA1', GPIO.OUT)
+    with pytest.raises(RuntimeError):
+        GPIO.setup(16, GPIO.OUT)  # номер на разъеме - только в режиме BOARD
+
+    GPIO.setup('PD15', GPIO.OUT)
+    GPIO.output('PD15', 1)
+    assert GPIO.board.pin_by_board_number(16).state == GPIO.HIGH
+
+    GPIO.cleanup()
+    assert GPIO.board.pin_by_soc_name('PD15').mode == GPIO.IN
+
+
+def test_move_takes_scaled_virtual_time(fast):
+    name = kopis_motorsim.MOTOR_H
+    kopis_motorsim.reset_angle(name)
+    busy = kopis_motorsim.get_busy_time(name)
+
+    kopis_motorsim.move_degrees(name, -90, 10)  # 30°/с: 3 секунды виртуального времени
+
+    assert kopis_motorsim.get_shaft_angle(name) == pytest.approx(270.0)
+    assert kopis_motorsim.get_busy_time(name) - busy == pytest.approx(3.0)
+    # только нижняя граница: сон по дедлайну не бывает короче, а верхняя зависит от загрузки машины
+    started, finished = kopis_motorsim.get_last_move(name)
+    assert finished - started >= 3.0 / 100
+
+
+def test_mount_type_sets_initial_angles(fast):
+    kopis_motorsim.setup_motors_by_mount_type(kopis_motorsim.AZ)
+    assert kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_V) == 0.0
+    kopis_motorsim.setup_motors_by_mount_type(kopis_motorsim.EQ)
+    assert kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_V) == 90.0
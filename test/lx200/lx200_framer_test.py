@@ -0,0 +1,30 @@
+from src.lx200.lx200_framer import LX200Framer
+
+
+def test_concatenated_commands():
+    framer = LX200Framer()
+    framer.feed(b'#:GR#:GD#')
+    assert framer.frames() == [b'#', b':GR#', b':GD#']
+    assert framer.length == 0
+
+
+def test_split_command():
+    framer = LX200Framer()
+    framer.feed(b':Sr 12:3')
+    assert framer.frames() == []
+    framer.feed(b'4:56#\x06')
+    assert framer.frames() == [b':Sr 12:34:56#', b'\x06']
+
+
+def test_recv_into_after_overflow():
+    class Conn:
+        def recv_into(self, view, size):
+            assert len(view) == size
+            view[:4] = b':GR#'
+            return 4
+
+    framer = LX200Framer(8)
+    framer.feed(b'garbage!')  # буфер заполнен, полной команды нет
+    assert framer.frames() == []
+    assert framer.recv_into(Conn()) == 4
+    assert framer.frames() == [b':GR#']
@@ -0,0 +1,101 @@
+import re
+import time
+
+import pytest
+
+from src.lx200.lx200_server import ServerLX200
+from src.utils.coordinate_utils import lx200RaStr_2_deg, lx200DecStr_2_deg
+from test.fakes import FakeMountController
+from test.server.server_test import _start, _connect
+
+
+class FakeLX200(ServerLX200):
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+
+@pytest.fixture
+def server():
+    srv = FakeLX200('127.0.0.1', 0, position_tick=0)
+    yield srv
+    srv.stop()
+
+
+def test_position_formats(server):
+    assert re.fullmatch(rb'\d\d:\d\d:\d\d#', server.handle_command(b':GR#'))
+    assert re.fullmatch(rb"[+-]\d\d\*\d\d'\d\d#", server.handle_command(b':GD#'))
+
+    assert server.handle_command(b':U#') is None
+    assert re.fullmatch(rb'\d\d:\d\d\.\d#', server.handle_command(b':GR#'))
+    assert re.fullmatch(rb'[+-]\d\d\*\d\d#', server.handle_command(b':GD#'))
+
+
+def test_sync_to_target(server):
+    assert server.handle_command(b':Sr 05:30:00#') == b'1'
+    assert server.handle_command(b':Sd -20*15:30#') == b'1'
+    assert server.handle_command(b':Sd +95*00:00#') == b'0'
+    assert server.handle_command(b':CM#').endswith(b'#')
+
+    assert lx200RaStr_2_deg(server.handle_command(b':GR#').decode()) == pytest.approx(82.5, abs=0.01)
+    assert lx200DecStr_2_deg(server.handle_command(b':GD#').decode()) == pytest.approx(-20.2583, abs=0.001)
+
+
+@pytest.mark.parametrize("command", [b':Sr 12:61:00#', b':Sr 24:00:00#', b':Sr 12:00:60#',
+                                     b":Sd +10*60'00#", b":Sd +10*00'60#", b":Sd +91*00'00#"])
+def test_out_of_range_target_is_rejected(server, command):
+    assert server.handle_command(command) == b'0'
+    assert server.target_ra is None and server.target_dec is None
+
+
+@pytest.mark.parametrize("latitude, longitude", [(b'+55*45', b'037*37'), (b'-33*52', b'250*10')])
+def test_site_round_trip(server, latitude, longitude):
+    assert server.handle_command(b':St' + latitude + b'#') == b'1'
+    assert server.handle_command(b':Sg' + longitude + b'#') == b'1'
+
+    assert server.handle_command(b':Gt#') == latitude + b'#'
+    assert server.handle_command(b':Gg#') == longitude + b'#'
+
+
+def test_out_of_range_site_is_rejected(server):
+    latitude, longitude = server.handle_command(b':Gt#'), server.handle_command(b':Gg#')
+
+    assert server.handle_command(b':St +91*00#') == b'0'
+    assert server.handle_command(b':St +45*60#') == b'0'
+    assert server.handle_command(b':Sg 361*00#') == b'0'
+
+    assert server.handle_command(b':Gt#') == latitude
+    assert server.handle_command(b':Gg#') == longitude
+
+
+def test_goto_target(server):
+    assert server.handle_command(b':MS#').startswith(b'2')  # цель не задана
+
+    server.handle_command(b':Sr 00:00:00#')
+    server.handle_command(b':Sd +22*30:00#')
+    started = time.perf_counter()
+    assert server.handle_command(b':MS#') == b'0'
+    assert time.perf_counter() - started < 0.05
+
+    deadline = time.monotonic() + 10.0
+    while server.handle_command(b':D#') != b'#':
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    # с точностью до полушага мотора (1.8° без микрошага)
+    assert lx200DecStr_2_deg(server.handle_command(b':GD#').decode()) == pytest.approx(22.5, abs=0.9)
+
+
+def test_stream_over_socket():
+    srv = FakeLX200('127.0.0.1', 0, position_tick=0)
+    thread = _start(srv)
+    try:
+        with _connect(srv) as conn:
+            conn.sendall(b'\x06#:GVP#:GR')
+            conn.sendall(b'#')
+            reply = b''
+            while reply.count(b'#') < 2:
+                reply += conn.recv(64)
+            assert re.fullmatch(rb'PAstroPi#\d\d:\d\d:\d\d#', reply)
+    finally:
+        srv.stop()
+        thread.join(3)
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from src.motor.controller.coordinated_motion import CoordinatedMotion, bresenham
+from src.motor.controller.step_motor_controller import StepMotorController
+from src.motor.motion_profile import MotionProfile
+from src.motor.motor_list import MOTORS
+from src.motor.pins.a4988_motor_pins import A4988MotorPins
+from test.fakes import FakeGPIO
+
+
+@pytest.mark.parametrize('major, minor', [(10, 0), (10, 10), (10, 3), (7, 5), (1000, 333)])
+def test_bresenham_spreads_steps(major, minor):
+    pattern = bresenham(major, minor)
+    assert len(pattern) == major
+    assert sum(pattern) == minor
+
+    # на любом отрезке ведомая ось отстает от прямой не больше чем на шаг
+    done = 0
+    for i, step in enumerate(pattern, 1):
+        done += step
+        assert abs(done - i * minor / major) <= 1
+
+
+@pytest.fixture
+def motion():
+    gpio = FakeGPIO()
+    motor_h = StepMotorController(MOTORS['NEMA17'], A4988MotorPins('STEP_H', 'DIR_H'), gpio, 'Ra')
+    motor_v = StepMotorController(MOTORS['NEMA17'], A4988MotorPins('STEP_V', 'DIR_V'), gpio, 'Dec')
+    return CoordinatedMotion(motor_h, motor_v), gpio
+
+
+def test_axes_start_and_finish_together(motion):
+    motion, gpio = motion
+
+    started = time.perf_counter()
+    assert motion.move_degrees(90.0, -45.0, speed=10) == (90.0, -45.0)
+    elapsed = time.perf_counter() - started
+
+    rises_h = gpio.edges('STEP_H')
+    rises_v = gpio.edges('STEP_V')
+    assert (len(rises_h), len(rises_v)) == (50, 25)
+    assert rises_h[0] <= rises_v[0] <= rises_h[1] + 0.001
+    assert rises_v[-1] - rises_h[-1] < 0.001
+    assert gpio.pins['DIR_V'] == gpio.LOW
+
+    # время - как у одной ведущей оси, а не сумма двух движений
+    profile = motion.motors[0].profile
+    assert elapsed < profile.duration(50, 10) + profile.duration(25, 10) * 0.5
+
+
+def test_cancel_stays_on_line(motion):
+    motion, gpio = motion
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+
+    moved_h, moved_v = motion.move_degrees(360.0, 180.0, speed=1, cancel=cancel)
+
+    assert 0 < moved_h < 360.0
+    assert abs(moved_v - moved_h / 2) <= 1.8
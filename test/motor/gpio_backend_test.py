@@ -0,0 +1,62 @@
+import pytest
+
+from src.motor.controller.coordinated_motion import CoordinatedMotion
+from src.motor.controller.step_motor_controller import StepMotorController
+from src.motor.gpio_backend import GpiodGPIO, load_gpio, DEFAULT_CHIP, DEFAULT_R_CHIP
+from src.motor.motor_list import MOTORS
+from src.motor.pins.a4988_motor_pins import A4988MotorPins
+from test.fakes import FakeGpiod
+
+
+@pytest.mark.parametrize('pin, line', [('PD22', 118), ('pd25', 121), ('PA0', 0), ('PL2', 2), ('PM1', 33), (77, 77)])
+def test_line_offset(pin, line):
+    assert GpiodGPIO.line_offset(pin) == line
+
+
+def test_bad_pin_name():
+    with pytest.raises(ValueError):
+        GpiodGPIO.line_offset('D22')
+    with pytest.raises(ValueError):
+        load_gpio('wiringpi')
+
+
+def test_lines_requested_per_chip():
+    gpiod = FakeGpiod()
+    gpio = GpiodGPIO(gpiod_module=gpiod)
+    for pin in ('PD22', 'PD25', 'PL2'):
+        gpio.setup(pin, gpio.OUT)
+
+    gpio.output(['PD22', 'PD25', 'PL2'], gpio.HIGH)
+
+    by_chip = {request.chip: request for request in gpiod.requests}
+    assert set(by_chip) == {DEFAULT_CHIP, DEFAULT_R_CHIP}
+    assert by_chip[DEFAULT_CHIP].calls == [{118: gpiod.Value.ACTIVE, 121: gpiod.Value.ACTIVE}]
+    assert by_chip[DEFAULT_R_CHIP].calls == [{2: gpiod.Value.ACTIVE}]
+
+
+def test_new_line_keeps_values():
+    gpiod = FakeGpiod()
+    gpio = GpiodGPIO(gpiod_module=gpiod)
+    gpio.setup('PD22', gpio.OUT)
+    gpio.output('PD22', gpio.HIGH)
+
+    gpio.setup('PD25', gpio.OUT)
+    gpio.output('PD25', gpio.LOW)
+
+    first, second = gpiod.requests
+    assert first.released
+    assert second.values == {118: gpiod.Value.ACTIVE, 121: gpiod.Value.INACTIVE}
+
+
+def test_step_edges_for_both_axes_in_one_call():
+    gpiod = FakeGpiod()
+    gpio = GpiodGPIO(gpiod_module=gpiod)
+    motor_h = StepMotorController(MOTORS['NEMA17'], A4988MotorPins('PD25', 'PD22', 'PD26'), gpio, 'Ra')
+    motor_v = StepMotorController(MOTORS['NEMA17'], A4988MotorPins('PD15', 'PD16', 'PD18'), gpio, 'Dec')
+
+    CoordinatedMotion(motor_h, motor_v).move_degrees(18.0, 18.0, speed=10)
+
+    request = gpiod.requests[-1]
+    step_calls = [call for call in request.calls if 121 in call]
+    assert len(step_calls) == 20  # 10 шагов, передний и задний фронт
+    assert all(set(call) == {121, 111} for call in step_calls)
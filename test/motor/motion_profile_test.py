@@ -0,0 +1,92 @@
+import math
+import statistics
+import threading
+import time
+
+import pytest
+
+from src.motor.controller.step_motor_controller import StepMotorController
+from src.motor.motion_profile import MotionProfile
+from src.motor.motor import Motor
+from src.motor.pins.a4988_motor_pins import A4988MotorPins
+from test.fakes import FakeGPIO
+
+TRAPEZOID = MotionProfile(start_velocity=100, max_velocity=1000, acceleration=5000)
+S_CURVE = MotionProfile(start_velocity=100, max_velocity=1000, acceleration=5000, jerk=50000)
+
+
+@pytest.mark.parametrize('profile', [TRAPEZOID, S_CURVE])
+def test_ramp_up_cruise_ramp_down(profile):
+    delays = profile.delays(1000, 10)
+    ramp = profile.ramp(1000)
+
+    assert 0 < len(ramp) < 500
+    assert delays[0] == pytest.approx(1 / 100)
+    assert delays == delays[::-1]
+    assert all(a >= b for a, b in zip(delays[:len(ramp)], delays[1:len(ramp) + 1]))
+    assert min(delays) == pytest.approx(1 / 1000)
+
+
+def test_trapezoid_respects_acceleration():
+    # после n шагов разгона с постоянным ускорением v² = v0² + 2an
+    ramp = TRAPEZOID.ramp(1000)
+    for n in (10, 50, len(ramp) - 1):
+        assert 1 / ramp[n] == pytest.approx(math.sqrt(100 ** 2 + 2 * 5000 * n), rel=0.05)
+
+
+def test_s_curve_starts_softer():
+    # рывок ограничивает ускорение в начале разгона
+    assert S_CURVE.ramp(1000)[5] > TRAPEZOID.ramp(1000)[5]
+    assert S_CURVE.duration(1000, 10) > TRAPEZOID.duration(1000, 10)
+
+
+def test_short_move_is_triangle():
+    delays = TRAPEZOID.delays(20, 10)
+    assert len(delays) == 20
+    assert min(delays) > 1 / 1000
+    assert delays == delays[::-1]
+
+
+def test_faster_than_constant_start_velocity():
+    assert TRAPEZOID.duration(1000, 10) < 0.25 * 1000 / 100
+    assert MotionProfile(100, 1000).delays(10, 10) == [pytest.approx(1 / 1000)] * 10
+
+
+def _controller(gpio, **profile):
+    motor = Motor('test', 1.0, 200, 12.0, 2.8, 200, **profile)
+    return StepMotorController(motor, A4988MotorPins('STEP', 'DIR'), gpio, 'Ra')
+
+
+def test_controller_follows_profile():
+    gpio = FakeGPIO()
+    motor = _controller(gpio, start_velocity=100, max_velocity=400, acceleration=2000)
+
+    started = time.perf_counter()
+    assert motor.move(200, speed=10) == 200
+    elapsed = time.perf_counter() - started
+
+    planned = motor.profile.delays(200, 10)
+    edges = gpio.edges('STEP')
+    intervals = [b - a for a, b in zip(edges, edges[1:])]
+
+    assert len(edges) == 200
+    errors = [abs(actual - expected) for actual, expected in zip(intervals, planned)]
+    assert statistics.median(errors) < 0.001
+    # разгон виден в импульсах: начало медленнее середины
+    assert statistics.mean(intervals[:5]) > 2 * statistics.mean(intervals[90:110])
+    assert elapsed == pytest.approx(motor.profile.duration(200, 10), rel=0.2)
+
+
+def test_cancel_decelerates_along_profile():
+    gpio = FakeGPIO()
+    motor = _controller(gpio, start_velocity=100, max_velocity=400, acceleration=2000)
+    cancel = threading.Event()
+
+    threading.Timer(0.3, cancel.set).start()
+    done = motor.move(400, speed=10, cancel=cancel)
+
+    assert done < 400
+    edges = gpio.edges('STEP')
+    intervals = [b - a for a, b in zip(edges, edges[1:])]
+    # последние импульсы торможения снова медленные
+    assert statistics.mean(intervals[-3:]) > 2 * min(intervals)
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from src.motor.pulse_engine import PulseEngine, PulseStats
+from test.fakes import FakeGPIO
+
+
+def test_timeline_is_absolute():
+    assert PulseEngine.timeline([0.1, 0.2, 0.3], 5.0) == pytest.approx([5.0, 5.1, 5.3])
+    assert PulseEngine.timeline([]) == []
+
+
+def test_stats():
+    stats = PulseStats([0.0] * 98 + [0.001, 0.002], planned=1.0, elapsed=1.5)
+    assert stats.edges == 100
+    assert stats.mean == pytest.approx(0.00003)
+    assert stats.p99 == 0.001
+    assert stats.max == 0.002
+    assert stats.drift == pytest.approx(0.5)
+
+
+def test_long_move_does_not_drift():
+    gpio = FakeGPIO()
+    engine = PulseEngine(gpio, 'STEP')
+
+    # 1000 шагов по 1 мс: при sleep на каждый полушаг опоздания складываются
+    stats = engine.run([0.001] * 1000)
+
+    edges = gpio.edges('STEP')
+    assert len(edges) == 1000
+    assert stats.edges == 2000
+    assert abs(stats.drift) < 0.005
+    assert edges[-1] - edges[0] == pytest.approx(0.999, abs=0.005)
+
+
+def test_cancel_replaces_tail():
+    gpio = FakeGPIO()
+    engine = PulseEngine(gpio, 'STEP')
+    cancel = threading.Event()
+    steps = []
+
+    def on_step(done):
+        steps.append(done)
+        if done == 3:
+            cancel.set()
+
+    engine.run([0.001] * 100, cancel, stop=lambda delay: [0.002, 0.004], on_step=on_step)
+
+    assert steps == [1, 2, 3, 4, 5]
+    edges = gpio.edges('STEP')
+    assert edges[4] - edges[3] == pytest.approx(0.002, abs=0.0005)
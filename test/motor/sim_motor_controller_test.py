@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from src.motor.controller.sim_motor_controller import SimMotorController, SIM_CHUNK_DEGREES
+from src.motor.motor_list import MOTORS
+from src.motor.pins.a4988_motor_pins import A4988MotorPins
+from test.fakes import FakeGPIO
+
+
+class FakeMotorSim:
+    """kopis_motorsim без симулятора: запоминает повороты валов, on_move вызывается после каждого"""
+
+    def __init__(self, on_move=None):
+        self.moves = []
+        self.on_move = on_move
+
+    def move_degrees(self, motor, angle, speed):
+        self.moves.append((motor, angle))
+        if self.on_move is not None:
+            self.on_move(len(self.moves))
+
+
+class FakeKopis(FakeGPIO):
+    def __init__(self, on_move=None):
+        super().__init__()
+        self.kopis_motorsim = FakeMotorSim(on_move)
+
+
+def _motor(gpio):
+    return SimMotorController(MOTORS['NEMA17'], A4988MotorPins('STEP', 'DIR', 'EN'), gpio, 'H', 'Ra')
+
+
+def test_move_in_chunks():
+    gpio = FakeKopis()
+    motor = _motor(gpio)
+
+    moved = motor.move_degrees(90.0)
+
+    chunk = max(1, round(SIM_CHUNK_DEGREES * motor.steps_per_degree))
+    assert moved == pytest.approx(90.0)
+    assert len(gpio.kopis_motorsim.moves) == -(-motor.position // chunk)
+    assert sum(angle for _, angle in gpio.kopis_motorsim.moves) == pytest.approx(moved)
+    assert motor.steps_done == motor.position
+
+
+def test_cancel_between_chunks():
+    cancel = threading.Event()
+    gpio = FakeKopis(on_move=lambda n: n == 3 and cancel.set())
+    motor = _motor(gpio)
+
+    moved = motor.move_degrees(-90.0, cancel=cancel)
+
+    assert len(gpio.kopis_motorsim.moves) == 3
+    assert moved == pytest.approx(sum(angle for _, angle in gpio.kopis_motorsim.moves))
+    assert -90.0 < moved < 0.0
+    assert motor.position == -motor.steps_done
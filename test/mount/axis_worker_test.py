@@ -0,0 +1,126 @@
+import queue
+import threading
+
+import pytest
+
+from src.mount.axis_worker import AxisWorker
+from src.utils.location import SkyCoordinate
+from test.fakes import FakeMountController, FAST_NEMA17
+
+
+class RecordingAxis:
+    """Обработчики команд оси: запоминают вызовы, выполнение держится до release"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def goto(self, angle, speed, cancel):
+        return self._run('goto', angle, speed, cancel)
+
+    def slew(self, angle, speed, cancel):
+        return self._run('slew', angle, speed, cancel)
+
+    def _run(self, kind, angle, speed, cancel):
+        self.calls.append((kind, angle, speed))
+        self.started.set()
+        while not self.release.is_set() and not cancel.is_set():
+            self.release.wait(0.005)
+        return 'cancelled' if cancel.is_set() else angle
+
+
+@pytest.fixture
+def axis():
+    handlers = RecordingAxis()
+    worker = AxisWorker("test axis", handlers.goto, handlers.slew, maxsize=3)
+    yield worker, handlers
+    handlers.release.set()
+    worker.shutdown()
+
+
+def _occupy(worker, handlers):
+    """Поставить долгую команду и дождаться ее начала, чтобы следующие копились в очереди"""
+    first = worker.slew(1.0, 7)
+    assert handlers.started.wait(1.0)
+    return first
+
+
+def test_slews_with_same_speed_are_coalesced(axis):
+    worker, handlers = axis
+    _occupy(worker, handlers)
+
+    a = worker.slew(0.5, 5)
+    b = worker.slew(0.25, 5)
+    c = worker.slew(1.0, 3)
+
+    assert a is b and a is not c
+    assert worker.pending == 2
+
+    handlers.release.set()
+    assert a.result(timeout=1.0) == pytest.approx(0.75)
+    assert c.result(timeout=1.0) == 1.0
+    assert handlers.calls[1:] == [('slew', 0.75, 5), ('slew', 1.0, 3)]
+
+
+def test_goto_replaces_queued_and_preempts_running(axis):
+    worker, handlers = axis
+    running = _occupy(worker, handlers)
+    queued_slew = worker.slew(2.0, 5)
+    queued_goto = worker.goto(10.0, 5)
+
+    assert running.result(timeout=1.0) == 'cancelled'
+    assert queued_slew.cancelled()
+
+    handlers.release.set()
+    last = worker.goto(20.0, 5)
+    assert last.result(timeout=1.0) == 20.0
+    assert queued_goto.cancelled() or queued_goto.result(timeout=1.0) == 'cancelled'
+    assert handlers.calls[-1] == ('goto', 20.0, 5)
+
+
+def test_full_queue_is_rejected(axis):
+    worker, handlers = axis
+    _occupy(worker, handlers)
+    for speed in (1, 2, 3):
+        worker.slew(1.0, speed)
+
+    with pytest.raises(queue.Full):
+        worker.slew(1.0, 4)
+    # объединение с последней командой места в очереди не требует
+    assert not worker.slew(1.0, 3).done()
+
+
+def test_errors_are_returned_in_future():
+    def fail(angle, speed, cancel):
+        raise ValueError("нет мотора")
+
+    worker = AxisWorker("failing axis", fail, fail)
+    try:
+        with pytest.raises(ValueError):
+            worker.goto(1.0, 5).result(timeout=1.0)
+        assert worker.join(timeout=1.0)
+    finally:
+        worker.shutdown()
+
+
+def test_axis_commands_and_coordinated_goto_share_axis_locks():
+    mount = FakeMountController(motor_params=FAST_NEMA17)
+    try:
+        vertical = mount.axis_v.goto(-45.0, 10)
+        futures = [mount.axis_h.slew(3.6, 10 - i % 2) for i in range(6)]
+        goto = mount.goto_position(SkyCoordinate(90.0, -45.0), speed=10)
+
+        goto.result(timeout=5.0)
+        assert mount.axis_h.join(timeout=5.0) and mount.axis_v.join(timeout=5.0)
+
+        # ожидающие команды наведение снимает с очереди, выполняемые тормозят, не доехав
+        assert all(f.cancelled() or -1e-9 <= f.result(timeout=1.0) <= 3.6 + 1e-9 for f in futures)
+        assert vertical.cancelled() or -45.0 - 1e-9 <= vertical.result(timeout=1.0) <= 0.0
+        assert mount.current.get_vertical() == pytest.approx(-45.0)
+        assert mount.current.get_horizontal() == pytest.approx(mount.motor_h.position * 1.8 % 360)
+        assert not mount.busy
+    finally:
+        mount.axis_h.shutdown()
+        mount.axis_v.shutdown()
+        mount.motion.shutdown()
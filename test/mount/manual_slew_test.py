@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from src.motor.pulse_engine import MIN_PULSE
+from src.mount.manual_slew import AXIS_H, AXIS_V, ManualSlew
+from src.motor.motion_profile import MotionProfile
+from src.utils import astropi_utils
+from src.utils.location import SkyCoordinate
+from test.fakes import FakeMountController, FAST_NEMA17
+
+
+@pytest.fixture
+def mount():
+    m = FakeMountController(motor_params=FAST_NEMA17)
+    yield m
+    m.slew.stop()
+    m.motion.shutdown()
+
+
+def test_runs_until_rate_zero(mount):
+    mount.slew.set_rate(AXIS_H, 18.0)  # 10 шагов в секунду
+    mount.slew.set_rate(AXIS_V, -9.0)
+    started = time.monotonic()
+    time.sleep(0.5)
+
+    assert mount.slew.active
+    mount.slew.set_rate(AXIS_H, 0)
+    mount.slew.stop().result(timeout=1.0)
+    elapsed = time.monotonic() - started
+
+    assert mount.current.get_horizontal() == pytest.approx(18.0 * elapsed, abs=2 * 1.8)
+    assert mount.current.get_vertical() == pytest.approx(-9.0 * elapsed, abs=2 * 1.8)
+    assert not mount.slew.active
+
+
+def test_rate_change_and_reverse(mount):
+    mount.slew.set_rate(AXIS_H, 36.0)
+    time.sleep(0.3)
+    mount.slew.set_rate(AXIS_H, -36.0)
+    time.sleep(0.3)
+    mount.slew.stop().result(timeout=1.0)
+
+    assert mount.current.get_vertical() == 0.0
+    back = astropi_utils.normalize_degrees_signed(mount.current.get_horizontal())
+    assert back == pytest.approx(0.0, abs=2 * 1.8)
+
+
+def test_pulses_have_minimum_width_and_spacing(mount):
+    mount.slew.set_rate(AXIS_H, 36.0)  # 20 шагов в секунду, шаги осей совпадают по времени
+    mount.slew.set_rate(AXIS_V, -36.0)
+    time.sleep(0.3)
+    mount.slew.stop().result(timeout=1.0)
+
+    events = mount.gpio.events
+    for pin in ('STEP_H', 'STEP_V'):
+        rises = mount.gpio.edges(pin, mount.gpio.HIGH)
+        falls = mount.gpio.edges(pin, mount.gpio.LOW)[1:]  # первый LOW - при инициализации
+        assert len(rises) == len(falls) > 3
+        assert all(fall - rise >= MIN_PULSE for rise, fall in zip(rises, falls))
+        assert all(rise - fall >= MIN_PULSE for fall, rise in zip(falls, rises[1:]))
+
+    # совпадающие шаги осей выданы одним вызовом gpio.output
+    together = [t for t, pin, value in events if pin == 'STEP_V' and value and (t, 'STEP_H', value) in events]
+    assert together
+
+
+def test_goto_waits_for_slew_to_stop(mount):
+    mount.slew.set_rate(AXIS_H, 18.0)
+    time.sleep(0.1)
+
+    mount.goto_position(SkyCoordinate(90.0, 0.0), speed=10).result(timeout=5.0)
+
+    assert not mount.slew.active
+    assert mount.current.get_horizontal() == pytest.approx(90.0)
+
+
+def test_acceleration_is_limited():
+    profile = MotionProfile(start_velocity=50, max_velocity=1000, acceleration=1000)
+
+    assert ManualSlew._approach(0.0, 500.0, profile, 0.01) == 50.0
+    assert ManualSlew._approach(100.0, 500.0, profile, 0.01) == pytest.approx(110.0)
+    assert ManualSlew._approach(100.0, 0.0, profile, 0.1) == 0.0
+    assert ManualSlew._approach(0.0, 20.0, profile, 0.01) == 20.0
@@ -0,0 +1,104 @@
+import random
+import time
+
+import pytest
+
+from src.utils.astropi_utils import normalize_degrees_signed
+from src.utils.location import SkyCoordinate
+from test.fakes import FakeMountController, FAST_NEMA17
+
+HALF_STEP = 0.9
+
+
+@pytest.fixture
+def mount():
+    m = FakeMountController()
+    yield m
+    m.cancel_goto()
+    m.motion.shutdown()
+
+
+def test_cancel_stops_goto_mid_slew(mount):
+    # 90° на малой скорости: 50 шагов по 20 мс, стартовая скорость - тормозить не нужно
+    future = mount.goto_position(SkyCoordinate(90.0, 0.0), speed=1)
+    time.sleep(0.2)
+
+    done_at_cancel = mount.motor_h.steps_done
+    started = time.monotonic()
+    mount.cancel_goto()
+    future.result(timeout=2.0)
+
+    assert time.monotonic() - started < 0.1
+    assert mount.motor_h.steps_done <= done_at_cancel + 2
+    assert mount.motor_h.steps_done < mount.motor_h.steps_total
+    assert not mount.goto_in_progress
+
+    # положение соответствует выполненным шагам (1.8° на шаг)
+    assert mount.current.get_horizontal() == pytest.approx(mount.motor_h.steps_done * 1.8)
+    assert mount.current.get_vertical() == 0.0
+
+
+def test_new_goto_preempts_running_goto(mount):
+    first = mount.goto_position(SkyCoordinate(90.0, 0.0), speed=1)
+    time.sleep(0.1)
+    second = mount.goto_position(SkyCoordinate(10.0, 0.0), speed=1)
+
+    # первое наведение тормозит, не доехав до 90°, второе едет от фактического положения
+    assert first.result(timeout=2.0).get_horizontal() < 90.0
+    second.result(timeout=5.0)
+
+    assert mount.current.get_horizontal() == pytest.approx(10.0, abs=HALF_STEP)
+    assert not mount.goto_in_progress
+
+
+def test_cancel_drops_queued_goto(mount):
+    first = mount.goto_position(SkyCoordinate(90.0, 0.0), speed=1)
+    time.sleep(0.05)
+    second = mount.goto_position(SkyCoordinate(180.0, 0.0), speed=1)
+
+    mount.cancel_goto()
+    first.result(timeout=2.0)
+
+    # второе GOTO снято с очереди или остановлено сразу после старта
+    assert second.cancelled() or second.result(timeout=2.0).get_horizontal() < 90.0
+    assert mount.current.get_horizontal() < 90.0
+
+
+def test_goto_burst_ends_at_last_target(mount):
+    futures = [mount.goto_position(SkyCoordinate(angle, 0.0), speed=1) for angle in (90.0, 180.0, 270.0)]
+
+    futures[-1].result(timeout=5.0)
+
+    # прежние цели не достигнуты: GOTO сняты с очереди или прерваны следующим
+    for future, angle in zip(futures[:-1], (90.0, 180.0)):
+        assert future.cancelled() or future.result() != pytest.approx(angle)
+    assert mount.current.get_horizontal() == pytest.approx(270.0, abs=HALF_STEP)
+
+
+def test_random_slews_and_gotos_do_not_drift():
+    rng = random.Random(20240601)
+    mount = FakeMountController(motor_params=FAST_NEMA17)
+    expected_h = expected_v = 0.0
+
+    try:
+        for i in range(600):
+            if i % 50 == 49:
+                target = SkyCoordinate(rng.uniform(0, 360), rng.uniform(-90, 90))
+                mount.goto_position(target, speed=10).result(timeout=10)
+                expected_h, expected_v = target.get_horizontal(), target.get_vertical()
+            else:
+                # сдвиги меньше шага: без переноса остатка они бы просто терялись
+                dh, dv = rng.uniform(-2.5, 2.5), rng.uniform(-2.5, 2.5)
+                mount.slew_motor_h(dh, 10)
+                mount.slew_motor_v(dv, 10)
+                expected_h += dh
+                expected_v -= dv  # мотор вертикали вращается против направления склонения
+
+            current = mount.current
+            assert abs(normalize_degrees_signed(current.get_horizontal() - expected_h)) <= HALF_STEP + 1e-9
+            assert abs(current.get_vertical() - expected_v) <= HALF_STEP + 1e-9
+    finally:
+        mount.motion.shutdown()
+
+    # положение - ровно целое число шагов от синхронизации
+    assert mount.current.get_horizontal() == pytest.approx(mount.motor_h.position * 1.8 % 360)
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from src.kopis_headless import kopis_motorsim
+from src.motor.motor_list import MOTORS
+from src.mount.controller.mount_sim_controller import MountSimController
+from src.mount.mount_list import MOUNT_LIST
+from src.utils.location import SkyCoordinate
+
+
+@pytest.fixture
+def mount():
+    scale = kopis_motorsim.get_time_scale()
+    kopis_motorsim.set_time_scale(10)
+    m = MountSimController(MOUNT_LIST['AstroPi'], MOTORS['NEMA17'])
+    yield m
+    m.cancel_goto()
+    m.motion.shutdown()
+    m.motion_h.shutdown()
+    kopis_motorsim.set_time_scale(scale)
+
+
+def _shafts_match(mount):
+    # вертикальный вал экваториальной монтировки начинает с 90° и вращается против склонения
+    current = mount.current
+    assert kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_H) == pytest.approx(current.get_horizontal() % 360)
+    assert kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_V) == pytest.approx((90.0 - current.get_vertical()) % 360)
+
+
+def test_axes_move_concurrently(mount):
+    busy_h = kopis_motorsim.get_busy_time(kopis_motorsim.MOTOR_H)
+    busy_v = kopis_motorsim.get_busy_time(kopis_motorsim.MOTOR_V)
+
+    # каждая ось: 90° на скорости 10 (30°/с) - 3 секунды виртуального времени
+    future = mount.goto_position(SkyCoordinate(90.0, -90.0), speed=10)
+    # оси двигаются одновременно: есть момент, когда обе уже сдвинулись и еще не доехали
+    both_moving = False
+    while not future.done():
+        shaft_h = kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_H)
+        shaft_v = kopis_motorsim.get_shaft_angle(kopis_motorsim.MOTOR_V)
+        both_moving = both_moving or (0.0 < shaft_h < 90.0 and 90.0 < shaft_v < 180.0)
+        time.sleep(0.001)
+    future.result(timeout=30.0)
+
+    assert both_moving
+    # виртуальное время каждой оси - ее собственный поворот
+    assert kopis_motorsim.get_busy_time(kopis_motorsim.MOTOR_H) - busy_h == pytest.approx(3.0)
+    assert kopis_motorsim.get_busy_time(kopis_motorsim.MOTOR_V) - busy_v == pytest.approx(3.0)
+    assert mount.current.get_horizontal() == pytest.approx(90.0, abs=0.1)
+    assert mount.current.get_vertical() == pytest.approx(-90.0, abs=0.1)
+    _shafts_match(mount)
+
+
+def test_cancel_stops_at_reached_position(mount):
+    future = mount.goto_position(SkyCoordinate(120.0, 0.0), speed=10)
+    deadline = time.monotonic() + 10.0
+    while mount.get_position().get_horizontal() < 10.0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    moving = mount.get_position().get_horizontal()
+
+    mount.cancel_goto()
+    future.result(timeout=1.0)
+
+    stopped = mount.current.get_horizontal()
+    assert 0.0 < moving <= stopped < 120.0
+    assert stopped - moving < 5.0
+    assert not mount.goto_in_progress
+    _shafts_match(mount)
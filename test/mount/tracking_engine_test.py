@@ -0,0 +1,175 @@
+import time
+
+import pytest
+
+from src.mount.mount import Mount
+from src.mount.tracking_engine import TrackingEngine, equatorial_to_horizontal, horizontal_to_equatorial, \
+    ALT_AZ_MOTOR_OFFSET
+from src.mount.tracking_mode import TrackingMode
+from src.nexstar.constants import Model
+from src.utils.astropi_utils import normalize_degrees_signed
+from src.utils.location import Location, SkyCoordinate
+from test.fakes import FakeMountController, FAST_NEMA17
+
+LATITUDE = 55.0
+STEP = 1.8
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _mount(mode):
+    mount = FakeMountController(Mount(Model.ADVANCED_GT, False, mode, "test"), FAST_NEMA17)
+    mount.set_location(Location.fromLatLong(LATITUDE))
+    return mount
+
+
+@pytest.mark.parametrize('ha, dec', [(0.0, 20.0), (-45.0, 10.0), (120.0, 70.0), (-170.0, -30.0)])
+def test_coordinate_round_trip(ha, dec):
+    az, alt = equatorial_to_horizontal(ha, dec, LATITUDE)
+    assert horizontal_to_equatorial(az, alt, LATITUDE) == pytest.approx((ha, dec))
+
+
+def test_meridian_and_east():
+    assert equatorial_to_horizontal(0.0, LATITUDE, LATITUDE)[1] == pytest.approx(90.0)
+    assert equatorial_to_horizontal(0.0, 0.0, LATITUDE) == pytest.approx((180.0, 90.0 - LATITUDE))
+    assert equatorial_to_horizontal(-90.0, 0.0, LATITUDE) == pytest.approx((90.0, 0.0), abs=1e-9)
+
+
+def test_equatorial_tracks_ra_axis_only():
+    mount = _mount(TrackingMode.EQ_NORTH)
+    mount.set_sync(SkyCoordinate(10.0, 30.0))
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=0.1)
+
+    for _ in range(200):
+        engine.tick()
+        clock.now += 1.0
+    clock.now -= 1.0
+
+    current = mount.current
+    assert normalize_degrees_signed(current.get_horizontal() - 29.9) == pytest.approx(0.0, abs=STEP / 2)
+    assert current.get_vertical() == pytest.approx(30.0)
+    assert engine.steps == mount.motor_h.steps_executed == 11
+
+    stats = engine.stats()
+    assert abs(stats.error_h) <= STEP / 2 * 3600
+    assert abs(stats.rate_error) < STEP / 2 / 19.9
+
+
+def test_tracking_steps_are_quiet_pulses():
+    mount = _mount(TrackingMode.EQ_NORTH)
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=STEP)
+
+    engine.tick()
+    clock.now += 3.0
+    engine.tick()
+
+    # шаги выданы без профиля движения, драйвер держит ось между шагами
+    assert mount.motor_h.steps_executed == 3
+    assert mount.motor_h.last_stats is None
+    assert mount.motor_h.is_active
+
+    engine.stop()
+    assert not mount.motor_h.is_active
+
+
+def test_alt_az_moves_both_axes():
+    mount = _mount(TrackingMode.ALT_AZ)
+    # объект на востоке на экваторе
+    az, alt = equatorial_to_horizontal(-60.0, 0.0, LATITUDE)
+    mount.set_sync(SkyCoordinate(az + ALT_AZ_MOTOR_OFFSET, alt))
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=0.5)
+
+    for _ in range(60):
+        engine.tick()
+        clock.now += 1.0
+    clock.now -= 1.0
+
+    expected_az, expected_alt = equatorial_to_horizontal(-60.0 + 0.5 * 59, 0.0, LATITUDE)
+    current = mount.current
+    assert normalize_degrees_signed(current.get_az() - ALT_AZ_MOTOR_OFFSET - expected_az) == pytest.approx(0, abs=STEP / 2)
+    assert current.get_alt() == pytest.approx(expected_alt, abs=STEP / 2)
+    assert mount.motor_h.steps_executed > 0 and mount.motor_v.steps_executed > 0
+
+
+def test_sync_during_tick_resets_anchor():
+    mount = _mount(TrackingMode.EQ_NORTH)
+    mount.set_sync(SkyCoordinate(10.0, 30.0))
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=STEP)
+    engine.tick()
+
+    track_steps = mount.motor_h.track_steps
+
+    def track_and_sync(steps):
+        done = track_steps(steps)
+        mount.set_sync(SkyCoordinate(200.0, 30.0))  # клиент синхронизирует во время шагов сопровождения
+        return done
+
+    mount.motor_h.track_steps = track_and_sync
+    clock.now += 1.0
+    engine.tick()
+    del mount.motor_h.track_steps
+
+    steps = mount.motor_h.steps_executed
+    clock.now += 1.0
+    engine.tick()
+    clock.now += 1.0
+    engine.tick()
+
+    # сопровождение продолжается от 200°, а не возвращается к старой привязке
+    assert mount.motor_h.steps_executed - steps == 1
+    assert normalize_degrees_signed(mount.current.get_horizontal() - 200.0 - STEP) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_stale_lag_is_not_slewed():
+    mount = _mount(TrackingMode.EQ_NORTH)
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=STEP)
+
+    engine.tick()
+    clock.now += 100.0  # 100 шагов отставания
+    engine.tick()
+    assert mount.motor_h.steps_executed == 0
+
+    clock.now += 1.0
+    engine.tick()
+    assert mount.motor_h.steps_executed == 1
+
+
+def test_off_and_goto_pause_tracking():
+    mount = _mount(TrackingMode.OFF)
+    clock = FakeClock()
+    engine = TrackingEngine(mount, clock, rate=10.0)
+
+    engine.tick()
+    clock.now += 10.0
+    engine.tick()
+    assert mount.motor_h.steps_executed == 0
+
+    mount.set_tracking_mode(TrackingMode.EQ_NORTH)
+    mount.goto_in_progress = True
+    engine.tick()
+    assert mount.motor_h.steps_executed == 0
+
+
+def test_background_thread():
+    mount = _mount(TrackingMode.EQ_NORTH)
+    engine = TrackingEngine(mount, rate=36.0)  # 20 шагов в секунду
+
+    engine.start()
+    started = time.monotonic()
+    time.sleep(0.5)
+    engine.stop()
+    elapsed = time.monotonic() - started
+
+    assert mount.current.get_horizontal() == pytest.approx(36.0 * elapsed, abs=2 * STEP)
+    assert not engine.running
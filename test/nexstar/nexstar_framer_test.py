@@ -0,0 +1,65 @@
+import pytest
+
+from src.nexstar.nexstar_framer import NexStarFramer, default_lengths
+
+SET_TIME = b'H' + bytes([12, 30, 0, 10, 18, 26, 5, 0])
+
+
+def test_concatenated_polls():
+    framer = NexStarFramer()
+    framer.feed(b'eeE')
+    assert framer.frames() == [b'e', b'e', b'E']
+    assert framer.length == 0
+
+
+def test_split_packet():
+    framer = NexStarFramer()
+    framer.feed(SET_TIME[:4])
+    assert framer.frames() == []
+    framer.feed(SET_TIME[4:] + b'e')
+    assert framer.frames() == [SET_TIME, b'e']
+
+
+@pytest.mark.parametrize("packet", [b'Kx', b'r34AB0500,12CE0500', b'R34AB,12CE', b'T\x02',
+                                    b'P\x03\x10\xfe\x00\x00\x00\x02'])
+def test_fixed_lengths(packet):
+    framer = NexStarFramer()
+    framer.feed(packet + b'L')
+    assert framer.frames() == [packet, b'L']
+
+
+def test_unknown_command_takes_rest():
+    framer = NexStarFramer()
+    framer.feed(b'?abc')
+    assert framer.frames() == [b'?abc']
+
+
+def test_recv_into_reuses_buffer():
+    class Conn:
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+
+        def recv_into(self, view, size):
+            chunk = self.chunks.pop(0)
+            view[:len(chunk)] = chunk
+            return len(chunk)
+
+    framer = NexStarFramer()
+    buffer = framer.buffer
+    conn = Conn([b'e', b'ee'])
+    assert framer.recv_into(conn) == 1
+    assert framer.frames() == [b'e']
+    assert framer.recv_into(conn) == 2
+    assert framer.frames() == [b'e', b'e']
+    assert framer.buffer is buffer
+
+
+def test_custom_length_table():
+    lengths = default_lengths()
+    framer = NexStarFramer(lengths=lengths)
+    lengths[ord('X')] = 3  # таблица общая с сервером: новая длина действует и для открытого соединения
+    framer.feed(b'X\x01\x02eX\x03')
+    assert framer.frames() == [b'X\x01\x02', b'e']
+    framer.feed(b'\x04')
+    assert framer.frames() == [b'X\x03\x04']
+    assert default_lengths()[ord('X')] == 0
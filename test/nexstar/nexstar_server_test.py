@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from src.nexstar.nexstar_server import ServerNexStar
+from src.utils.astropi_utils import hex_to_degrees
+from test.fakes import FakeMountController
+
+
+class FakeNexStar(ServerNexStar):
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+
+@pytest.fixture
+def server():
+    srv = FakeNexStar('127.0.0.1', 0, position_tick=0)
+    yield srv
+    srv.stop()
+
+
+def _wait_goto(server, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while server.handle_command(b'L') == b'\x01#':
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_goto_returns_immediately(server):
+    before = server.handle_command(b'e')
+
+    started = time.perf_counter()
+    assert server.handle_command(b'r20000000,10000000') == b'#'
+    latency = time.perf_counter() - started
+
+    assert latency < 0.05
+    assert server.handle_command(b'L') == b'\x01#'
+
+    _wait_goto(server)
+    after = server.handle_command(b'e')
+    assert after != before
+    # склонение 22.5° с точностью до полушага мотора (1.8° без микрошага)
+    assert hex_to_degrees(after[9:17].decode(), True) == pytest.approx(22.5, abs=0.9)
+
+
+def test_position_moves_during_goto(server):
+    server.handle_command(b'R0000,E000')  # Dec -45°, 135° по мотору склонения
+
+    seen = set()
+    deadline = time.monotonic() + 10.0
+    while server.mount.goto_in_progress and time.monotonic() < deadline:
+        seen.add(round(server.get_current().get_dec(), 3))
+        time.sleep(0.02)
+
+    assert len(seen) > 2  # промежуточные положения, а не только начало и конец
+
+
+def test_manual_slew_pass_through(server):
+    before = server.handle_command(b'e')
+
+    started = time.perf_counter()
+    assert server.handle_command(b'P\x02\x10\x24\x09\x00\x00\x00') == b'#'  # Azm вправо, скорость 9 (4°/с)
+    assert time.perf_counter() - started < 0.05
+    assert server.mount.slew.rate(0) == pytest.approx(4.0)
+
+    time.sleep(1.0)
+    assert server.handle_command(b'P\x02\x10\x24\x00\x00\x00\x00') == b'#'  # скорость 0 - остановка
+    server.mount.slew.stop().result(timeout=2.0)
+
+    assert server.handle_command(b'e') != before
+    assert not server.mount.slew.active
+
+
+def test_axis_goto_pass_through(server):
+    # Azm в 1/8 оборота (45°), Alt в 1/16 оборота (22.5°), ответ - сразу, движение - в очередях осей
+    assert server.handle_command(b'P\x04\x10\x02\x20\x00\x00\x00') == b'#'
+    assert server.handle_command(b'P\x04\x11\x17\x10\x00\x00\x00') == b'#'
+    assert server.handle_command(b'P\x01\x10\x13\x00\x00\x00\x01') == b'\x00#'
+
+    deadline = time.monotonic() + 10.0
+    while server.handle_command(b'P\x01\x10\x13\x00\x00\x00\x01') != b'\xff#' \
+            or server.handle_command(b'P\x01\x11\x13\x00\x00\x00\x01') != b'\xff#':
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert server.mount.current.get_horizontal() == pytest.approx(45.0, abs=0.9)
+    assert server.mount.current.get_vertical() == pytest.approx(22.5, abs=0.9)
+
+
+def test_tracking_starts_after_tracking_mode_command(server):
+    assert not server.mount.tracking.running
+
+    assert server.handle_command(b'T\x00') == b'#'  # OFF - сопровождение не нужно
+    assert not server.mount.tracking.running
+
+    assert server.handle_command(b'T\x02') == b'#'  # EQ_NORTH
+    assert server.mount.tracking.running
+
+
+def test_registered_command_is_framed_and_dispatched(server):
+    received = []
+
+    def echo_sum(data):
+        received.append(data)
+        return bytes([sum(data[1:]) & 0xff]) + b'#'
+
+    server.register_command(b'X', echo_sum, length=3)
+
+    # команда приходит по частям и вместе с опросом - разбирается по заданной длине
+    framer = server.create_framer()
+    framer.feed(b'X\x01')
+    assert framer.frames() == []
+    framer.feed(b'\x02e')
+    frames = framer.frames()
+    assert frames == [b'X\x01\x02', b'e']
+    assert server._respond_all(frames).startswith(b'\x03#')
+    assert received == [b'X\x01\x02']
+
+    with pytest.raises(ValueError):
+        server.register_command(b'Y', echo_sum, length=0)
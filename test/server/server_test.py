@@ -0,0 +1,110 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from src.server import Server, MODE_ASYNC, MODE_THREAD
+from test.fakes import FakeMountController
+
+
+class EchoServer(Server):
+    """Минимальный протокол: отвечает командой с '#' на конце"""
+
+    def create_mount(self, mount_type):
+        return FakeMountController()
+
+    def handle_command(self, data):
+        return data + b'#'
+
+
+@pytest.fixture(params=[MODE_THREAD, MODE_ASYNC])
+def server(request):
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=request.param, max_connections=2, idle_timeout=0.5)
+    thread = _start(srv)
+    yield srv
+    srv.stop()
+    thread.join(3)
+    assert not thread.is_alive()
+
+
+def _start(srv):
+    thread = threading.Thread(target=srv.start, daemon=True)
+    thread.start()
+    time.sleep(0.1)
+    return thread
+
+
+def _connect(srv):
+    conn = socket.create_connection(('127.0.0.1', srv.port), timeout=2)
+    return conn
+
+
+def test_echo(server):
+    with _connect(server) as conn:
+        conn.sendall(b'K')
+        assert conn.recv(16) == b'K#'
+
+
+def test_async_connection_cap():
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=MODE_ASYNC, max_connections=1)
+    thread = _start(srv)
+    try:
+        with _connect(srv) as first, _connect(srv) as second:
+            first.sendall(b'V')
+            assert first.recv(16) == b'V#'
+            assert second.recv(16) == b''  # второй клиент отклонен
+    finally:
+        srv.stop()
+        thread.join(3)
+
+
+def test_async_idle_timeout():
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=MODE_ASYNC, idle_timeout=0.2)
+    thread = _start(srv)
+    try:
+        with _connect(srv) as conn:
+            assert conn.recv(16) == b''  # закрыто по неактивности
+    finally:
+        srv.stop()
+        thread.join(3)
+
+
+def test_async_activity_extends_idle_deadline():
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=MODE_ASYNC, idle_timeout=0.3)
+    thread = _start(srv)
+    try:
+        with _connect(srv) as conn:
+            # команды чаще таймаута: соединение живет дольше нескольких таймаутов
+            for _ in range(8):
+                conn.sendall(b'e')
+                assert conn.recv(16) == b'e#'
+                time.sleep(0.1)
+            assert conn.recv(16) == b''
+    finally:
+        srv.stop()
+        thread.join(3)
+
+
+def test_async_stop_is_fast():
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=MODE_ASYNC)
+    thread = _start(srv)
+    with _connect(srv):
+        started = time.perf_counter()
+        srv.stop()
+        thread.join(3)
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.parametrize('tracking', [False, True])
+def test_tracking_starts_only_when_requested(tracking):
+    srv = EchoServer('127.0.0.1', 0, 'Test', tracking=tracking)
+    thread = _start(srv)
+    try:
+        assert srv.mount.tracking.running == tracking
+        srv.start_tracking()  # команда режима сопровождения, синхронизация или GOTO
+        assert srv.mount.tracking.running
+    finally:
+        srv.stop()
+        thread.join(3)
+    assert not srv.mount.tracking.running
@@ -0,0 +1,55 @@
+import pytest
+
+from src.server import MODE_ASYNC, MODE_THREAD
+from src.session_recorder import IN, OUT, OPEN, CLOSE, SessionRecorder, read_sessions, replay
+from test.server.server_test import EchoServer, _start, _connect
+
+
+@pytest.mark.parametrize('mode', [MODE_THREAD, MODE_ASYNC])
+def test_record_and_replay(tmp_path, mode):
+    path = tmp_path / 'sessions.bin'
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=mode, record=str(path))
+    thread = _start(srv)
+    try:
+        with _connect(srv) as conn:
+            for command in (b'K', b'e', b'V'):
+                conn.sendall(command)
+                assert conn.recv(16) == command + b'#'
+    finally:
+        srv.stop()
+        thread.join(3)
+
+    sessions = read_sessions(path)
+    assert len(sessions) == 1
+    kinds = [kind for _, kind, _ in sessions[0].events]
+    assert kinds == [OPEN, IN, OUT, IN, OUT, IN, OUT, CLOSE]
+    assert sessions[0].commands() == 3
+
+    srv = EchoServer('127.0.0.1', 0, 'Test', mode=mode)
+    thread = _start(srv)
+    try:
+        results = replay(sessions * 2, '127.0.0.1', srv.port, speed=0)
+    finally:
+        srv.stop()
+        thread.join(3)
+
+    for result in results:
+        assert result.error is None
+        assert result.responses == 3
+        assert result.mismatches == []
+
+
+def test_stop_closes_open_sessions(tmp_path):
+    path = tmp_path / 'sessions.bin'
+    recorder = SessionRecorder(str(path))
+    closed = recorder.open(('127.0.0.1', 1), 'Test')
+    active = recorder.open(('127.0.0.1', 2), 'Test')
+    recorder.inbound(active, [b'e'])
+    recorder.close(closed)
+    recorder.stop()
+    recorder.close(active)  # обработчик завершился после остановки
+    recorder.outbound(active, b'#')
+
+    sessions = {session.conn_id: session for session in read_sessions(path)}
+    assert [kind for _, kind, _ in sessions[closed].events] == [OPEN, CLOSE]
+    assert [kind for _, kind, _ in sessions[active].events] == [OPEN, IN, CLOSE]
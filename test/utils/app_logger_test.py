@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.app_logger import AppLogger, lazy
+
+
+class SlowStream:
+    """Поток вывода, каждая запись в который занимает delay секунд (как заблокированный journald)"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lines = []
+        self.threads = set()
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread().name)
+        self.lines.append(text)
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def slow_logger(monkeypatch, request):
+    stream = SlowStream()
+    monkeypatch.setattr('sys.stdout', stream)
+    logger = AppLogger.info(f"test {request.node.name}")
+    yield logger, stream
+    AppLogger.stop_async()
+
+
+def test_async_mode_does_not_block_caller(slow_logger):
+    logger, stream = slow_logger
+    AppLogger.start_async()
+
+    started = time.perf_counter()
+    for i in range(10):
+        logger.info("сообщение %d", i)
+    assert time.perf_counter() - started < 0.02  # синхронно было бы 0.2 сек
+
+    AppLogger.stop_async()  # выводит оставшиеся записи
+    messages = [line for line in stream.lines if 'сообщение' in line]
+    assert [m.rstrip().rsplit(' ', 1)[1] for m in messages] == [str(i) for i in range(10)]
+    assert threading.current_thread().name not in stream.threads
+
+
+def test_sync_mode_is_restored(slow_logger):
+    logger, stream = slow_logger
+    AppLogger.start_async()
+    AppLogger.stop_async()
+
+    logger.info("после остановки")
+    assert 'после остановки' in stream.lines[-1]
+    assert stream.threads == {threading.current_thread().name}
+
+
+def test_lazy_is_evaluated_only_when_written(slow_logger):
+    logger, stream = slow_logger
+    calls = []
+
+    def expensive(value):
+        calls.append(threading.current_thread().name)
+        return value * 2
+
+    logger.debug("не выводится: %s", lazy(expensive, 1))
+    assert calls == []
+
+    AppLogger.start_async()
+    logger.info("значение %s", lazy(expensive, 21))
+    AppLogger.stop_async()
+
+    # сообщение для вывода собрал поток логирования (pytest собирает и свою копию для отчета)
+    assert any(name != threading.current_thread().name for name in calls)
+    assert 'значение 42' in stream.lines[-1]
@@ -0,0 +1,58 @@
+import pytest
+
+from src.utils import coordinate_utils
+
+
+@pytest.mark.parametrize("value, degrees", [
+    ("12:34:56", 188.73333333),
+    ("12:34:56#", 188.73333333),
+    ("12:34.5", 188.625),
+    ("00:00:00", 0.0),
+    ("23:59:59.9", 359.99958333),
+    ("24:00:00", None),
+    ("12:61:00", None),
+    ("12:00:60", None),
+    ("12-34-56", None),
+])
+def test_lx200_ra(value, degrees):
+    assert coordinate_utils.lx200RaStr_2_deg(value) == pytest.approx(degrees)
+
+
+@pytest.mark.parametrize("value, degrees", [
+    ("+45*30:15", 45.50416667),
+    ("-45*30:15#", -45.50416667),
+    ("+45*30'15#", 45.50416667),
+    ("+45\xdf30", 45.5),
+    ("-00*30", -0.5),
+    ("+10*60'00", None),
+    ("+10*00'60", None),
+    ("45 30", None),
+])
+def test_lx200_dec(value, degrees):
+    assert coordinate_utils.lx200DecStr_2_deg(value) == pytest.approx(degrees)
+
+
+def test_direct_paths_match_legacy_round_trip():
+    assert coordinate_utils.hourStr_2_deg("5h30m0s") == pytest.approx(82.5, abs=1e-4)
+    assert coordinate_utils.degStr_2_deg("-45º30'0''") == pytest.approx(314.5, abs=1e-4)
+    assert coordinate_utils.degStr_2_rad("-0º30'0''") == pytest.approx(-0.008727)
+    assert coordinate_utils.hourStr_2_deg_bulk(["1h0m0s", "bad"]) == [15.0, None]
+
+
+@pytest.mark.parametrize("degrees, precise, text", [
+    (188.73333333, True, "12:34:56"),
+    (188.625, False, "12:34.5"),
+    (-15.0, True, "23:00:00"),
+    (359.99999, True, "00:00:00"),
+])
+def test_lx200_ra_format(degrees, precise, text):
+    assert coordinate_utils.deg_2_lx200RaStr(degrees, precise) == text
+
+
+@pytest.mark.parametrize("degrees, precise, text", [
+    (45.50416667, True, "+45*30'15"),
+    (-0.5, False, "-00*30"),
+    (-89.99999, True, "-90*00'00"),
+])
+def test_lx200_dec_format(degrees, precise, text):
+    assert coordinate_utils.deg_2_lx200DecStr(degrees, precise) == text
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src.utils.astropi_utils import hex_to_degrees, degrees_to_hex
+from src.utils.hex_batch import hex_to_degrees_batch, degrees_to_hex_batch
+from test.utils.utils_test import HEX_TO_DEGREES_CASES, DEGREES_TO_HEX_CASES
+
+
+@pytest.mark.parametrize("precise", [False, True])
+def test_oracle_cases(precise):
+    cases = [case for case in HEX_TO_DEGREES_CASES if case[2] == precise]
+    degrees = hex_to_degrees_batch([hex_str for _, hex_str, _ in cases], precise)
+    assert degrees.tolist() == [degree for degree, _, _ in cases]
+
+    cases = [case for case in DEGREES_TO_HEX_CASES if case[2] == precise]
+    hex_strings = degrees_to_hex_batch([degree for degree, _, _ in cases], precise)
+    assert hex_strings.tolist() == [hex_str for _, hex_str, _ in cases]
+
+
+@pytest.mark.parametrize("precise, digits", [(False, 4), (True, 8)])
+def test_bit_exact_with_scalar(precise, digits):
+    rng = np.random.default_rng(42)
+    values = rng.integers(0, 16 ** digits, size=20_000)
+    hex_strings = [f"{value:0{digits}X}" for value in values]
+
+    degrees = hex_to_degrees_batch(hex_strings, precise)
+    assert degrees.tolist() == [hex_to_degrees(hex_str, precise) for hex_str in hex_strings]
+
+    angles = np.concatenate([degrees, rng.uniform(-720.0, 720.0, size=20_000)])
+    assert degrees_to_hex_batch(angles, precise).tolist() == [degrees_to_hex(angle, precise) for angle in angles]
+
+
+def test_lowercase_and_invalid():
+    assert hex_to_degrees_batch([b"12ce"], False).tolist() == [26.4441]
+    with pytest.raises(ValueError):
+        hex_to_degrees_batch(["12CG"], False)
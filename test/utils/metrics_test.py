@@ -0,0 +1,102 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, MetricsServer, METRICS
+from test.nexstar.nexstar_server_test import FakeNexStar
+
+
+def test_counter_sums_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter('test_total', "Тест", ('kind',))
+
+    def work():
+        for _ in range(1000):
+            counter.labels('a').inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels('a').value == 4000
+    assert 'test_total{kind="a"} 4000' in registry.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('test_seconds', "Тест", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{le="1"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'test_seconds_count 4' in lines
+    assert 'test_seconds_sum 2.65' in lines
+
+    with pytest.raises(ValueError):
+        registry.counter('test_seconds', "Тест")
+
+
+def test_dead_thread_shards_are_folded():
+    registry = MetricsRegistry()
+    counter = registry.counter('test_total', "Тест")
+    histogram = registry.histogram('test_seconds', "Тест", buckets=(0.1, 1.0))
+
+    def client():
+        counter.inc()
+        histogram.observe(0.5)
+
+    # каждый клиент - свой короткий поток, как в режиме thread
+    for _ in range(50):
+        thread = threading.Thread(target=client)
+        thread.start()
+        thread.join()
+
+    assert counter.labels().value == 50
+    assert histogram.labels().totals() == ([0, 50, 0], 50, 25.0)
+    assert counter.labels()._shards.threads == 0
+    assert histogram.labels()._shards.threads == 0
+
+    counter.inc()  # поток теста пишет в свой словарь поверх перенесенных
+    assert counter.labels().value == 51
+
+
+def test_gauge_set_and_inc_do_not_mix():
+    registry = MetricsRegistry()
+    level = registry.gauge('test_level', "Тест")
+    level.set(5)
+    level.set(3)
+    assert level.labels().value == 3
+    with pytest.raises(ValueError):
+        level.inc()
+
+    clients = registry.gauge('test_clients', "Тест")
+    clients.inc()
+    clients.dec()
+    with pytest.raises(ValueError):
+        clients.set(10)
+
+
+def test_scrape_endpoint_reports_nexstar_commands():
+    server = FakeNexStar('127.0.0.1', 0, position_tick=0)
+    metrics = MetricsServer(METRICS, port=0).start()
+    try:
+        server.handle_command(b'e')
+        with urllib.request.urlopen(f"http://127.0.0.1:{metrics.port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers['Content-Type'].startswith('text/plain')
+
+        assert 'astropi_nexstar_command_seconds_count{command="e"}' in body
+        assert 'astropi_goto_in_progress 0' in body
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{metrics.port}/other", timeout=5)
+    finally:
+        metrics.stop()
+        server.stop()
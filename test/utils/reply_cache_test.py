@@ -0,0 +1,36 @@
+from src.utils.reply_cache import QuantizedCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_one_build_per_tick_and_version():
+    clock = Clock()
+    cache = QuantizedCache(tick=0.1, clock=clock)
+    builds = []
+
+    def build():
+        builds.append(clock.now)
+        return len(builds)
+
+    assert [cache.get(1, True, build) for _ in range(10)] == [1] * 10
+
+    clock.now += 0.05
+    assert cache.get(1, True, build) == 1  # тот же квант
+    assert cache.get(2, True, build) == 2  # положение изменилось
+    assert cache.get(2, False, build) == 3  # другая точность
+
+    clock.now += 0.1
+    assert cache.get(2, True, build) == 4  # новый квант
+    assert len(builds) == 4
+
+
+def test_nested_get():
+    cache = QuantizedCache(tick=0.1, clock=Clock())
+    degrees = lambda: cache.get(1, 'ra_dec', lambda: (10.0, 20.0))
+    assert cache.get(1, True, lambda: f"{degrees()[0]:.1f}") == "10.0"
@@ -0,0 +1,69 @@
+import datetime
+import time
+import timeit
+
+import pytest
+
+from src.utils.astropi_utils import calculate_local_sidereal_time_astropy
+from src.utils import sidereal
+from src.utils.sidereal import SiderealClock, UNCALIBRATED_ERROR_ARCSEC
+
+LONGITUDE = 56.2744
+
+
+@pytest.fixture(scope='module')
+def clock():
+    clock = SiderealClock(recalibrate_interval=None)
+    clock.calibrate()
+    return clock
+
+
+@pytest.mark.parametrize("seconds", [0, 1, 60, 600, 3600])
+def test_matches_astropy(clock, seconds):
+    obs_time = datetime.datetime.fromtimestamp(time.time() + seconds, datetime.timezone.utc)
+
+    expected = calculate_local_sidereal_time_astropy(LONGITUDE, obs_time)
+    actual = clock.lst_deg(LONGITUDE, obs_time)
+
+    error_arcsec = abs((actual - expected + 180.0) % 360.0 - 180.0) * 3600.0
+    assert error_arcsec < 0.01
+    assert error_arcsec <= clock.error_bound_arcsec(obs_time)
+
+
+def test_call_cost_is_microseconds(clock):
+    number = 10_000
+    seconds_per_call = timeit.timeit(lambda: clock.lst_deg(LONGITUDE), number=number) / number
+    assert seconds_per_call < 50e-6
+
+
+def test_uncalibrated_error_bound():
+    clock = SiderealClock(recalibrate_interval=None)
+    assert not clock.calibrated
+    assert clock.error_bound_arcsec() == UNCALIBRATED_ERROR_ARCSEC
+
+
+def test_calibrate_runs_astropy_outside_lock(monkeypatch):
+    clock = SiderealClock(recalibrate_interval=None)
+
+    def reference(unix_time):
+        assert not clock._lock.locked()
+        return sidereal.analytic_gmst_deg(unix_time) + 1.0 / 3600.0
+
+    monkeypatch.setattr(sidereal, 'astropy_gmst_deg', reference)
+    assert clock.calibrate() == pytest.approx(1.0)
+    assert clock.calibrated
+
+
+def test_restart_after_stop(monkeypatch):
+    monkeypatch.setattr(sidereal, 'astropy_gmst_deg', sidereal.analytic_gmst_deg)
+    clock = SiderealClock(recalibrate_interval=60.0)
+    clock.start()
+    first = clock._thread
+    clock.stop()
+    first.join(1)
+    assert not first.is_alive()
+
+    clock.start()
+    assert clock._thread is not None and clock._thread is not first
+    assert clock._thread.is_alive()
+    clock.stop()
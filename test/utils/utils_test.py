@@ -2,7 +2,7 @@ import pytest
 from src.utils.astropi_utils import hex_to_degrees, degrees_to_hex
 
 
-@pytest.mark.parametrize("degrees, hex_str, precise", [
+HEX_TO_DEGREES_CASES = [
     (26.4441, "12CE", False),
     (74.0643, "34AB", False),
     (0.0, "0000", False),
@@ -18,12 +18,9 @@ from src.utils.astropi_utils import hex_to_degrees, degrees_to_hex
     (359.99999992, "FFFFFFFF", True),
     (321.95743561, "E4F29000", True),
     (119.99999997, "55555555", True),
-])
-def test_hex_to_degrees(degrees, hex_str, precise):
-    assert hex_to_degrees(hex_str, precise) == degrees
-
+]
 
-@pytest.mark.parametrize("degrees, hex_str, precise", [
+DEGREES_TO_HEX_CASES = [
     (26.4441, "12CE", False),
     (74.0643, "34AB", False),
     (0.0, "0000", False),
@@ -39,9 +36,18 @@ def test_hex_to_degrees(degrees, hex_str, precise):
     (180.0, "80000000", True),
     (359.99999992, "FFFFFFFF", True),
     (360.0, "00000000", True),
+    (359.999999999, "00000000", True),
     (-38.04256439, "E4F29000", True),
     (480, "55555555", True),
-])
+]
+
+
+@pytest.mark.parametrize("degrees, hex_str, precise", HEX_TO_DEGREES_CASES)
+def test_hex_to_degrees(degrees, hex_str, precise):
+    assert hex_to_degrees(hex_str, precise) == degrees
+
+
+@pytest.mark.parametrize("degrees, hex_str, precise", DEGREES_TO_HEX_CASES)
 def test_degrees_to_hex(degrees, hex_str, precise):
     assert degrees_to_hex(degrees, precise) == hex_str
 